@@ -0,0 +1,265 @@
+"""Admission control for the scoring endpoints: per-client rate limits and a global concurrency limit.
+
+A request is first charged one token from its client's bucket (``ClientRateLimiter``); an empty
+bucket is a 429. It then needs one of ``max_concurrency`` slots (``ConcurrencyLimiter``). If none is
+free it waits in a short FIFO queue, bounded in length and in time. A request that the queue is
+full for, or that would not get a slot within ``max_wait_seconds`` judging by recent hold times, is
+rejected at once with a 503 instead of waiting to time out. Both rejections carry ``Retry-After``.
+
+Under load, storage goes before scoring: once the slots in use reach ``storage_shed_ratio`` of the
+limit, admitted requests are told to skip the submission write (``Admission.shed_storage``).
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+DEFAULT_MAX_TRACKED_CLIENTS = 10_000
+# Weight of the latest hold time in the moving average used to estimate queue waits.
+_HOLD_TIME_SMOOTHING = 0.2
+
+REJECTED_RATE_LIMITED = "rate_limited"
+REJECTED_QUEUE_FULL = "queue_full"
+REJECTED_DEADLINE = "deadline"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after_seconds: float) -> None:
+        detail = "Too many requests from this client." if reason == REJECTED_RATE_LIMITED else "Server is busy."
+        super().__init__(detail)
+        self.reason = reason
+        self.status_code = 429 if reason == REJECTED_RATE_LIMITED else 503
+        self.detail = detail
+        self.retry_after_seconds = retry_after_seconds
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after_seconds)))}
+
+
+@dataclass(frozen=True)
+class AdmissionStats:
+    in_flight: int
+    queued: int
+    admitted: int
+    queued_total: int
+    rejected_rate_limited: int
+    rejected_queue_full: int
+    rejected_deadline: int
+    storage_shed: int
+
+
+class ClientRateLimiter:
+    """Token buckets per client key; the least recently seen clients are forgotten past ``max_clients``."""
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        *,
+        max_clients: int = DEFAULT_MAX_TRACKED_CLIENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_clients = max(1, max_clients)
+        self._clock = clock
+        # key -> (tokens, time they were counted)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """Take one token; returns 0 when allowed, otherwise the seconds until one is available."""
+        now = self._clock()
+        with self._lock:
+            tokens, counted_at = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - counted_at) * self.rate_per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate_per_second
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, future: asyncio.Future) -> None:
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` holders, then a FIFO queue of at most ``max_queue`` bounded waits.
+
+    Slots are handed to waiters directly on release, so a newcomer cannot overtake the queue. Works
+    across event loops and threads.
+    """
+
+    def __init__(self, limit: int, max_queue: int, max_wait_seconds: float) -> None:
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._average_hold_seconds = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._active
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+    def estimated_wait_seconds(self, position: int) -> float:
+        """Expected wait of the ``position``-th waiter (1-based), from the average hold time."""
+        return math.ceil(position / self.limit) * self._average_hold_seconds
+
+    async def acquire(self) -> bool:
+        """Hold a slot until ``release``; returns whether it had to queue for it.
+
+        Raises ``AdmissionRejected`` when the queue is full or the wait would be too long.
+        """
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return False
+            position = len(self._waiters) + 1
+            estimate = self.estimated_wait_seconds(position)
+            if position > self.max_queue:
+                raise AdmissionRejected(REJECTED_QUEUE_FULL, estimate)
+            if estimate > self.max_wait_seconds:
+                # Would not be served in time; reject now rather than after the wait.
+                raise AdmissionRejected(REJECTED_DEADLINE, estimate)
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait_seconds)
+        except (TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    if isinstance(exc, asyncio.CancelledError):
+                        raise
+                    raise AdmissionRejected(REJECTED_DEADLINE, self.max_wait_seconds) from None
+            # Granted just as the wait ran out: the slot is ours.
+            if isinstance(exc, asyncio.CancelledError):
+                self.release(0.0)
+                raise
+        return True
+
+    def release(self, held_seconds: float) -> None:
+        with self._lock:
+            self._average_hold_seconds += _HOLD_TIME_SMOOTHING * (held_seconds - self._average_hold_seconds)
+            if not self._waiters:
+                self._active -= 1
+                return
+            # The slot passes straight to the longest waiter; ``_active`` is unchanged.
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        try:
+            waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+        except RuntimeError:
+            # The waiter's loop is gone, so is the request; pass the slot on.
+            self.release(held_seconds)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Admission:
+    """A held slot; ``release`` it when the request is done."""
+
+    __slots__ = ("shed_storage", "_controller", "_started")
+
+    def __init__(self, controller: "AdmissionController", shed_storage: bool) -> None:
+        self.shed_storage = shed_storage
+        self._controller = controller
+        self._started = time.perf_counter()
+
+    def release(self) -> None:
+        self._controller.limiter.release(time.perf_counter() - self._started)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait_seconds: float,
+        client_rate_per_second: float,
+        client_burst: int,
+        storage_shed_ratio: float,
+    ) -> None:
+        self.limiter = ConcurrencyLimiter(max_concurrency, max_queue, max_wait_seconds)
+        # No per-client limit when the rate is 0.
+        self.rate_limiter = (
+            ClientRateLimiter(client_rate_per_second, client_burst) if client_rate_per_second > 0 else None
+        )
+        self.storage_shed_ratio = storage_shed_ratio
+
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._queued_total = 0
+        self._rejected_rate_limited = 0
+        self._rejected_queue_full = 0
+        self._rejected_deadline = 0
+        self._storage_shed = 0
+
+    async def admit(self, client_key: str) -> Admission:
+        """Raises ``AdmissionRejected`` (429 or 503) when the request must not run now."""
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.take(client_key)
+            if wait > 0:
+                with self._lock:
+                    self._rejected_rate_limited += 1
+                raise AdmissionRejected(REJECTED_RATE_LIMITED, wait)
+
+        try:
+            waited = await self.limiter.acquire()
+        except AdmissionRejected as exc:
+            with self._lock:
+                if exc.reason == REJECTED_QUEUE_FULL:
+                    self._rejected_queue_full += 1
+                else:
+                    self._rejected_deadline += 1
+            raise
+
+        shed_storage = self.limiter.in_flight >= self.storage_shed_ratio * self.limiter.limit
+        with self._lock:
+            self._admitted += 1
+            self._queued_total += int(waited)
+            self._storage_shed += int(shed_storage)
+        return Admission(self, shed_storage)
+
+    def stats(self) -> AdmissionStats:
+        with self._lock:
+            return AdmissionStats(
+                in_flight=self.limiter.in_flight,
+                queued=self.limiter.queued,
+                admitted=self._admitted,
+                queued_total=self._queued_total,
+                rejected_rate_limited=self._rejected_rate_limited,
+                rejected_queue_full=self._rejected_queue_full,
+                rejected_deadline=self._rejected_deadline,
+                storage_shed=self._storage_shed,
+            )
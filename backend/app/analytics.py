@@ -0,0 +1,207 @@
+"""Streaming export and aggregate statistics of stored submissions.
+
+Submissions are read page by page from the configured store: the Sheets worksheet (one
+``values.get`` per page) or the local journal. Each page is written out as CSV, in the
+``SUBMISSION_COLUMNS`` layout, and folded into ``SubmissionAggregates``. Memory use does not grow
+with the number of submissions.
+
+Prerequisite injection is not stored with a submission. It is recomputed from the stored answers
+against the current catalog, so rows scored under an older catalog version may be counted
+differently.
+
+    cd backend
+    python -m app.analytics --csv submissions.csv > summary.json
+"""
+
+import argparse
+import csv
+import io
+import json
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+from .catalog import CatalogSnapshot, current_catalog
+from .models import QUESTION_COUNT, ResponseOption
+from .scoring import RESPONSE_CODES, TOP_K
+from .settings import Settings, load_settings_from_env
+from .submission_journal import iter_journal_records
+from .submission_store import (
+    DEFAULT_READ_PAGE_SIZE,
+    SUBMISSION_COLUMNS,
+    SubmissionRecord,
+    SubmissionStoreError,
+    build_submission_row,
+    create_google_sheets_store,
+)
+
+
+_LEGACY_RESPONSE_PREFIX = "ResponseOption."
+
+
+def parse_stored_response(value: str) -> ResponseOption | None:
+    """A stored answer as a ``ResponseOption``; older rows hold ``str(ResponseOption)``."""
+    if value.startswith(_LEGACY_RESPONSE_PREFIX):
+        value = value[len(_LEGACY_RESPONSE_PREFIX) :].lower()
+    try:
+        return ResponseOption(value)
+    except ValueError:
+        return None
+
+
+class SubmissionAggregates:
+    """Counts updated one submission at a time; their size is bounded by the catalog, not the data."""
+
+    def __init__(self, catalog: CatalogSnapshot | None = None) -> None:
+        self.catalog = catalog or current_catalog()
+        self.submissions = 0
+        self.first_submitted_at_utc: str | None = None
+        self.last_submitted_at_utc: str | None = None
+        self.catalog_versions: Counter[str] = Counter()
+        self.question_responses = [Counter() for _ in range(QUESTION_COUNT)]
+        self.recommendation_positions = [Counter() for _ in range(TOP_K)]
+        self.scored = 0
+        self.injected = 0
+        self.injections_by_trigger_phase: Counter[str] = Counter()
+
+    def add(self, record: SubmissionRecord) -> None:
+        self.submissions += 1
+        timestamp = record.submitted_at_utc
+        if timestamp:
+            # ISO 8601 UTC timestamps sort as strings.
+            if self.first_submitted_at_utc is None or timestamp < self.first_submitted_at_utc:
+                self.first_submitted_at_utc = timestamp
+            if self.last_submitted_at_utc is None or timestamp > self.last_submitted_at_utc:
+                self.last_submitted_at_utc = timestamp
+        self.catalog_versions[record.catalog_version or "unknown"] += 1
+
+        options = [parse_stored_response(value) for value in record.responses[:QUESTION_COUNT]]
+        for histogram, option in zip(self.question_responses, options):
+            histogram[option.value if option is not None else "invalid"] += 1
+        for histogram, recommendation in zip(self.recommendation_positions, record.recommendations):
+            histogram[recommendation] += 1
+
+        if len(options) == QUESTION_COUNT and None not in options:
+            self._add_injection([RESPONSE_CODES[option] for option in options])
+
+    def add_all(self, records: Iterable[SubmissionRecord]) -> None:
+        for record in records:
+            self.add(record)
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "submissions": self.submissions,
+            "first_submitted_at_utc": self.first_submitted_at_utc,
+            "last_submitted_at_utc": self.last_submitted_at_utc,
+            "catalog_versions": dict(self.catalog_versions),
+            "question_responses": {
+                f"q{number}": dict(histogram) for number, histogram in enumerate(self.question_responses, start=1)
+            },
+            "recommendation_positions": {
+                f"rec_{number}": dict(histogram.most_common())
+                for number, histogram in enumerate(self.recommendation_positions, start=1)
+            },
+            "prerequisite_injection": {
+                "scored_catalog_version": self.catalog.version,
+                "scored": self.scored,
+                "unscored": self.submissions - self.scored,
+                "injected": self.injected,
+                "rate": _rate(self.injected, self.scored),
+                "by_trigger_phase": {
+                    phase: {"count": count, "rate": _rate(count, self.scored)}
+                    for phase, count in sorted(self.injections_by_trigger_phase.items())
+                },
+            },
+        }
+
+    def _add_injection(self, codes: list[int]) -> None:
+        matrix, index = self.catalog.scoring_matrix, self.catalog.index
+        order = matrix.rank(matrix.scores(codes))
+        _, injected = index.select_top(order)
+        self.scored += 1
+        if not injected:
+            return
+        self.injected += 1
+        # The phases of the top-ranked activities whose prerequisites caused the injection.
+        for phase in {self.catalog.activities[i].phase for i in order[:TOP_K] if index.required_phase_masks[i]}:
+            self.injections_by_trigger_phase[phase] += 1
+
+
+def open_submission_pages(
+    settings: Settings,
+    *,
+    page_size: int = DEFAULT_READ_PAGE_SIZE,
+) -> Iterator[list[SubmissionRecord]]:
+    """Pages of stored submissions from the configured backend.
+
+    Raises ``SubmissionStoreError`` right away, not on the first page, when no store is configured.
+    """
+    if settings.submission_store_backend == "journal":
+        if not settings.submission_journal_path:
+            raise SubmissionStoreError("SUBMISSION_STORE_BACKEND is journal, but SUBMISSION_JOURNAL_PATH is missing.")
+        return iter_journal_records(settings.submission_journal_path, page_size=page_size)
+
+    store = create_google_sheets_store(settings)
+    if store is None:
+        raise SubmissionStoreError("Google Sheets storage is not configured; see the backend README.")
+    return store.iter_records(page_size=page_size)
+
+
+def iter_csv_chunks(
+    pages: Iterable[list[SubmissionRecord]],
+    *,
+    aggregates: SubmissionAggregates | None = None,
+) -> Iterator[str]:
+    """CSV text, a header and then one chunk per page; each page is also added to ``aggregates``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(SUBMISSION_COLUMNS)
+    yield _drain(buffer)
+    for page in pages:
+        writer.writerows(build_submission_row(**record.as_kwargs()) for record in page)
+        if aggregates is not None:
+            aggregates.add_all(page)
+        yield _drain(buffer)
+
+
+def summarize(pages: Iterable[list[SubmissionRecord]]) -> SubmissionAggregates:
+    aggregates = SubmissionAggregates()
+    for page in pages:
+        aggregates.add_all(page)
+    return aggregates
+
+
+def _drain(buffer: io.StringIO) -> str:
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+def _rate(count: int, total: int) -> float:
+    return round(count / total, 4) if total else 0.0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export stored submissions and print aggregate statistics.")
+    parser.add_argument("--csv", dest="csv_path", help="also write every submission to this CSV file")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_READ_PAGE_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        pages = open_submission_pages(load_settings_from_env(), page_size=max(1, args.page_size))
+    except SubmissionStoreError as exc:
+        parser.error(str(exc))
+
+    if args.csv_path:
+        aggregates = SubmissionAggregates()
+        with open(args.csv_path, "w", encoding="utf-8", newline="") as csv_file:
+            for chunk in iter_csv_chunks(pages, aggregates=aggregates):
+                csv_file.write(chunk)
+    else:
+        aggregates = summarize(pages)
+    print(json.dumps(aggregates.as_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
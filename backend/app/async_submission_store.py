@@ -0,0 +1,261 @@
+"""Async submission storage for the event-loop request path.
+
+``AsyncGoogleSheetsSubmissionStore`` talks to the Sheets REST API over a pooled, keep-alive
+``httpx.AsyncClient``, so a request waiting on Sheets does not hold a threadpool thread. Sync stores
+keep working: ``append_submission_async`` runs them in the threadpool unless they declare that
+their appends never block.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Protocol
+from urllib.parse import quote
+
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import SHEETS_REQUEST_DURATION, SUBMISSION_STORE_FAILURES, SUBMISSION_STORE_RETRIES
+from .settings import DEFAULT_GOOGLE_SHEETS_API_BASE_URL, DEFAULT_GOOGLE_SHEETS_MAX_CONNECTIONS, Settings
+from .submission_store import (
+    RECENT_SUBMISSION_IDS_LIMIT,
+    UPDATED_RANGE_PATTERN,
+    SubmissionRecord,
+    SubmissionStoreError,
+    build_service_account_credentials,
+    build_submission_row,
+    close_submission_store,
+    credentials_need_refresh,
+    refresh_service_account_credentials,
+    retry_delay_seconds,
+)
+
+if TYPE_CHECKING:
+    import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSubmissionStore(Protocol):
+    async def append_submission(
+        self,
+        *,
+        submitted_at_utc: str,
+        submission_id: str,
+        responses: list[str],
+        recommendations: list[str],
+        visitor_hash: str | None,
+        schema_version: str,
+        catalog_version: str | None = None,
+    ) -> None: ...
+
+
+class AsyncGoogleSheetsSubmissionStore:
+    def __init__(
+        self,
+        *,
+        spreadsheet_id: str,
+        worksheet_name: str,
+        service_account_json: str | None,
+        service_account_file: str | None,
+        request_timeout_seconds: float,
+        max_retries: int,
+        base_url: str = DEFAULT_GOOGLE_SHEETS_API_BASE_URL,
+        max_connections: int = DEFAULT_GOOGLE_SHEETS_MAX_CONNECTIONS,
+        _credentials: object | None = None,
+        _transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.spreadsheet_id = spreadsheet_id
+        self.worksheet_name = worksheet_name
+        self.service_account_json = service_account_json
+        self.service_account_file = service_account_file
+        self.max_retries = max_retries
+
+        # Imported here so workers that never write to Sheets don't load httpx.
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=request_timeout_seconds,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=_transport,
+        )
+        self._credentials = _credentials
+        self._refresh_lock = asyncio.Lock()
+        self._recent_submission_ids: OrderedDict[str, None] = OrderedDict()
+        self._next_row: int | None = None
+
+    async def append_submission(
+        self,
+        *,
+        submitted_at_utc: str,
+        submission_id: str,
+        responses: list[str],
+        recommendations: list[str],
+        visitor_hash: str | None,
+        schema_version: str,
+        catalog_version: str | None = None,
+    ) -> None:
+        await self.append_submissions(
+            [
+                SubmissionRecord(
+                    submitted_at_utc=submitted_at_utc,
+                    submission_id=submission_id,
+                    responses=responses,
+                    recommendations=recommendations,
+                    visitor_hash=visitor_hash,
+                    schema_version=schema_version,
+                    catalog_version=catalog_version,
+                )
+            ]
+        )
+
+    async def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        """Append submissions with one ``values:append`` call, retried as a unit.
+
+        Same duplicate handling as ``GoogleSheetsSubmissionStore.append_submissions``.
+        """
+        rows_by_id: dict[str, list[str]] = {}
+        for record in records:
+            if record.submission_id in self._recent_submission_ids or record.submission_id in rows_by_id:
+                continue
+            rows_by_id[record.submission_id] = build_submission_row(**record.as_kwargs())
+
+        for attempt in range(self.max_retries + 1):
+            if not rows_by_id:
+                return
+            try:
+                await self._append_rows(list(rows_by_id.values()))
+                self._remember_submission_ids(list(rows_by_id))
+                return
+            except Exception as exc:  # Credential, transport and response-parsing failures alike.
+                if attempt >= self.max_retries:
+                    SUBMISSION_STORE_FAILURES.labels("sheets_async").inc()
+                    raise SubmissionStoreError("Failed to append submission to Google Sheets.") from exc
+                SUBMISSION_STORE_RETRIES.labels("sheets_async").inc()
+                await asyncio.sleep(retry_delay_seconds(attempt, exc))
+                for submission_id in await self._find_landed_submission_ids(set(rows_by_id)):
+                    del rows_by_id[submission_id]
+
+    async def warm_up(self) -> None:
+        """Load the service account and mint an access token now rather than on the first write."""
+        await self._auth_headers()
+
+    def refresh_credentials(self, *, margin_seconds: float) -> bool:
+        """Refresh the token if it expires within ``margin_seconds``. Blocking; for a background thread."""
+        credentials = self._credentials
+        if credentials is None or not credentials_need_refresh(credentials, margin_seconds=margin_seconds):
+            return False
+        refresh_service_account_credentials(credentials)
+        return True
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _append_rows(self, rows: list[list[str]]) -> None:
+        headers = await self._auth_headers()
+        started = time.perf_counter()
+        try:
+            response = await self._client.post(
+                f"{self._values_path(f'{self.worksheet_name}!A:Z')}:append",
+                params={"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+                json={"values": rows},
+                headers=headers,
+            )
+        finally:
+            SHEETS_REQUEST_DURATION.labels("sheets_async").observe(time.perf_counter() - started)
+        response.raise_for_status()
+
+        updated_range = (response.json().get("updates") or {}).get("updatedRange") or ""
+        match = UPDATED_RANGE_PATTERN.search(updated_range)
+        if match:
+            self._next_row = int(match.group(1)) + 1
+
+    async def _find_landed_submission_ids(self, submission_ids: set[str]) -> set[str]:
+        start_row = self._next_row or 1
+        try:
+            response = await self._client.get(
+                self._values_path(f"{self.worksheet_name}!B{start_row}:B"),
+                headers=await self._auth_headers(),
+            )
+            response.raise_for_status()
+            values = response.json().get("values", [])
+        except Exception:  # Best effort; the retry proceeds without the check.
+            logger.warning("Could not read back submission ids before retrying a failed batch.")
+            return set()
+
+        landed = {row[0] for row in values if row} & submission_ids
+        self._remember_submission_ids(list(landed))
+        return landed
+
+    def _values_path(self, range_name: str) -> str:
+        return f"/v4/spreadsheets/{quote(self.spreadsheet_id, safe='')}/values/{quote(range_name, safe='')}"
+
+    async def _auth_headers(self) -> dict[str, str]:
+        credentials = self._get_credentials()
+        if not credentials.valid:
+            async with self._refresh_lock:
+                if not credentials.valid:
+                    # Token refresh is rare (about hourly) and uses the blocking google-auth transport.
+                    await run_in_threadpool(refresh_service_account_credentials, credentials)
+        return {"Authorization": f"Bearer {credentials.token}"}
+
+    def _get_credentials(self) -> object:
+        if self._credentials is not None:
+            return self._credentials
+
+        try:
+            from google.oauth2 import service_account
+        except ImportError as exc:
+            raise SubmissionStoreError(
+                "Google Sheets dependencies are not installed. Install backend requirements."
+            ) from exc
+
+        self._credentials = build_service_account_credentials(
+            service_account_json=self.service_account_json,
+            service_account_file=self.service_account_file,
+            service_account_module=service_account,
+        )
+        return self._credentials
+
+    def _remember_submission_ids(self, submission_ids: list[str]) -> None:
+        for submission_id in submission_ids:
+            self._recent_submission_ids[submission_id] = None
+        while len(self._recent_submission_ids) > RECENT_SUBMISSION_IDS_LIMIT:
+            self._recent_submission_ids.popitem(last=False)
+
+
+def create_async_google_sheets_store(settings: Settings) -> AsyncGoogleSheetsSubmissionStore:
+    return AsyncGoogleSheetsSubmissionStore(
+        spreadsheet_id=settings.google_sheets_spreadsheet_id or "",
+        worksheet_name=settings.google_sheets_worksheet_name,
+        service_account_json=settings.google_service_account_json,
+        service_account_file=settings.google_service_account_file,
+        request_timeout_seconds=settings.google_sheets_request_timeout_seconds,
+        max_retries=settings.google_sheets_max_retries,
+        base_url=settings.google_sheets_api_base_url,
+        max_connections=settings.google_sheets_max_connections,
+    )
+
+
+async def append_submission_async(store: object, **kwargs: object) -> None:
+    """Append through ``store`` without blocking the event loop, whether it is sync or async."""
+    append_submission = store.append_submission
+    if inspect.iscoroutinefunction(append_submission):
+        await append_submission(**kwargs)
+    elif getattr(store, "nonblocking_append", False):
+        append_submission(**kwargs)
+    else:
+        await run_in_threadpool(append_submission, **kwargs)
+
+
+async def aclose_submission_store(store: object) -> None:
+    aclose = getattr(store, "aclose", None)
+    if callable(aclose):
+        await aclose()
+        return
+    await run_in_threadpool(close_submission_store, store)
@@ -0,0 +1,278 @@
+"""Bulk scoring of imported surveys for ``POST /api/v1/recommendations:batch``.
+
+The upload is spooled to a temporary file before the response starts (reading the request body from
+inside the streaming response would compete with Starlette's disconnect listener). Rows are then read
+back incrementally, decoded straight into response codes (no per-row Pydantic model), scored a chunk
+at a time, and streamed back as NDJSON so memory stays flat regardless of upload size. Reading and
+scoring a chunk run in the threadpool, off the event loop. Uploads are capped at ``max_bytes``.
+"""
+
+import inspect
+import io
+import itertools
+import json
+import logging
+import tempfile
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from datetime import datetime, timezone
+from typing import BinaryIO, TextIO
+from uuid import uuid4
+
+from starlette.concurrency import run_in_threadpool
+
+from .catalog import current_catalog
+from .recommendation_cache import unpack_response_codes
+from .scoring import RESPONSE_CODES, RESPONSE_OPTION_ORDER, build_recommendation_payloads, decode_response_digits
+from .submission_store import SubmissionRecord, SubmissionStore, SubmissionStoreError
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_CHUNK_SIZE = 500
+BATCH_SPOOL_MEMORY_BYTES = 1 << 20
+_READ_CHUNK_SIZE = 1 << 16
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_RESPONSE_CODES_BY_VALUE = {option.value: code for option, code in RESPONSE_CODES.items()}
+_QUESTION_COUNT = 18
+
+
+class BatchItemError(ValueError):
+    pass
+
+
+class BatchUploadTooLarge(ValueError):
+    pass
+
+
+def decode_batch_item(item: object) -> list[int]:
+    if not isinstance(item, dict):
+        raise BatchItemError("Each item must be an object with a 'responses' list.")
+
+    # Same compact encodings as ``RecommendationRequest``.
+    if isinstance(item.get("codes"), str):
+        digits = item["codes"]
+        if len(digits) != _QUESTION_COUNT:
+            raise BatchItemError(f"'codes' must have {_QUESTION_COUNT} digits.")
+        try:
+            return decode_response_digits(digits)
+        except ValueError as exc:
+            raise BatchItemError(str(exc)) from None
+    packed = item.get("packed")
+    if isinstance(packed, int) and not isinstance(packed, bool):
+        try:
+            return unpack_response_codes(packed)
+        except ValueError as exc:
+            raise BatchItemError(str(exc)) from None
+
+    responses = item.get("responses")
+    if not isinstance(responses, list) or len(responses) != _QUESTION_COUNT:
+        raise BatchItemError(f"'responses' must be a list of {_QUESTION_COUNT} answers.")
+
+    try:
+        return [_RESPONSE_CODES_BY_VALUE[response] for response in responses]
+    except (KeyError, TypeError):
+        raise BatchItemError(
+            f"'responses' entries must be one of: {', '.join(_RESPONSE_CODES_BY_VALUE)}."
+        ) from None
+
+
+async def spool_upload(chunks: AsyncIterable[bytes], *, max_bytes: int) -> BinaryIO:
+    """Raises ``BatchUploadTooLarge`` as soon as more than ``max_bytes`` have been received."""
+    upload = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MEMORY_BYTES)
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise BatchUploadTooLarge(f"Upload is larger than {max_bytes} bytes.")
+            upload.write(chunk)
+    except BaseException:
+        upload.close()
+        raise
+    upload.seek(0)
+    return upload
+
+
+def starts_with_json_array(upload: BinaryIO) -> bool:
+    start = upload.tell()
+    head = upload.read(_READ_CHUNK_SIZE).lstrip()
+    upload.seek(start)
+    return head.startswith(b"[")
+
+
+def iter_ndjson_items(upload: BinaryIO) -> Iterator[object]:
+    try:
+        for line in upload:
+            if line.strip():
+                yield _parse_line(line)
+    finally:
+        upload.close()
+
+
+def iter_json_array_items(upload: BinaryIO) -> Iterator[object]:
+    # Bytes that are not UTF-8 become U+FFFD, which no valid item contains, so they fail only the
+    # item (or, outside a string, the rest of the array) they appear in.
+    text_file = io.TextIOWrapper(upload, encoding="utf-8", errors="replace")
+    try:
+        for item in iter_json_array(text_file):
+            yield item
+    except BatchItemError as exc:
+        yield exc
+    finally:
+        text_file.close()
+
+
+def iter_json_array(text_file: TextIO) -> Iterator[object]:
+    """Yield the elements of a top-level JSON array without loading the whole document."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def read_more() -> None:
+        nonlocal buffer, position, eof
+        more = text_file.read(_READ_CHUNK_SIZE)
+        eof = not more
+        buffer = buffer[position:] + more
+        position = 0
+
+    def next_char() -> str:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if eof:
+                return ""
+            read_more()
+
+    if next_char() != "[":
+        raise BatchItemError("Request body must be a JSON array.")
+    position += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                item, end = None, -1
+            # A value ending exactly at the buffer edge may be truncated (e.g. a number), so re-read.
+            if end != -1 and (end < len(buffer) or eof):
+                break
+            if eof:
+                raise BatchItemError("Request body is not a valid JSON array.")
+            read_more()
+
+        position = end
+        yield item
+
+        separator = next_char()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise BatchItemError("Request body is not a valid JSON array.")
+        position += 1
+
+
+async def stream_batch_results(
+    items: Iterator[object],
+    *,
+    store: SubmissionStore,
+    schema_version: str,
+    store_mode: str,
+) -> AsyncIterator[bytes]:
+    index = 0
+    while True:
+        scored = await run_in_threadpool(_score_next_chunk, items, index, schema_version, store_mode)
+        if scored is None:
+            return
+        body, records, count = scored
+        index += count
+        if records:
+            await _store_records(store, records)
+        yield body
+
+
+def _parse_line(line: bytes) -> object:
+    try:
+        return json.loads(line)
+    except ValueError:  # Also a UnicodeDecodeError for bytes that are not UTF-8.
+        return BatchItemError("Line is not valid UTF-8 JSON.")
+
+
+def _score_next_chunk(
+    source: Iterator[object],
+    start_index: int,
+    schema_version: str,
+    store_mode: str,
+) -> tuple[bytes, list[SubmissionRecord], int] | None:
+    """Read and score the next ``BATCH_CHUNK_SIZE`` items; None once ``source`` is exhausted."""
+    chunk = list(enumerate(itertools.islice(source, BATCH_CHUNK_SIZE), start_index))
+    if not chunk:
+        return None
+
+    decoded: list[tuple[int, list[int] | BatchItemError]] = []
+    for index, item in chunk:
+        if isinstance(item, BatchItemError):
+            decoded.append((index, item))
+            continue
+        try:
+            decoded.append((index, decode_batch_item(item)))
+        except BatchItemError as exc:
+            decoded.append((index, exc))
+
+    valid = [(index, codes) for index, codes in decoded if not isinstance(codes, BatchItemError)]
+    catalog = current_catalog()
+    payloads = iter(build_recommendation_payloads((codes for _, codes in valid), catalog=catalog))
+
+    lines: list[str] = []
+    records: list[SubmissionRecord] = []
+    submitted_at_utc = datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    for index, codes in decoded:
+        if isinstance(codes, BatchItemError):
+            lines.append(json.dumps({"index": index, "error": str(codes)}))
+            continue
+
+        items, prerequisite_note = next(payloads)
+        lines.append(
+            json.dumps({"index": index, "recommendations": items, "prerequisite_note": prerequisite_note})
+        )
+        if store_mode == "bulk":
+            records.append(
+                SubmissionRecord(
+                    submitted_at_utc=submitted_at_utc,
+                    submission_id=str(uuid4()),
+                    responses=[RESPONSE_OPTION_ORDER[code].value for code in codes],
+                    recommendations=[item["name"] for item in items],
+                    visitor_hash=None,
+                    schema_version=schema_version,
+                    catalog_version=catalog.version,
+                )
+            )
+
+    return ("\n".join(lines) + "\n").encode("utf-8"), records, len(chunk)
+
+
+async def _store_records(store: SubmissionStore, records: list[SubmissionRecord]) -> None:
+    try:
+        append_submissions = getattr(store, "append_submissions", None)
+        if inspect.iscoroutinefunction(append_submissions):
+            await append_submissions(records)
+        else:
+            await run_in_threadpool(_append_records, store, records)
+    except SubmissionStoreError:
+        logger.exception("Failed to store %d batch-scored submissions", len(records))
+
+
+def _append_records(store: SubmissionStore, records: list[SubmissionRecord]) -> None:
+    append_submissions = getattr(store, "append_submissions", None)
+    if callable(append_submissions):
+        append_submissions(records)
+        return
+    for record in records:
+        store.append_submission(**record.as_kwargs())
@@ -0,0 +1,209 @@
+"""Versioned snapshot of the survey data files under ``backend/data/``.
+
+Everything derived from the data files (parsed questions and activities, descriptions, the compiled
+scoring matrix, lookup indexes and selection table) lives on one immutable ``CatalogSnapshot``. A
+reload parses and validates the new files off the request path and publishes the result with a
+single reference swap, so a request that already holds a snapshot finishes on it.
+"""
+
+import hashlib
+import logging
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+from .catalog_index import CatalogIndex, compile_catalog_index
+from .data_loader import (
+    DESCRIPTIONS_PATH,
+    ORDER_PATH,
+    QUESTIONS_PATH,
+    Activity,
+    Question,
+    parse_activities,
+    parse_activity_descriptions,
+    parse_questions,
+)
+from .models import QuestionItem, QuestionsResponse, RecommendationItem
+from .prerendered import PrerenderedDocument, prerender
+from .scoring import ScoringMatrix, compile_scoring_matrix
+from .selection_table import SelectionTable, compile_selection_table
+
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE_PATHS = (QUESTIONS_PATH, ORDER_PATH, DESCRIPTIONS_PATH)
+_VERSION_LENGTH = 12
+
+
+class CatalogValidationError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    # Content hash of the data files; stamped into stored submissions.
+    version: str
+    questions: tuple[Question, ...]
+    activities: tuple[Activity, ...]
+    descriptions: Mapping[str, str]
+    scoring_matrix: ScoringMatrix
+    index: CatalogIndex
+    # Recommendation selection for every activity ranking, with the packed score rows.
+    selection_table: SelectionTable
+    # Recommendation payload item per activity, in ``activities`` order.
+    payload_items: tuple[dict[str, str], ...]
+    # The same items as ``RecommendationItem`` JSON, for writing responses without re-serializing.
+    payload_fragments: tuple[bytes, ...]
+    # ``GET /api/v1/questions`` body, serialized and compressed once.
+    questions_document: PrerenderedDocument
+
+
+_current: CatalogSnapshot | None = None
+_publish_lock = threading.Lock()
+
+
+def current_catalog() -> CatalogSnapshot:
+    snapshot = _current
+    if snapshot is not None:
+        return snapshot
+    with _publish_lock:
+        if _current is None:
+            _publish(build_catalog())
+        return _current
+
+
+def reload_catalog() -> tuple[CatalogSnapshot, bool]:
+    """Re-read the data files and publish them if their content changed.
+
+    Returns the current snapshot and whether it was replaced. Raises ``CatalogValidationError`` (or
+    ``OSError``) and keeps serving the old snapshot if the new files cannot be loaded.
+    """
+    snapshot = build_catalog()
+    with _publish_lock:
+        if _current is not None and _current.version == snapshot.version:
+            return _current, False
+        _publish(snapshot)
+    logger.info("Published catalog version %s", snapshot.version)
+    return snapshot, True
+
+
+def publish_catalog(snapshot: CatalogSnapshot) -> None:
+    with _publish_lock:
+        _publish(snapshot)
+
+
+def _publish(snapshot: CatalogSnapshot) -> None:
+    global _current
+    _current = snapshot
+
+
+def build_catalog(paths: tuple[Path, Path, Path] | None = None) -> CatalogSnapshot:
+    """Parse and validate ``(questions.json, order.csv, descriptions.txt)``; defaults to ``DATA_FILE_PATHS``."""
+    contents = [path.read_bytes() for path in (paths or DATA_FILE_PATHS)]
+    digest = hashlib.sha256()
+    for content in contents:
+        digest.update(hashlib.sha256(content).digest())
+
+    try:
+        questions_text, order_text, descriptions_text = (content.decode("utf-8") for content in contents)
+        questions = parse_questions(questions_text)
+        activities = parse_activities(order_text)
+        descriptions = parse_activity_descriptions(descriptions_text)
+    except (ValueError, KeyError, TypeError) as exc:
+        raise CatalogValidationError(f"Could not parse data files: {exc}") from exc
+
+    validate_catalog(questions, activities, descriptions)
+    try:
+        index = compile_catalog_index(activities)
+    except ValueError as exc:
+        raise CatalogValidationError(f"order.csv has invalid prerequisites: {exc}") from exc
+
+    scoring_matrix = compile_scoring_matrix(questions, activities)
+    payload_items = tuple(
+        {"name": activity.name, "description": descriptions[activity.code], "phase": activity.phase}
+        for activity in activities
+    )
+    return CatalogSnapshot(
+        version=digest.hexdigest()[:_VERSION_LENGTH],
+        questions=questions,
+        activities=activities,
+        descriptions=descriptions,
+        scoring_matrix=scoring_matrix,
+        index=index,
+        selection_table=compile_selection_table(scoring_matrix, index),
+        payload_items=payload_items,
+        payload_fragments=tuple(RecommendationItem(**item).model_dump_json().encode("utf-8") for item in payload_items),
+        questions_document=render_questions_document(questions),
+    )
+
+
+def render_questions_document(questions: tuple[Question, ...]) -> PrerenderedDocument:
+    response = QuestionsResponse(
+        questions=[QuestionItem(id=index + 1, statement=question.statement) for index, question in enumerate(questions)]
+    )
+    return prerender(response.model_dump_json().encode("utf-8"))
+
+
+def validate_catalog(
+    questions: tuple[Question, ...],
+    activities: tuple[Activity, ...],
+    descriptions: Mapping[str, str],
+) -> None:
+    if not activities:
+        raise CatalogValidationError("order.csv lists no activities.")
+    codes = {activity.code for activity in activities}
+    if len(codes) != len(activities):
+        raise CatalogValidationError("order.csv lists an activity code more than once.")
+
+    unknown_tags = sorted({tag for question in questions for tag in question.tags} - codes)
+    if unknown_tags:
+        raise CatalogValidationError(f"questions.json uses tags missing from order.csv: {', '.join(unknown_tags)}")
+
+    missing_descriptions = sorted(codes - set(descriptions))
+    if missing_descriptions:
+        raise CatalogValidationError(f"Activities without a description: {', '.join(missing_descriptions)}")
+
+
+def data_files_signature() -> tuple[tuple[int, int], ...]:
+    return tuple((stat.st_mtime_ns, stat.st_size) for stat in (path.stat() for path in DATA_FILE_PATHS))
+
+
+class CatalogWatcher:
+    """Polls the data files' mtimes and reloads the catalog when they change."""
+
+    def __init__(self, *, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        signature = _safe_signature()
+        while not self._stop.wait(self.interval_seconds):
+            latest = _safe_signature()
+            if latest is None or latest == signature:
+                continue
+            # Remembered even if the reload fails, so a broken file is reported once, not every poll.
+            signature = latest
+            try:
+                reload_catalog()
+            except (CatalogValidationError, OSError):
+                logger.exception("Ignoring changed data files; still serving catalog version %s", current_catalog().version)
+
+
+def _safe_signature() -> tuple[tuple[int, int], ...] | None:
+    try:
+        return data_files_signature()
+    except OSError:
+        return None
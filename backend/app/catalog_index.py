@@ -0,0 +1,128 @@
+"""Lookup tables compiled from ``order.csv`` once per catalog version.
+
+Prerequisite injection is driven by the ``Prerequisite`` column: every phase named there (e.g.
+"Phase A + Phase B complete") must be represented in the recommendations by its highest-ranked
+activity. Requirements are resolved transitively and injected in dependency order.
+"""
+
+import re
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from .data_loader import Activity
+from .scoring import TOP_K
+
+
+_PHASE_PATTERN = re.compile(r"Phase [A-Z]\b")
+
+
+def parse_prerequisite_phases(prerequisite: str) -> tuple[str, ...]:
+    """Phases named in a ``Prerequisite`` cell; "None (entry point)" names none."""
+    return tuple(dict.fromkeys(_PHASE_PATTERN.findall(prerequisite)))
+
+
+@dataclass(frozen=True)
+class CatalogIndex:
+    index_by_code: Mapping[str, int]
+    # Phase name -> activity codes in catalog order.
+    codes_by_phase: Mapping[str, tuple[str, ...]]
+    # Per activity: the phase it belongs to, as a position in ``phase_order``.
+    phase_ids: tuple[int, ...]
+    # Per activity: bitmask of phase ids it requires, directly or through other phases.
+    required_phase_masks: tuple[int, ...]
+    # Phases in dependency order (prerequisites first, then by name).
+    phase_order: tuple[str, ...]
+
+    def select_top(self, order: Sequence[int], k: int = TOP_K) -> tuple[list[int], bool]:
+        """Pick the ``k`` activity indexes to recommend from a full ranking.
+
+        Returns the selection and whether prerequisite activities were injected ahead of the ranking.
+        """
+        positions, injected = self.select_top_positions(order, k)
+        return [order[position] for position in positions], injected
+
+    def select_top_positions(self, order: Sequence[int], k: int = TOP_K) -> tuple[list[int], bool]:
+        """``select_top``, as positions in ``order`` rather than activity indexes."""
+        required = 0
+        for index in order[:k]:
+            required |= self.required_phase_masks[index]
+        if not required:
+            return list(range(min(k, len(order)))), False
+
+        selected: list[int] = []
+        phase_ids = self.phase_ids
+        for phase_id in range(len(self.phase_order)):
+            if required >> phase_id & 1:
+                leader = next(
+                    (position for position, index in enumerate(order) if phase_ids[index] == phase_id), None
+                )
+                if leader is not None:
+                    selected.append(leader)
+
+        for position in range(len(order)):
+            if len(selected) >= k:
+                break
+            if position not in selected:
+                selected.append(position)
+        return selected[:k], True
+
+
+def compile_catalog_index(activities: Sequence[Activity]) -> CatalogIndex:
+    """Build the lookup tables; raises ``ValueError`` for unknown or circular prerequisites."""
+    phases = {activity.phase for activity in activities}
+    direct_requirements: dict[str, set[str]] = {phase: set() for phase in phases}
+    activity_requirements: list[tuple[str, ...]] = []
+    for activity in activities:
+        required = parse_prerequisite_phases(activity.prerequisite)
+        unknown = sorted(set(required) - phases)
+        if unknown:
+            raise ValueError(f"{activity.code} requires unknown phases: {', '.join(unknown)}")
+        activity_requirements.append(required)
+        direct_requirements[activity.phase].update(required)
+
+    phase_order = _order_phases(direct_requirements)
+    phase_ids = {phase: phase_id for phase_id, phase in enumerate(phase_order)}
+
+    # Phases are ordered prerequisites-first, so each phase's closure only needs earlier closures.
+    closures: dict[str, int] = {}
+    for phase in phase_order:
+        mask = 0
+        for required in direct_requirements[phase] - {phase}:
+            mask |= 1 << phase_ids[required] | closures[required]
+        closures[phase] = mask
+
+    required_phase_masks = []
+    for required in activity_requirements:
+        mask = 0
+        for phase in required:
+            mask |= 1 << phase_ids[phase] | closures[phase]
+        required_phase_masks.append(mask)
+
+    return CatalogIndex(
+        index_by_code=MappingProxyType({activity.code: index for index, activity in enumerate(activities)}),
+        codes_by_phase=MappingProxyType(
+            {
+                phase: tuple(activity.code for activity in activities if activity.phase == phase)
+                for phase in phase_order
+            }
+        ),
+        phase_ids=tuple(phase_ids[activity.phase] for activity in activities),
+        required_phase_masks=tuple(required_phase_masks),
+        phase_order=phase_order,
+    )
+
+
+def _order_phases(direct_requirements: Mapping[str, set[str]]) -> tuple[str, ...]:
+    ordered: list[str] = []
+    remaining = dict(direct_requirements)
+    while remaining:
+        ready = sorted(
+            phase for phase, required in remaining.items() if required - {phase} <= set(ordered)
+        )
+        if not ready:
+            raise ValueError(f"Circular prerequisites between phases: {', '.join(sorted(remaining))}")
+        ordered.extend(ready)
+        for phase in ready:
+            del remaining[phase]
+    return tuple(ordered)
@@ -0,0 +1,200 @@
+"""Circuit breaker around the Google Sheets submission stores.
+
+After ``failure_threshold`` consecutive failed appends (each already retried by the store), the
+breaker opens. While it is open, appends skip Sheets. They go to the fallback store if there is one,
+and otherwise fail at once with ``CircuitOpenError``. After ``reset_timeout_seconds`` a single
+trial append is let through (half-open). If it succeeds the breaker closes; otherwise it opens again.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from .async_submission_store import append_submission_async
+from .submission_store import (
+    SubmissionRecord,
+    SubmissionStoreError,
+    close_submission_store,
+    iter_wrapped_stores,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(SubmissionStoreError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_timeout_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether to call the upstream now; in half-open state only one caller at a time gets ``True``."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_seconds:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Google Sheets circuit closed again.")
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(
+                        "Google Sheets circuit opened after %d consecutive failures; retrying in %.0fs.",
+                        self._consecutive_failures,
+                        self.reset_timeout_seconds,
+                    )
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+    def release_trial(self) -> None:
+        """End an append that was interrupted (e.g. cancelled) without a verdict on the upstream."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class CircuitBreakerSubmissionStore:
+    """Wraps a sync store (e.g. ``GoogleSheetsSubmissionStore``) with a ``CircuitBreaker``."""
+
+    def __init__(self, store: object, breaker: CircuitBreaker, *, fallback: object | None = None) -> None:
+        self.store = store
+        self.breaker = breaker
+        self.fallback = fallback
+
+    def append_submission(self, **kwargs: object) -> None:
+        self.append_submissions([SubmissionRecord(**kwargs)])
+
+    def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        if not self.breaker.allow():
+            self._divert(records)
+            return
+        try:
+            _append_records(self.store, records)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Otherwise an interrupted half-open trial would keep the breaker from ever trying again.
+            self.breaker.release_trial()
+            raise
+        self.breaker.record_success()
+
+    def health(self) -> dict[str, str]:
+        return _health(self)
+
+    def close(self) -> None:
+        close_submission_store(self.store)
+        if self.fallback is not None:
+            close_submission_store(self.fallback)
+
+    def _divert(self, records: list[SubmissionRecord]) -> None:
+        if self.fallback is None:
+            raise CircuitOpenError("Google Sheets circuit is open; submission not written.")
+        _append_records(self.fallback, records)
+
+
+class AsyncCircuitBreakerSubmissionStore:
+    """Wraps ``AsyncGoogleSheetsSubmissionStore`` with a ``CircuitBreaker``; the fallback may be sync."""
+
+    def __init__(self, store: object, breaker: CircuitBreaker, *, fallback: object | None = None) -> None:
+        self.store = store
+        self.breaker = breaker
+        self.fallback = fallback
+
+    async def append_submission(self, **kwargs: object) -> None:
+        await self.append_submissions([SubmissionRecord(**kwargs)])
+
+    async def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        if not self.breaker.allow():
+            if self.fallback is None:
+                raise CircuitOpenError("Google Sheets circuit is open; submission not written.")
+            for record in records:
+                await append_submission_async(self.fallback, **record.as_kwargs())
+            return
+        try:
+            await self.store.append_submissions(records)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # A cancelled half-open trial (e.g. the client went away) must not hold the trial slot.
+            self.breaker.release_trial()
+            raise
+        self.breaker.record_success()
+
+    def health(self) -> dict[str, str]:
+        return _health(self)
+
+    async def aclose(self) -> None:
+        await self.store.aclose()
+        if self.fallback is not None:
+            close_submission_store(self.fallback)
+
+
+BreakerStore = CircuitBreakerSubmissionStore | AsyncCircuitBreakerSubmissionStore
+
+
+def find_circuit_breaker_store(store: object) -> BreakerStore | None:
+    """The breaker wrapper in a chain of wrapping stores (e.g. the write-behind queue), if any."""
+    for wrapped in iter_wrapped_stores(store):
+        if isinstance(wrapped, (CircuitBreakerSubmissionStore, AsyncCircuitBreakerSubmissionStore)):
+            return wrapped
+    return None
+
+
+def _append_records(store: object, records: list[SubmissionRecord]) -> None:
+    append_submissions = getattr(store, "append_submissions", None)
+    if callable(append_submissions):
+        append_submissions(records)
+        return
+    for record in records:
+        store.append_submission(**record.as_kwargs())
+
+
+def _health(wrapper: BreakerStore) -> dict[str, str]:
+    health = {"circuit": wrapper.breaker.state}
+    if wrapper.fallback is not None:
+        health["fallback"] = type(wrapper.fallback).__name__
+    return health
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import csv
+import io
 import json
 import re
 from dataclasses import dataclass
-from functools import lru_cache
 from pathlib import Path
 
 
@@ -59,36 +59,30 @@ def _split_activity_name(raw_name: str) -> tuple[str, str]:
     return name, code
 
 
-@lru_cache(maxsize=1)
-def load_questions() -> tuple[Question, ...]:
-    raw = json.loads(QUESTIONS_PATH.read_text(encoding="utf-8"))
+def parse_questions(text: str) -> tuple[Question, ...]:
+    raw = json.loads(text)
     return tuple(Question(statement=item["statement"], tags=tuple(item["tags"])) for item in raw)
 
 
-@lru_cache(maxsize=1)
-def load_activities() -> tuple[Activity, ...]:
+def parse_activities(text: str) -> tuple[Activity, ...]:
     activities: list[Activity] = []
-    with ORDER_PATH.open(newline="", encoding="utf-8") as csv_file:
-        reader = csv.DictReader(csv_file, skipinitialspace=True)
-        for row in reader:
-            normalized_row = {key.strip(): (value or "").strip() for key, value in row.items()}
-            raw_name = normalized_row["Activity"]
-            name, code = _split_activity_name(raw_name)
-            activities.append(
-                Activity(
-                    code=code,
-                    name=name,
-                    phase=normalized_row["Phase"],
-                    prerequisite=normalized_row["Prerequisite"].strip("`"),
-                )
+    reader = csv.DictReader(io.StringIO(text, newline=""), skipinitialspace=True)
+    for row in reader:
+        normalized_row = {key.strip(): (value or "").strip() for key, value in row.items()}
+        raw_name = normalized_row["Activity"]
+        name, code = _split_activity_name(raw_name)
+        activities.append(
+            Activity(
+                code=code,
+                name=name,
+                phase=normalized_row["Phase"],
+                prerequisite=normalized_row["Prerequisite"].strip("`"),
             )
+        )
     return tuple(activities)
 
 
-@lru_cache(maxsize=1)
-def load_activity_descriptions() -> dict[str, str]:
-    text = DESCRIPTIONS_PATH.read_text(encoding="utf-8")
-
+def parse_activity_descriptions(text: str) -> dict[str, str]:
     descriptions = {
         "VAL": "Clarifies your core career values so decisions align with what matters most.",
         "STR": "Identifies natural strengths you can build into confident career direction.",
@@ -104,3 +98,25 @@ def load_activity_descriptions() -> dict[str, str]:
         raise ValueError("descriptions.txt format looks unexpected")
 
     return descriptions
+
+
+# The loaders below read from the current catalog snapshot (see ``app.catalog``), which is reloaded
+# when the data files change. Imported lazily: the catalog module parses files with this one.
+
+
+def load_questions() -> tuple[Question, ...]:
+    from .catalog import current_catalog
+
+    return current_catalog().questions
+
+
+def load_activities() -> tuple[Activity, ...]:
+    from .catalog import current_catalog
+
+    return current_catalog().activities
+
+
+def load_activity_descriptions() -> dict[str, str]:
+    from .catalog import current_catalog
+
+    return current_catalog().descriptions
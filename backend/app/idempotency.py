@@ -0,0 +1,222 @@
+"""Replay of scoring responses for retried requests that carry an ``Idempotency-Key``.
+
+``IdempotencyIndex`` maps a client's key to the response body it was first given, for
+``ttl_seconds`` and for at most ``capacity`` keys. A retry with the same key gets the same body back,
+and no second submission is stored. Keys are kept in insertion order. With a single TTL that is also
+expiry order, so expired keys are dropped from the front and each lookup is one dictionary access.
+
+A key being scored is held ``in progress`` until its response is recorded. A concurrent duplicate is
+refused rather than scored twice. A key sent again with different answers is refused too.
+
+With a ``path``, completed keys are also written to an ``idempotency_keys`` table in that SQLite
+file (the local submission journal), so that replays survive restarts and are shared by the workers
+on one host. Keys in progress are only known to the process that holds them. The table is read and
+written outside the in-memory lock, with a short busy timeout. If the file stays locked, the lookup
+or write is skipped and the index works from memory, so ``begin`` and ``complete`` block for a
+fraction of a second at most. Callers on an event loop still run them in the threadpool when the
+index is ``persistent``.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 128
+_BUSY_TIMEOUT_SECONDS = 0.25
+# Expired rows are deleted from the persistent table once every this many writes.
+_PURGE_EVERY_WRITES = 256
+
+_IN_PROGRESS = object()
+
+
+class IdempotencyError(Exception):
+    pass
+
+
+class IdempotencyKeyInProgress(IdempotencyError):
+    pass
+
+
+class IdempotencyKeyMismatch(IdempotencyError):
+    pass
+
+
+@dataclass(frozen=True)
+class IdempotencyStats:
+    size: int
+    capacity: int
+    replays: int
+    evictions: int
+
+
+def validate_idempotency_key(key: str) -> str:
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+        raise ValueError(f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} printable characters.")
+    return key
+
+
+class IdempotencyIndex:
+    def __init__(
+        self,
+        capacity: int,
+        ttl_seconds: float,
+        *,
+        path: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+        # key -> (expires_at, fingerprint, response body or _IN_PROGRESS)
+        self._entries: OrderedDict[str, tuple[float, int | None, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._replays = 0
+        self._evictions = 0
+
+        self._connection: sqlite3.Connection | None = None
+        # Serializes use of the connection; never held together with ``_lock``.
+        self._connection_lock = threading.Lock()
+        self._writes = 0
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # A lost replay entry costs one duplicate row, not a lost submission; skip the fsync per write.
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                "key TEXT PRIMARY KEY, fingerprint INTEGER, response BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idempotency_keys_expiry ON idempotency_keys (expires_at)"
+            )
+
+    @property
+    def persistent(self) -> bool:
+        return self._connection is not None
+
+    def begin(self, key: str, fingerprint: int | None = None) -> bytes | None:
+        """The recorded response for ``key``, or None after reserving it for the caller to complete.
+
+        ``fingerprint`` identifies the request body; None skips the check. Raises
+        ``IdempotencyKeyInProgress`` or ``IdempotencyKeyMismatch``.
+        """
+        now = self._clock()
+        with self._lock:
+            self._expire_locked(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                # Loaded from the table behind fresher keys, so not reached by ``_expire_locked``.
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                return self._replay_locked(key, entry, fingerprint)
+            # Reserved before the table is read, so a concurrent duplicate is refused meanwhile.
+            self._insert_locked(key, (now + self.ttl_seconds, fingerprint, _IN_PROGRESS))
+
+        loaded = self._load(key, now) if self._connection is not None else None
+        if loaded is None:
+            return None
+        with self._lock:
+            # Cached with its original expiry, which is checked above.
+            self._entries.pop(key, None)
+            self._insert_locked(key, loaded)
+            return self._replay_locked(key, loaded, fingerprint)
+
+    def complete(self, key: str, response: bytes, fingerprint: int | None = None) -> None:
+        now = self._clock()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._entries.pop(key, None)
+            self._insert_locked(key, (expires_at, fingerprint, response))
+        if self._connection is None:
+            return
+        with self._connection_lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, response, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, fingerprint, response, expires_at),
+                )
+                self._writes += 1
+                if self._writes % _PURGE_EVERY_WRITES == 0:
+                    self._connection.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+            except sqlite3.OperationalError:
+                # Only this process can replay the key now; a retry sent to another worker is scored again.
+                logger.warning("Could not persist idempotency key; it is kept in memory only.", exc_info=True)
+
+    def abandon(self, key: str) -> None:
+        """Release a key whose request failed, so a retry is processed afresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is _IN_PROGRESS:
+                del self._entries[key]
+
+    def stats(self) -> IdempotencyStats:
+        with self._lock:
+            return IdempotencyStats(
+                size=len(self._entries),
+                capacity=self.capacity,
+                replays=self._replays,
+                evictions=self._evictions,
+            )
+
+    def close(self) -> None:
+        with self._connection_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _insert_locked(self, key: str, entry: tuple[float, int | None, object]) -> None:
+        self._entries[key] = entry
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _expire_locked(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            key, (expires_at, _, _) = next(iter(entries.items()))
+            if expires_at > now:
+                return
+            del entries[key]
+
+    def _replay_locked(self, key: str, entry: tuple[float, int | None, object], fingerprint: int | None) -> bytes:
+        _, recorded_fingerprint, response = entry
+        if response is _IN_PROGRESS:
+            raise IdempotencyKeyInProgress(key)
+        if None not in (fingerprint, recorded_fingerprint) and fingerprint != recorded_fingerprint:
+            raise IdempotencyKeyMismatch(key)
+        self._replays += 1
+        return response
+
+    def _load(self, key: str, now: float) -> tuple[float, int | None, object] | None:
+        with self._connection_lock:
+            if self._connection is None:
+                return None
+            try:
+                row = self._connection.execute(
+                    "SELECT fingerprint, response, expires_at FROM idempotency_keys WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+            except sqlite3.OperationalError:
+                logger.warning("Could not read idempotency key; treating it as new.", exc_info=True)
+                return None
+        if row is None:
+            return None
+        fingerprint, response, expires_at = row
+        return (expires_at, fingerprint, bytes(response))
@@ -1,18 +1,82 @@
+import asyncio
+import hmac
 import json
 import logging
 import os
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import cast
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-
-from .data_loader import load_activities, load_activity_descriptions, load_questions
-from .models import QuestionItem, QuestionsResponse, RecommendationRequest, RecommendationResponse
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from .admission import Admission, AdmissionController, AdmissionRejected
+from .analytics import iter_csv_chunks, open_submission_pages, summarize
+from .async_submission_store import aclose_submission_store, append_submission_async
+from .batch_scoring import (
+    NDJSON_MEDIA_TYPE,
+    BatchUploadTooLarge,
+    iter_json_array_items,
+    iter_ndjson_items,
+    spool_upload,
+    starts_with_json_array,
+    stream_batch_results,
+)
+from .circuit_breaker import CLOSED as CIRCUIT_CLOSED, find_circuit_breaker_store
+from .catalog import CatalogSnapshot, CatalogValidationError, CatalogWatcher, current_catalog, reload_catalog
+from .idempotency import (
+    IdempotencyIndex,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyMismatch,
+    validate_idempotency_key,
+)
+from .metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY,
+    SUBMISSION_APPEND_DURATION,
+    MetricFamily,
+    MetricsMiddleware,
+    MultiprocessMetrics,
+    counter_family,
+    gauge,
+    render_text,
+)
+from .models import (
+    QuestionsResponse,
+    RecommendationRequest,
+    RecommendationResponse,
+    ScoringSessionAnswer,
+    ScoringSessionResponse,
+    SensitivityResponse,
+)
+from .profiling import ProfileDirectory, ProfilingMiddleware
+from .recommendation_cache import RecommendationCache, pack_response_codes, unpack_response_codes
+from .recommendation_response import render_recommendation_response
+from .sensitivity import analyze_sensitivity, render_sensitivity
 from .settings import Settings, load_settings_from_env
-from .scoring import build_recommendation_payload
-from .submission_store import SubmissionStoreError, build_visitor_hash, create_submission_store
+from .scoring import (
+    RESPONSE_OPTION_ORDER,
+    decode_response_digits,
+    encode_responses,
+    select_recommendations_for_total,
+)
+from .scoring_sessions import (
+    ScoringSessionIncomplete,
+    ScoringSessionNotFound,
+    ScoringSessionStore,
+    iter_session_events,
+)
+from .submission_store import (
+    SubmissionStoreError,
+    build_visitor_hash,
+    create_submission_store,
+)
+from .warmup import Warmup
 
 
 DEFAULT_CORS_ORIGINS = ("http://localhost:3000",)
@@ -47,88 +111,597 @@ def parse_cors_origins(raw_value: str | None) -> list[str]:
     return filtered_origins or list(DEFAULT_CORS_ORIGINS)
 
 
-CORS_ALLOW_ORIGINS = parse_cors_origins(os.getenv("CORS_ALLOW_ORIGINS"))
-CORS_ALLOW_ORIGIN_REGEX = normalize_origin(os.getenv("CORS_ALLOW_ORIGIN_REGEX") or "") or None
-
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="DCCD Career Diagnostic API", version="0.1.0")
-app.state.settings = load_settings_from_env()
-app.state.submission_store = create_submission_store(app.state.settings)
-if app.state.settings.enable_visitor_hash and not app.state.settings.visitor_hash_secret:
-    logger.warning("ENABLE_VISITOR_HASH is true, but VISITOR_HASH_SECRET is missing. visitor_hash will be omitted.")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=CORS_ALLOW_ORIGINS,
-    allow_origin_regex=CORS_ALLOW_ORIGIN_REGEX,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = cast(Settings, app.state.settings)
+    watcher = CatalogWatcher(interval_seconds=settings.catalog_watch_interval_seconds)
+    if settings.catalog_watch_enabled:
+        watcher.start()
+    multiprocess_metrics = cast(MultiprocessMetrics | None, app.state.multiprocess_metrics)
+    if multiprocess_metrics is not None:
+        multiprocess_metrics.start()
+    warmup_task = None
+    if settings.startup_warmup_enabled:
+        # In the background, so the port opens at once; /api/v1/ready reports 503 until it finishes.
+        app.state.warmup = Warmup(
+            app.state.submission_store,
+            token_refresh_interval_seconds=settings.google_token_refresh_interval_seconds,
+        )
+        warmup_task = asyncio.create_task(app.state.warmup.run())
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+        app.state.warmup.stop()
+    watcher.stop()
+    if multiprocess_metrics is not None:
+        multiprocess_metrics.stop()
+    # Drains any write-behind queue so pending submissions are not lost on shutdown.
+    await aclose_submission_store(app.state.submission_store)
+    if app.state.idempotency is not None:
+        app.state.idempotency.close()
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build the API; settings and CORS origins are read from the environment unless given.
+
+    Nothing is built at import time. ``app`` below is created on first access, and
+    ``uvicorn --factory app.main:create_app`` skips the module attribute altogether.
+    """
+    settings = settings or load_settings_from_env()
+    app = FastAPI(title="DCCD Career Diagnostic API", version="0.1.0", lifespan=lifespan)
+    app.state.settings = settings
+    app.state.submission_store = create_submission_store(settings)
+    app.state.recommendation_cache = RecommendationCache(settings.recommendation_cache_size)
+    app.state.scoring_sessions = ScoringSessionStore(
+        settings.scoring_session_capacity,
+        settings.scoring_session_ttl_seconds,
+    )
+    app.state.admission = (
+        AdmissionController(
+            max_concurrency=settings.admission_max_concurrency,
+            max_queue=settings.admission_max_queue,
+            max_wait_seconds=settings.admission_max_wait_seconds,
+            client_rate_per_second=settings.admission_client_rate_per_second,
+            client_burst=settings.admission_client_burst,
+            storage_shed_ratio=settings.admission_storage_shed_ratio,
+        )
+        if settings.admission_control_enabled
+        else None
+    )
+    app.state.idempotency = _create_idempotency_index(settings)
+    app.state.warmup = None
+    app.state.multiprocess_metrics = (
+        MultiprocessMetrics(
+            REGISTRY,
+            settings.metrics_multiproc_dir,
+            interval_seconds=settings.metrics_write_interval_seconds,
+        )
+        if settings.metrics_multiproc_dir
+        else None
+    )
+    if settings.enable_visitor_hash and not settings.visitor_hash_secret:
+        logger.warning("ENABLE_VISITOR_HASH is true, but VISITOR_HASH_SECRET is missing. visitor_hash will be omitted.")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=parse_cors_origins(os.getenv("CORS_ALLOW_ORIGINS")),
+        allow_origin_regex=normalize_origin(os.getenv("CORS_ALLOW_ORIGIN_REGEX") or "") or None,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Read by the frontend's retry logic.
+        expose_headers=["Retry-After", "Idempotent-Replayed"],
+    )
+    if settings.profiling_enabled:
+        app.add_middleware(
+            ProfilingMiddleware,
+            directory=ProfileDirectory(settings.profiling_dir, max_files=settings.profiling_max_files),
+            sample_every=settings.profiling_sample_every,
+            secret=settings.admin_api_token,
+        )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+    app.include_router(router)
+    # One app per process; the most recently built one is the one scraped.
+    REGISTRY.register_collector(lambda: _collect_app_metrics(app), key="app")
+    return app
+
+
+def _create_idempotency_index(settings: Settings) -> IdempotencyIndex | None:
+    if settings.idempotency_cache_size == 0:
+        return None
+    path = None
+    if settings.idempotency_persistent:
+        if settings.submission_journal_path:
+            path = settings.submission_journal_path
+        else:
+            logger.warning(
+                "IDEMPOTENCY_PERSISTENT is true, but SUBMISSION_JOURNAL_PATH is missing. Keys stay in memory."
+            )
+    return IdempotencyIndex(settings.idempotency_cache_size, settings.idempotency_ttl_seconds, path=path)
+
+
+router = APIRouter()
 
 
-@app.get("/health")
-@app.get("/api/v1/health")
-def health() -> dict[str, str]:
+@router.get("/health")
+@router.get("/api/v1/health")
+async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.get("/api/v1/ready")
-def ready() -> dict[str, str]:
+@router.get("/api/v1/ready")
+def ready(request: Request) -> dict[str, object]:
+    warmup = cast(Warmup | None, request.app.state.warmup)
+    if warmup is not None and warmup.warming:
+        raise HTTPException(status_code=503, detail="Warming up.")
+
     try:
-        load_questions()
-        load_activities()
-        load_activity_descriptions()
+        current_catalog()
     except Exception:
         logger.exception("Readiness check failed while loading backend data")
         raise HTTPException(status_code=503, detail="Backend data dependencies are unavailable.")
 
-    return {"status": "ok"}
+    status: dict[str, object] = {"status": "ok"}
+    # Reported, not failed on: with the circuit open, recommendations are still served.
+    breaker_store = find_circuit_breaker_store(request.app.state.submission_store)
+    if breaker_store is not None:
+        status["submission_store"] = breaker_store.health()
+    return status
+
+
+@router.get("/api/v1/questions", response_model=QuestionsResponse)
+async def questions(request: Request) -> Response:
+    # Pre-rendered per catalog version; revalidation only needs the ETag.
+    settings = cast(Settings, request.app.state.settings)
+    return current_catalog().questions_document.response(
+        request,
+        cache_control=f"public, max-age={settings.questions_cache_max_age_seconds}",
+    )
+
+
+@router.post("/api/v1/recommendations", response_model=RecommendationResponse)
+async def recommendations(payload: RecommendationRequest, request: Request) -> Response:
+    """Score a survey and store it; retries sent with the same ``Idempotency-Key`` replay the first response."""
+    codes = _response_codes(payload)
+    fingerprint = pack_response_codes(codes)
+    idempotency_key, replayed = await _begin_idempotent_request(request, fingerprint)
+    if replayed is not None:
+        return replayed
+    try:
+        content = await _score_and_store(request, codes)
+    except BaseException:
+        _abandon_idempotent_request(request, idempotency_key)
+        raise
+    await _complete_idempotent_request(request, idempotency_key, content, fingerprint)
+
+    # Written from pre-encoded fragments; the shape is still documented by ``response_model``.
+    return Response(content=content, media_type="application/json")
+
+
+async def _score_and_store(request: Request, codes: list[int]) -> bytes:
+    admission = await _admit(request)
+    try:
+        # Scored and stamped against one snapshot, even if the catalog is reloaded meanwhile.
+        catalog = current_catalog()
+        cache = cast(RecommendationCache, request.app.state.recommendation_cache)
+        selected, prerequisite_note = cache.selection(codes, catalog)
+        if admission is None or not admission.shed_storage:
+            await _store_submission(request, catalog, codes, selected)
+    finally:
+        if admission is not None:
+            admission.release()
+    return render_recommendation_response(catalog, selected, prerequisite_note)
+
+
+@router.post("/api/v1/recommendations:sensitivity", response_model=SensitivityResponse)
+async def recommendations_sensitivity(payload: RecommendationRequest) -> dict[str, object]:
+    """For each question and each other answer to it, the recommendations with that one answer changed.
+
+    ``top_flips`` lists the single changes that move the first recommendation. Nothing is stored.
+    """
+    catalog = current_catalog()
+    return render_sensitivity(analyze_sensitivity(_response_codes(payload), catalog), catalog)
+
+
+@router.post("/api/v1/sessions", response_model=ScoringSessionResponse, status_code=201)
+async def create_scoring_session(request: Request) -> ScoringSessionResponse:
+    """Start a survey scored as it is answered; follow it at ``/api/v1/sessions/{id}/events``."""
+    session = cast(ScoringSessionStore, request.app.state.scoring_sessions).create()
+    return ScoringSessionResponse(session_id=session.session_id, total_questions=len(session.answers))
+
+
+@router.put("/api/v1/sessions/{session_id}/answers/{question_id}", status_code=204)
+async def answer_scoring_session(
+    session_id: str,
+    question_id: int,
+    payload: ScoringSessionAnswer,
+    request: Request,
+) -> Response:
+    sessions = cast(ScoringSessionStore, request.app.state.scoring_sessions)
+    try:
+        sessions.answer(session_id, question_id - 1, payload.code)
+    except ScoringSessionNotFound:
+        raise HTTPException(status_code=404, detail="Unknown or expired session.")
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return Response(status_code=204)
+
+
+@router.get("/api/v1/sessions/{session_id}/events", response_class=StreamingResponse)
+async def scoring_session_events(session_id: str, request: Request) -> StreamingResponse:
+    """Server-Sent Events: a ``scores`` event with the provisional top-K after every answer."""
+    sessions = cast(ScoringSessionStore, request.app.state.scoring_sessions)
+    try:
+        session = sessions.get(session_id)
+    except ScoringSessionNotFound:
+        raise HTTPException(status_code=404, detail="Unknown or expired session.")
+    return StreamingResponse(
+        iter_session_events(sessions, session),
+        media_type="text/event-stream",
+        # Proxies must pass each event on as it is written.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/api/v1/sessions/{session_id}/submit", response_model=RecommendationResponse)
+async def submit_scoring_session(session_id: str, request: Request) -> Response:
+    """Final recommendations for a fully answered session, selected from its running total.
+
+    A retry with the same ``Idempotency-Key`` replays the response after the session is gone.
+    """
+    idempotency_key, replayed = await _begin_idempotent_request(request, None)
+    if replayed is not None:
+        return replayed
+    try:
+        content, fingerprint = await _submit_session(request, session_id)
+    except BaseException:
+        _abandon_idempotent_request(request, idempotency_key)
+        raise
+    # Keyed by the answers too, so a fallback to /api/v1/recommendations with the same key replays it.
+    await _complete_idempotent_request(request, idempotency_key, content, fingerprint)
+    return Response(content=content, media_type="application/json")
+
+
+async def _submit_session(request: Request, session_id: str) -> tuple[bytes, int]:
+    sessions = cast(ScoringSessionStore, request.app.state.scoring_sessions)
+    # Admitted before the session is consumed, so a rejected client can retry it.
+    admission = await _admit(request)
+    try:
+        try:
+            session = sessions.submit(session_id)
+        except ScoringSessionNotFound:
+            raise HTTPException(status_code=404, detail="Unknown or expired session.")
+        except ScoringSessionIncomplete as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+
+        catalog = session.catalog
+        selected, prerequisite_note = select_recommendations_for_total(session.total, catalog)
+        if admission is None or not admission.shed_storage:
+            await _store_submission(request, catalog, session.answers, selected)
+    finally:
+        if admission is not None:
+            admission.release()
+    return render_recommendation_response(catalog, selected, prerequisite_note), pack_response_codes(session.answers)
+
+
+@router.post(
+    "/api/v1/recommendations:batch",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/RecommendationRequest"}}
+                },
+                NDJSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/RecommendationRequest"}},
+            },
+        }
+    },
+)
+async def recommendations_batch(
+    request: Request,
+    store: str = Query("skip", pattern="^(skip|bulk)$"),
+) -> StreamingResponse:
+    """Score many surveys in one request and stream one NDJSON result line per input, in order.
+
+    Send a JSON array, or NDJSON (one request body per line) for large uploads. With ``store=bulk``
+    (admin token required) the scored submissions are written to submission storage in batches; by
+    default they are not stored.
+    """
+    settings = cast(Settings, request.app.state.settings)
+    if store == "bulk":
+        _require_admin_token(request=request, settings=settings)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type not in {"", "application/json", NDJSON_MEDIA_TYPE}:
+        raise HTTPException(status_code=415, detail=f"Use application/json or {NDJSON_MEDIA_TYPE}.")
+
+    max_bytes = settings.batch_max_upload_bytes
+    too_large = HTTPException(status_code=413, detail=f"Upload must be at most {max_bytes} bytes.")
+    try:
+        declared_length = int(request.headers.get("content-length", "0"))
+    except ValueError:
+        declared_length = 0
+    if declared_length > max_bytes:
+        raise too_large
+    try:
+        upload = await spool_upload(request.stream(), max_bytes=max_bytes)
+    except BatchUploadTooLarge:
+        raise too_large from None
+    if content_type == NDJSON_MEDIA_TYPE:
+        items = iter_ndjson_items(upload)
+    elif await run_in_threadpool(starts_with_json_array, upload):
+        items = iter_json_array_items(upload)
+    else:
+        upload.close()
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array.")
+
+    return StreamingResponse(
+        stream_batch_results(
+            items,
+            store=request.app.state.submission_store,
+            schema_version=settings.schema_version,
+            store_mode=store,
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> Response:
+    settings = cast(Settings, request.app.state.settings)
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    multiprocess_metrics = cast(MultiprocessMetrics | None, request.app.state.multiprocess_metrics)
+    families = multiprocess_metrics.collect() if multiprocess_metrics is not None else REGISTRY.collect()
+    return Response(content=render_text(families), media_type=METRICS_CONTENT_TYPE)
+
+
+def _collect_app_metrics(app: FastAPI) -> Iterator[MetricFamily]:
+    cache_stats = cast(RecommendationCache, app.state.recommendation_cache).stats()
+    yield counter_family("recommendation_cache_hits", "Recommendation cache hits.", cache_stats.hits)
+    yield counter_family("recommendation_cache_misses", "Recommendation cache misses.", cache_stats.misses)
+    yield counter_family("recommendation_cache_evictions", "Recommendation cache LRU evictions.", cache_stats.evictions)
+    yield gauge("recommendation_cache_entries", "Recommendation cache entries.", cache_stats.size)
+
+    admission = cast(AdmissionController | None, app.state.admission)
+    if admission is not None:
+        admission_stats = admission.stats()
+        yield gauge("admission_in_flight", "Scoring requests holding an admission slot.", admission_stats.in_flight)
+        yield gauge("admission_queued", "Scoring requests waiting for an admission slot.", admission_stats.queued)
+        yield counter_family("admission_admitted", "Scoring requests admitted.", admission_stats.admitted)
+        yield counter_family(
+            "admission_queued_admitted",
+            "Scoring requests admitted after waiting in the queue.",
+            admission_stats.queued_total,
+        )
+        yield MetricFamily(
+            "admission_rejected",
+            "counter",
+            "Scoring requests rejected by admission control.",
+            [
+                ("_total", {"reason": reason}, float(getattr(admission_stats, f"rejected_{reason}")))
+                for reason in ("rate_limited", "queue_full", "deadline")
+            ],
+        )
+        yield counter_family(
+            "admission_storage_shed",
+            "Admitted scoring requests whose submission write was skipped under load.",
+            admission_stats.storage_shed,
+        )
+
+    idempotency = cast(IdempotencyIndex | None, app.state.idempotency)
+    if idempotency is not None:
+        idempotency_stats = idempotency.stats()
+        yield gauge("idempotency_keys", "Idempotency keys held in memory.", idempotency_stats.size)
+        yield counter_family(
+            "idempotency_replays",
+            "Retried requests answered from the idempotency index without scoring or storing.",
+            idempotency_stats.replays,
+        )
+        yield counter_family(
+            "idempotency_evictions",
+            "Idempotency keys evicted from memory before they expired.",
+            idempotency_stats.evictions,
+        )
+
+    session_stats = cast(ScoringSessionStore, app.state.scoring_sessions).stats()
+    yield gauge("scoring_sessions", "Open progressive scoring sessions.", session_stats.size)
+    for outcome in ("created", "submitted", "evicted", "expired"):
+        yield counter_family(
+            f"scoring_sessions_{outcome}",
+            f"Progressive scoring sessions {outcome}.",
+            getattr(session_stats, outcome),
+        )
+
+    breaker_store = find_circuit_breaker_store(app.state.submission_store)
+    if breaker_store is not None:
+        yield gauge(
+            "submission_store_circuit_open",
+            "1 while the Google Sheets circuit breaker is open or half-open.",
+            int(breaker_store.breaker.state != CIRCUIT_CLOSED),
+            merge="max",
+        )
+
+    stats = getattr(app.state.submission_store, "stats", None)
+    if callable(stats):
+        queue_stats = stats()
+        yield gauge("submission_queue_depth", "Submissions waiting to be written.", queue_stats.depth)
+        yield gauge(
+            "submission_queue_oldest_pending_age_seconds",
+            "Age of the oldest queued submission.",
+            queue_stats.oldest_pending_age_seconds,
+            merge="max",
+        )
+        for outcome in ("enqueued", "written", "failed", "dropped", "spilled"):
+            yield counter_family(
+                f"submission_queue_{outcome}",
+                f"Submissions {outcome} by the write-behind queue.",
+                getattr(queue_stats, outcome),
+            )
+
+
+@router.post("/api/v1/admin/catalog:reload", include_in_schema=False)
+def reload_catalog_endpoint(request: Request) -> dict[str, object]:
+    """Re-read the data files now instead of waiting for the file watcher."""
+    settings = cast(Settings, request.app.state.settings)
+    _require_admin_token(request=request, settings=settings)
+
+    try:
+        snapshot, changed = reload_catalog()
+    except (CatalogValidationError, OSError) as exc:
+        logger.exception("Catalog reload failed")
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return {"version": snapshot.version, "changed": changed}
+
+
+@router.get("/api/v1/admin/submissions:export", include_in_schema=False)
+def export_submissions(
+    request: Request,
+    format: str = Query("summary", pattern="^(summary|csv)$"),
+) -> Response:
+    """Aggregate statistics of every stored submission (``format=summary``), or the rows as CSV."""
+    settings = cast(Settings, request.app.state.settings)
+    _require_admin_token(request=request, settings=settings)
+
+    try:
+        pages = open_submission_pages(settings)
+    except SubmissionStoreError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+
+    if format == "csv":
+        # Streamed page by page; the sync generator is iterated in the threadpool.
+        return StreamingResponse(
+            iter_csv_chunks(pages),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="submissions.csv"'},
+        )
+    try:
+        aggregates = summarize(pages)
+    except SubmissionStoreError as exc:
+        logger.exception("Submission export failed")
+        raise HTTPException(status_code=502, detail=str(exc))
+    return Response(content=json.dumps(aggregates.as_dict()), media_type="application/json")
+
+
+async def _begin_idempotent_request(
+    request: Request, fingerprint: int | None
+) -> tuple[str | None, Response | None]:
+    """``(key, None)`` for a request to process, or ``(key, response)`` replaying an earlier one."""
+    index = cast(IdempotencyIndex | None, request.app.state.idempotency)
+    raw_key = request.headers.get("idempotency-key")
+    if index is None or raw_key is None:
+        return None, None
+    try:
+        key = validate_idempotency_key(raw_key)
+        # A persistent index may read the SQLite file, which must not block the event loop.
+        if index.persistent:
+            replayed = await run_in_threadpool(index.begin, key, fingerprint)
+        else:
+            replayed = index.begin(key, fingerprint)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except IdempotencyKeyInProgress:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed.",
+            headers={"Retry-After": "1"},
+        )
+    except IdempotencyKeyMismatch:
+        raise HTTPException(status_code=422, detail="This Idempotency-Key was used with different answers.")
+    if replayed is None:
+        return key, None
+    return key, Response(content=replayed, media_type="application/json", headers={"Idempotent-Replayed": "true"})
+
+
+async def _complete_idempotent_request(request: Request, key: str | None, content: bytes, fingerprint: int) -> None:
+    if key is None:
+        return
+    index = cast(IdempotencyIndex, request.app.state.idempotency)
+    if index.persistent:
+        await run_in_threadpool(index.complete, key, content, fingerprint)
+    else:
+        index.complete(key, content, fingerprint)
 
 
-@app.get("/api/v1/questions", response_model=QuestionsResponse)
-def questions() -> QuestionsResponse:
-    loaded_questions = load_questions()
-    return QuestionsResponse(
-        questions=[
-            QuestionItem(id=index + 1, statement=question.statement)
-            for index, question in enumerate(loaded_questions)
-        ]
+def _abandon_idempotent_request(request: Request, key: str | None) -> None:
+    if key is not None:
+        cast(IdempotencyIndex, request.app.state.idempotency).abandon(key)
+
+
+async def _admit(request: Request) -> Admission | None:
+    """Wait for admission when admission control is on; rejected requests get a 429 or 503."""
+    controller = cast(AdmissionController | None, request.app.state.admission)
+    if controller is None:
+        return None
+    settings = cast(Settings, request.app.state.settings)
+    client_key = (
+        _extract_visitor_hash(request=request, settings=settings) or _extract_client_ip(request) or "unknown"
     )
+    try:
+        return await controller.admit(client_key)
+    except AdmissionRejected as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail, headers=exc.headers)
 
 
-@app.post("/api/v1/recommendations", response_model=RecommendationResponse)
-def recommendations(payload: RecommendationRequest, request: Request) -> RecommendationResponse:
-    questions = load_questions()
-    items, prerequisite_note = build_recommendation_payload(payload.responses)
+async def _store_submission(
+    request: Request,
+    catalog: CatalogSnapshot,
+    codes: Sequence[int],
+    selected: Sequence[int],
+) -> None:
     settings = cast(Settings, request.app.state.settings)
 
     submission_id = str(uuid4())
     submitted_at_utc = datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-    response_values = [str(response) for response in payload.responses]
-    recommendation_values = [item.get("name", "") for item in items]
+    response_values = [RESPONSE_OPTION_ORDER[code].value for code in codes]
+    recommendation_values = [catalog.activities[index].name for index in selected]
     visitor_hash = _extract_visitor_hash(request=request, settings=settings)
 
+    store = request.app.state.submission_store
+    append_started = time.perf_counter()
     try:
-        request.app.state.submission_store.append_submission(
+        await append_submission_async(
+            store,
             submitted_at_utc=submitted_at_utc,
             submission_id=submission_id,
             responses=response_values,
             recommendations=recommendation_values,
             visitor_hash=visitor_hash,
             schema_version=settings.schema_version,
+            catalog_version=catalog.version,
         )
     except SubmissionStoreError:
         logger.exception("Failed to store survey submission (submission_id=%s)", submission_id)
+    SUBMISSION_APPEND_DURATION.labels(type(store).__name__).observe(time.perf_counter() - append_started)
 
-    return RecommendationResponse(
-        recommendations=items,
-        total_questions=len(questions),
-        completion_percent=100,
-        scoring_note="Recommendations are calculated from your survey responses.",
-        prerequisite_note=prerequisite_note,
-    )
+
+def _response_codes(payload: RecommendationRequest) -> list[int]:
+    # The compact encodings decode straight to response codes, without ResponseOption objects.
+    if payload.codes is not None:
+        return decode_response_digits(payload.codes)
+    if payload.packed is not None:
+        return unpack_response_codes(payload.packed)
+    return encode_responses(payload.responses or [])
+
+
+def _require_admin_token(*, request: Request, settings: Settings) -> None:
+    # Admin endpoints don't exist unless a token is configured.
+    if not settings.admin_api_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip(), settings.admin_api_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
 
 
 def _extract_visitor_hash(*, request: Request, settings: Settings) -> str | None:
@@ -157,3 +730,11 @@ def _extract_client_ip(request: Request) -> str | None:
         return request.client.host
 
     return None
+
+
+def __getattr__(name: str) -> FastAPI:
+    # ``uvicorn app.main:app`` and ``from app.main import app`` build the app on first access.
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
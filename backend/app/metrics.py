@@ -0,0 +1,413 @@
+"""Process-local metrics, rendered in the Prometheus text format by ``GET /metrics``.
+
+Each counter and histogram keeps one preallocated value per label set. Recording a value updates a
+few slots and takes no lock. Under the GIL an increment can occasionally be lost when two threads
+race, which is acceptable for monitoring. Values that components already count (recommendation
+cache and submission queue statistics) are read by collectors at scrape time rather than counted a
+second time on the request path.
+
+With several worker processes, set ``METRICS_MULTIPROC_DIR``. Each worker then writes its samples to
+``<dir>/<pid>.json`` every few seconds, and ``/metrics`` merges all the files. Whichever worker
+answers a scrape reports the totals for every worker. When a worker exits, the gunicorn master folds
+its counters into ``<dir>/exited-workers.json`` and deletes its file (``absorb_exited_worker``), so
+the directory holds one file per live worker plus one.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+EXITED_WORKERS_FILE_NAME = "exited-workers.json"
+# Workers whose files were just absorbed; only needed until their files are deleted.
+_MAX_ABSORBED_WORKERS = 64
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (name suffix, labels, value)
+Sample = tuple[str, dict[str, str], float]
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    type_name: str
+    documentation: str
+    samples: list[Sample] = field(default_factory=list)
+    # How gauges from several processes combine: "sum" or "max". Counters and histograms always sum.
+    merge: str = "sum"
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; cumulated only when rendered.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            # Only the first use of a label set takes the lock.
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type_name, self.documentation)
+        for values, child in list(self._children.items()):
+            family.samples.extend(self._child_samples(dict(zip(self.labelnames, values)), child))
+        return family
+
+    @abstractmethod
+    def _new_child(self) -> object: ...
+
+    @abstractmethod
+    def _child_samples(self, labels: dict[str, str], child: object) -> Iterable[Sample]: ...
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def labels(self, *values: str) -> _CounterValue:
+        return super().labels(*values)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def _child_samples(self, labels: dict[str, str], child: _CounterValue) -> Iterable[Sample]:
+        yield "_total", labels, child.value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def labels(self, *values: str) -> _HistogramValue:
+        return super().labels(*values)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _child_samples(self, labels: dict[str, str], child: _HistogramValue) -> Iterable[Sample]:
+        counts = list(child.counts)
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+        yield "_sum", labels, child.sum
+        yield "_count", labels, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: dict[object, Callable[[], Iterable[MetricFamily]]] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]], *, key: str | None = None) -> None:
+        """``collector`` is called on every scrape and may read any state it likes.
+
+        Registering again with the same ``key`` replaces the earlier collector.
+        """
+        self._collectors[collector if key is None else key] = collector
+
+    def collect(self) -> list[MetricFamily]:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in list(self._collectors.values()):
+            try:
+                families.extend(collector())
+            except Exception:  # pragma: no cover - a broken collector must not break the scrape.
+                logger.exception("Metrics collector failed")
+        return families
+
+    def _register(self, metric: _Metric):
+        self._metrics.append(metric)
+        return metric
+
+
+def render_text(families: Iterable[MetricFamily]) -> str:
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.documentation}")
+        lines.append(f"# TYPE {family.name} {family.type_name}")
+        for suffix, labels, value in family.samples:
+            label_text = ",".join(f'{name}="{_escape(label)}"' for name, label in labels.items())
+            selector = f"{family.name}{suffix}{{{label_text}}}" if label_text else f"{family.name}{suffix}"
+            lines.append(f"{selector} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessMetrics:
+    """Shares one registry's samples with sibling worker processes through a directory of JSON files."""
+
+    def __init__(self, registry: MetricsRegistry, directory: str, *, interval_seconds: float) -> None:
+        self.registry = registry
+        self.directory = Path(directory)
+        self.interval_seconds = interval_seconds
+        # Unlike the pid, never reused, so an absorbed worker's file is not mistaken for a new one.
+        self.instance = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        # Counters of a worker that has exited keep counting towards the totals.
+        self.write()
+
+    def write(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_payload(
+            self.directory / f"{os.getpid()}.json",
+            {"pid": os.getpid(), "instance": self.instance, "families": _dump_families(self.registry.collect())},
+        )
+
+    def collect(self) -> list[MetricFamily]:
+        """Every worker's samples merged; this worker's are written first so they are current."""
+        self.write()
+        payloads = [_read_payload(path) for path in sorted(self.directory.glob("*.json"))]
+        payloads = [payload for payload in payloads if payload is not None]
+        # Between the master writing the exited-workers file and deleting the worker's own file.
+        absorbed = {instance for payload in payloads for instance in payload.get("absorbed", ())}
+        return _merge_payloads(
+            (payload, _process_alive(payload.get("pid")))
+            for payload in payloads
+            if payload.get("instance") not in absorbed
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Could not write metrics to %s", self.directory)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request by route template (e.g. ``/api/v1/recommendations``)."""
+
+    def __init__(self, app, histogram: Histogram | None = None) -> None:
+        self.app = app
+        self.histogram = histogram or HTTP_REQUEST_DURATION
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            self.histogram.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                f"{status // 100}xx",
+            ).observe(time.perf_counter() - started)
+
+
+def absorb_exited_worker(directory: str, pid: int) -> None:
+    """Fold the counters and histograms of exited worker ``pid`` into the exited-workers file.
+
+    For the gunicorn master's ``child_exit`` hook, which runs one at a time. Its gauges are dropped.
+    """
+    path = Path(directory) / f"{pid}.json"
+    worker = _read_payload(path)
+    if worker is None:
+        return
+    archive_path = Path(directory) / EXITED_WORKERS_FILE_NAME
+    archive = _read_payload(archive_path) or {}
+    absorbed = [*archive.get("absorbed", ()), worker.get("instance")][-_MAX_ABSORBED_WORKERS:]
+    families = _merge_payloads([(archive, False), (worker, False)])
+    _write_payload(archive_path, {"pid": None, "absorbed": absorbed, "families": _dump_families(families)})
+    path.unlink(missing_ok=True)
+
+
+def gauge(name: str, documentation: str, value: float, *, merge: str = "sum", **labels: str) -> MetricFamily:
+    return MetricFamily(name, "gauge", documentation, [("", labels, float(value))], merge=merge)
+
+
+def counter_family(name: str, documentation: str, value: float, **labels: str) -> MetricFamily:
+    return MetricFamily(name, "counter", documentation, [("_total", labels, float(value))])
+
+
+def _merge_payloads(payloads: Iterable[tuple[dict, bool]]) -> list[MetricFamily]:
+    """Sum the samples of several processes' payloads; gauges only count for live processes."""
+    merged: dict[str, MetricFamily] = {}
+    values: dict[tuple[str, str, tuple[tuple[str, str], ...]], float] = {}
+    for payload, alive in payloads:
+        for name, type_name, documentation, merge, samples in payload.get("families", ()):
+            if type_name == "gauge" and not alive:
+                continue
+            family = merged.setdefault(name, MetricFamily(name, type_name, documentation, merge=merge))
+            for suffix, labels, value in samples:
+                key = (name, suffix, tuple(labels.items()))
+                if key not in values:
+                    values[key] = value
+                elif merge == "max" and type_name == "gauge":
+                    values[key] = max(values[key], value)
+                else:
+                    values[key] += value
+
+    for (name, suffix, labels), value in values.items():
+        merged[name].samples.append((suffix, dict(labels), value))
+    return list(merged.values())
+
+
+def _dump_families(families: Iterable[MetricFamily]) -> list[list[object]]:
+    return [[family.name, family.type_name, family.documentation, family.merge, family.samples] for family in families]
+
+
+def _read_payload(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_payload(path: Path, payload: dict) -> None:
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(temporary, path)
+
+
+def _process_alive(pid: object) -> bool:
+    if not isinstance(pid, int):
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+SCORING_DURATION = REGISTRY.histogram(
+    "recommendation_scoring_duration_seconds",
+    "Time to score and select recommendations for one response vector (cache misses only).",
+)
+SUBMISSION_APPEND_DURATION = REGISTRY.histogram(
+    "submission_append_duration_seconds",
+    "Time the recommendations request spent handing its submission to the submission store.",
+    ("store",),
+)
+SHEETS_REQUEST_DURATION = REGISTRY.histogram(
+    "sheets_request_duration_seconds",
+    "Latency of one Google Sheets API call (appends and read-backs), including failed calls.",
+    ("client",),
+)
+SUBMISSION_STORE_RETRIES = REGISTRY.counter(
+    "submission_store_retries",
+    "Google Sheets append attempts that were retried.",
+    ("client",),
+)
+SUBMISSION_STORE_FAILURES = REGISTRY.counter(
+    "submission_store_failures",
+    "Submission appends that failed after all retries.",
+    ("client",),
+)
@@ -1,5 +1,5 @@
 from enum import Enum
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, StrictInt, model_validator
 
 
 class ResponseOption(str, Enum):
@@ -9,8 +9,37 @@ class ResponseOption(str, Enum):
     STRONGLY_AGREE = "strongly_agree"
 
 
+QUESTION_COUNT = 18
+
+
 class RecommendationRequest(BaseModel):
-    responses: list[ResponseOption] = Field(..., min_length=18, max_length=18)
+    """Answers in one of three encodings; exactly one field must be set.
+
+    ``codes`` and ``packed`` use the response codes 0-3 (strongly disagree .. strongly agree).
+    """
+
+    responses: list[ResponseOption] | None = Field(default=None, min_length=QUESTION_COUNT, max_length=QUESTION_COUNT)
+    # One digit per question, e.g. "221033...".
+    codes: str | None = Field(default=None, pattern=rf"^[0-3]{{{QUESTION_COUNT}}}$")
+    # Two bits per question, first question in the most significant bits.
+    packed: StrictInt | None = Field(default=None, ge=0, lt=1 << (2 * QUESTION_COUNT))
+
+    @model_validator(mode="after")
+    def validate_single_encoding(self) -> "RecommendationRequest":
+        provided = [value for value in (self.responses, self.codes, self.packed) if value is not None]
+        if len(provided) != 1:
+            raise ValueError("Provide exactly one of 'responses', 'codes' or 'packed'.")
+        return self
+
+
+class ScoringSessionAnswer(BaseModel):
+    # Response code 0-3 (strongly disagree .. strongly agree).
+    code: StrictInt = Field(ge=0, le=3)
+
+
+class ScoringSessionResponse(BaseModel):
+    session_id: str
+    total_questions: int
 
 
 class QuestionItem(BaseModel):
@@ -40,3 +69,26 @@ class RecommendationResponse(BaseModel):
         if not self.recommendations:
             raise ValueError("recommendations cannot be empty")
         return self
+
+
+class SensitivityAlternative(BaseModel):
+    question: int
+    response: ResponseOption
+    recommendations: list[str]
+    added: list[str]
+    removed: list[str]
+    changed: bool
+    top_changed: bool
+
+
+class SensitivityTopFlip(BaseModel):
+    question: int
+    response: ResponseOption
+    top_recommendation: str
+
+
+class SensitivityResponse(BaseModel):
+    recommendations: list[str]
+    # Every other answer to every question, one at a time.
+    alternatives: list[SensitivityAlternative]
+    top_flips: list[SensitivityTopFlip]
@@ -0,0 +1,82 @@
+"""Response bodies serialized (and compressed) once per catalog version instead of per request."""
+
+import gzip
+import hashlib
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:  # Optional: brotli is only offered when the package is installed.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment.
+    brotli = None
+
+
+IDENTITY = "identity"
+
+
+@dataclass(frozen=True)
+class PrerenderedDocument:
+    media_type: str
+    # Content-coding -> body; always has ``identity``.
+    bodies: Mapping[str, bytes]
+    # Content-coding -> strong ETag (quoted). Each coding is a different representation.
+    etags: Mapping[str, str]
+
+    def response(self, request: Request, *, cache_control: str) -> Response:
+        """The body for the request's ``Accept-Encoding``, or 304 if ``If-None-Match`` already matches."""
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), self.bodies)
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), self.etags.values()):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != IDENTITY:
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.bodies[encoding], media_type=self.media_type, headers=headers)
+
+
+def prerender(body: bytes, *, media_type: str = "application/json") -> PrerenderedDocument:
+    bodies = {IDENTITY: body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body)
+
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    etags = {encoding: f'"{digest}"' if encoding == IDENTITY else f'"{digest}-{encoding}"' for encoding in bodies}
+    return PrerenderedDocument(media_type=media_type, bodies=bodies, etags=etags)
+
+
+def negotiate_encoding(accept_encoding: str, available: Mapping[str, bytes]) -> str:
+    """Pick ``br``, then ``gzip``, then identity, among codings the client accepts (``q=0`` refuses)."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return IDENTITY
+
+
+def etag_matches(if_none_match: str | None, etags: Iterable[str]) -> bool:
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches.
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag in candidates for etag in etags)
@@ -0,0 +1,146 @@
+"""Opt-in cProfile capture of individual HTTP requests.
+
+A request is profiled when it is the N-th since the last sample (``PROFILING_SAMPLE_EVERY``), or when
+it carries an ``X-Debug-Profile`` header signed with ``ADMIN_API_TOKEN``. The profile covers the
+whole handler, from body validation to the submission hand-off. It is written as a ``.prof``
+(pstats) file to a directory that keeps only the newest files. ``snakeviz`` shows the file as an
+icicle chart, and ``flameprof`` turns it into a flame graph SVG.
+
+cProfile follows the event-loop thread. Coroutines of other requests that interleave with the
+profiled one show up in its profile, while work handed to the threadpool does not. Only one request
+is profiled at a time; others that would have been sampled are served unprofiled.
+"""
+
+import argparse
+import cProfile
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-debug-profile"
+SIGNATURE_MAX_AGE_SECONDS = 300
+_UNSAFE_FILENAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def sign_profile_request(secret: str, path: str, *, timestamp: int | None = None) -> str:
+    """``X-Debug-Profile`` header value for ``path``, valid for ``SIGNATURE_MAX_AGE_SECONDS``."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(secret.encode("utf-8"), f"{timestamp}:{path}".encode("utf-8"), hashlib.sha256)
+    return f"{timestamp}:{signature.hexdigest()}"
+
+
+def verify_profile_signature(secret: str, path: str, header_value: str, *, now: float | None = None) -> bool:
+    timestamp, _, _ = header_value.partition(":")
+    if not timestamp.isdigit():
+        return False
+    now = time.time() if now is None else now
+    if abs(now - int(timestamp)) > SIGNATURE_MAX_AGE_SECONDS:
+        return False
+    expected = sign_profile_request(secret, path, timestamp=int(timestamp))
+    return hmac.compare_digest(expected, header_value.strip())
+
+
+class ProfileDirectory:
+    """Writes profiles to ``directory`` and keeps only the newest ``max_files``."""
+
+    def __init__(self, directory: str, *, max_files: int) -> None:
+        self.directory = Path(directory)
+        self.max_files = max(1, max_files)
+
+    def write(self, profiler: cProfile.Profile, *, method: str, path: str, duration_seconds: float) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        route = _UNSAFE_FILENAME_CHARACTERS.sub("_", path.strip("/")) or "root"
+        target = self.directory / f"{stamp}-{os.getpid()}-{method}-{route}-{duration_seconds * 1000:.0f}ms.prof"
+        profiler.dump_stats(target)
+        self._rotate()
+        return target
+
+    def _rotate(self) -> None:
+        profiles = sorted(self.directory.glob("*.prof"))
+        for stale in profiles[: max(0, len(profiles) - self.max_files)]:
+            stale.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app,
+        *,
+        directory: ProfileDirectory,
+        sample_every: int = 0,
+        secret: str | None = None,
+    ) -> None:
+        self.app = app
+        self.directory = directory
+        self.sample_every = sample_every
+        self.secret = secret
+        self._requests = itertools.count(1)
+        self._active = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Another request (or a debugger) may already be profiling this thread.
+        if self._active or sys.getprofile() is not None:
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._active = False
+            duration = time.perf_counter() - started
+            try:
+                target = await run_in_threadpool(
+                    self.directory.write,
+                    profiler,
+                    method=scope["method"],
+                    path=scope["path"],
+                    duration_seconds=duration,
+                )
+                logger.info("Wrote request profile %s", target)
+            except OSError:
+                logger.exception("Could not write request profile to %s", self.directory.directory)
+
+    def _should_profile(self, scope) -> bool:
+        if self.secret:
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER.encode("latin-1"):
+                    return verify_profile_signature(self.secret, scope["path"], value.decode("latin-1"))
+        return self.sample_every > 0 and next(self._requests) % self.sample_every == 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Print a signed X-Debug-Profile header value.")
+    parser.add_argument("path", help="request path, e.g. /api/v1/recommendations")
+    args = parser.parse_args(argv)
+
+    secret = os.getenv("ADMIN_API_TOKEN")
+    if not secret:
+        parser.error("ADMIN_API_TOKEN is not set")
+    print(sign_profile_request(secret, args.path))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
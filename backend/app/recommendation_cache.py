@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from .catalog import CatalogSnapshot, current_catalog
+from .metrics import SCORING_DURATION
+from .models import QUESTION_COUNT
+from .scoring import RESPONSE_OPTION_ORDER, select_recommendations
+
+
+_CODE_BITS = 2
+
+RecommendationPayload = tuple[list[dict[str, str]], str | None]
+# Indexes into ``CatalogSnapshot.activities`` and the prerequisite note; immutable, so shared freely.
+RecommendationSelection = tuple[tuple[int, ...], str | None]
+
+
+@dataclass(frozen=True)
+class RecommendationCacheStats:
+    size: int
+    capacity: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+def pack_response_codes(codes: Sequence[int]) -> int:
+    """Pack response codes (see ``RESPONSE_OPTION_ORDER``) two bits each; 18 answers fit in 36 bits."""
+    key = 0
+    for code in codes:
+        if not 0 <= code < len(RESPONSE_OPTION_ORDER):
+            raise ValueError(f"Response codes must be between 0 and {len(RESPONSE_OPTION_ORDER) - 1}")
+        key = (key << _CODE_BITS) | code
+    return key
+
+
+def unpack_response_codes(key: int, count: int = QUESTION_COUNT) -> list[int]:
+    """Inverse of ``pack_response_codes``."""
+    if not 0 <= key < 1 << (count * _CODE_BITS):
+        raise ValueError(f"Packed responses must be between 0 and {(1 << (count * _CODE_BITS)) - 1}")
+    return [(key >> shift) & 0b11 for shift in range((count - 1) * _CODE_BITS, -1, -_CODE_BITS)]
+
+
+class RecommendationCache:
+    """Bounded LRU of recommendation selections keyed by the packed response vector.
+
+    Entries belong to one catalog version and are dropped as soon as a newer catalog is published.
+    Requests still scoring against an older snapshot bypass the cache.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(0, capacity)
+
+        self._entries: OrderedDict[int, RecommendationSelection] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: str | None = None
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def payload(self, codes: Sequence[int], catalog: CatalogSnapshot | None = None) -> RecommendationPayload:
+        catalog = catalog or current_catalog()
+        selected, prerequisite_note = self.selection(codes, catalog)
+        return [dict(catalog.payload_items[index]) for index in selected], prerequisite_note
+
+    def selection(self, codes: Sequence[int], catalog: CatalogSnapshot | None = None) -> RecommendationSelection:
+        catalog = catalog or current_catalog()
+        key = pack_response_codes(codes)
+
+        with self._lock:
+            if catalog.version != self._version and catalog is current_catalog():
+                if self._version is not None:
+                    self._invalidations += 1
+                self._entries.clear()
+                self._version = catalog.version
+            cacheable = catalog.version == self._version
+
+            cached = self._entries.get(key) if cacheable else None
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if cached is None:
+            started = time.perf_counter()
+            cached = select_recommendations(codes, catalog=catalog)
+            SCORING_DURATION.observe(time.perf_counter() - started)
+            if cacheable:
+                self._store(key, cached, catalog.version)
+        return cached
+
+    def stats(self) -> RecommendationCacheStats:
+        with self._lock:
+            return RecommendationCacheStats(
+                size=len(self._entries),
+                capacity=self.capacity,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                invalidations=self._invalidations,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: int, selection: RecommendationSelection, version: str) -> None:
+        if self.capacity == 0:
+            return
+        with self._lock:
+            if version != self._version:
+                # A newer catalog was published while this selection was being scored.
+                return
+            self._entries[key] = selection
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self._evictions += 1
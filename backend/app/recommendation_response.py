@@ -0,0 +1,37 @@
+"""Byte-level rendering of ``RecommendationResponse`` for the recommendations hot path.
+
+Per-activity JSON fragments are encoded once per catalog version (``CatalogSnapshot.payload_fragments``),
+so a response is a join of cached bytes plus a few scalar fields. The output matches
+``RecommendationResponse.model_dump_json()`` for the same values.
+"""
+
+import json
+from collections.abc import Sequence
+
+from .catalog import CatalogSnapshot
+
+
+COMPLETION_PERCENT = 100
+SCORING_NOTE = "Recommendations are calculated from your survey responses."
+
+_PREFIX = b'{"recommendations":['
+_SUFFIX_TEMPLATE = '],"total_questions":{},"completion_percent":{},"scoring_note":{},"prerequisite_note":{}}}'
+_SCORING_NOTE_JSON = json.dumps(SCORING_NOTE, ensure_ascii=False)
+
+
+def render_recommendation_response(
+    catalog: CatalogSnapshot,
+    selected: Sequence[int],
+    prerequisite_note: str | None,
+) -> bytes:
+    if not selected:
+        # Mirrors ``RecommendationResponse.validate_non_empty_recommendations``.
+        raise ValueError("recommendations must contain at least one item")
+    fragments = catalog.payload_fragments
+    suffix = _SUFFIX_TEMPLATE.format(
+        len(catalog.questions),
+        COMPLETION_PERCENT,
+        _SCORING_NOTE_JSON,
+        json.dumps(prerequisite_note, ensure_ascii=False),
+    )
+    return b"".join((_PREFIX, b",".join([fragments[index] for index in selected]), suffix.encode("utf-8")))
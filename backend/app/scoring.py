@@ -1,15 +1,15 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from .data_loader import (
-    Activity,
-    load_activities,
-    load_activity_descriptions,
-    load_questions,
-)
+from .data_loader import Activity, Question
 from .models import ResponseOption
 
+if TYPE_CHECKING:
+    from .catalog import CatalogSnapshot
+
 TOP_K = 5
 MIN_SCORE_CLAMP = 0
 
@@ -20,6 +20,15 @@ RESPONSE_WEIGHTS = {
     ResponseOption.STRONGLY_AGREE: 2,
 }
 
+# Integer response codes used by the compiled scoring matrix (index into this tuple).
+RESPONSE_OPTION_ORDER = (
+    ResponseOption.STRONGLY_DISAGREE,
+    ResponseOption.DISAGREE,
+    ResponseOption.AGREE,
+    ResponseOption.STRONGLY_AGREE,
+)
+RESPONSE_CODES = {option: code for code, option in enumerate(RESPONSE_OPTION_ORDER)}
+
 
 @dataclass(frozen=True)
 class RankedActivity:
@@ -29,107 +38,210 @@ class RankedActivity:
     score: int
 
 
-def compute_ranked_activities(responses: list[ResponseOption]) -> list[RankedActivity]:
-    questions = load_questions()
-    activities = load_activities()
-
-    if len(responses) != len(questions):
-        raise ValueError(
-            f"Expected {len(questions)} responses, received {len(responses)}"
+@dataclass(frozen=True)
+class ScoringMatrix:
+    """Question-to-activity tag weights compiled into precomputed score contributions.
+
+    ``contributions[q][code]`` holds the tag-count row of question ``q`` pre-multiplied by the
+    weight of response ``code``, so scoring a response vector is a column sum over one
+    precomputed row per question. Ranking works on activity indexes (top-K selection is in
+    ``app.catalog_index``); result objects are only built for what is returned.
+    """
+
+    activities: tuple[Activity, ...]
+    contributions: tuple[tuple[tuple[int, ...], ...], ...]
+    # Activity indexes in name order; a stable sort by score over this keeps ties alphabetical.
+    name_order: tuple[int, ...]
+
+    @property
+    def question_count(self) -> int:
+        return len(self.contributions)
+
+    def raw_scores(self, codes: Sequence[int]) -> list[int]:
+        if len(codes) != self.question_count:
+            raise ValueError(
+                f"Expected {self.question_count} responses, received {len(codes)}"
+            )
+        if codes and (min(codes) < 0 or max(codes) >= len(RESPONSE_OPTION_ORDER)):
+            raise ValueError(
+                f"Response codes must be between 0 and {len(RESPONSE_OPTION_ORDER) - 1}"
+            )
+        rows = [contribution[code] for contribution, code in zip(self.contributions, codes)]
+        return list(map(sum, zip(*rows)))
+
+    def scores(self, codes: Sequence[int]) -> list[int]:
+        return [score if score > MIN_SCORE_CLAMP else MIN_SCORE_CLAMP for score in self.raw_scores(codes)]
+
+    def rank(self, scores: Sequence[int]) -> list[int]:
+        # ``reverse=True`` keeps the sort stable, so equal scores stay in name order.
+        return sorted(self.name_order, key=scores.__getitem__, reverse=True)
+
+    def ranked_activities(self, scores: Sequence[int]) -> list[RankedActivity]:
+        return self.build_ranked(self.rank(scores), scores)
+
+    def build_ranked(self, indexes: Iterable[int], scores: Sequence[int]) -> list[RankedActivity]:
+        activities = self.activities
+        return [
+            RankedActivity(
+                code=activities[index].code,
+                name=activities[index].name,
+                phase=activities[index].phase,
+                score=scores[index],
+            )
+            for index in indexes
+        ]
+
+
+def compile_scoring_matrix(
+    questions: Sequence[Question], activities: Sequence[Activity]
+) -> ScoringMatrix:
+    activity_index = {activity.code: index for index, activity in enumerate(activities)}
+    activity_count = len(activities)
+
+    contributions = []
+    for question in questions:
+        tag_counts = [0] * activity_count
+        for tag in question.tags:
+            if tag in activity_index:
+                tag_counts[activity_index[tag]] += 1
+        contributions.append(
+            tuple(
+                tuple(count * RESPONSE_WEIGHTS[option] for count in tag_counts)
+                for option in RESPONSE_OPTION_ORDER
+            )
         )
 
-    score_map = {activity.code: 0 for activity in activities}
+    return ScoringMatrix(
+        activities=tuple(activities),
+        contributions=tuple(contributions),
+        name_order=tuple(sorted(range(activity_count), key=lambda index: activities[index].name)),
+    )
 
-    for question, response in zip(questions, responses, strict=True):
-        delta = RESPONSE_WEIGHTS[response]
-        for tag in question.tags:
-            score_map[tag] = score_map.get(tag, 0) + delta
-
-    ranked = [
-        RankedActivity(
-            code=activity.code,
-            name=activity.name,
-            phase=activity.phase,
-            score=max(MIN_SCORE_CLAMP, score_map.get(activity.code, 0)),
-        )
-        for activity in activities
-    ]
 
-    return sorted(ranked, key=lambda item: (-item.score, item.name))
+def load_scoring_matrix() -> ScoringMatrix:
+    # Imported lazily: the catalog compiles its matrix with this module.
+    from .catalog import current_catalog
 
+    return current_catalog().scoring_matrix
 
-def _find_highest_phase_a(ranked: list[RankedActivity]) -> RankedActivity | None:
-    for activity in ranked:
-        if activity.phase == "Phase A":
-            return activity
-    return None
 
+def encode_responses(responses: Sequence[ResponseOption]) -> list[int]:
+    return [RESPONSE_CODES[response] for response in responses]
 
-def _find_energy_mapping(
-    activities: tuple[Activity, ...], ranked_by_code: dict[str, RankedActivity]
-) -> RankedActivity | None:
-    energy = next(
-        (activity for activity in activities if activity.name == "Energy Mapping"), None
-    )
-    if not energy:
-        return None
-    return ranked_by_code.get(energy.code)
 
+def decode_response_digits(digits: str) -> list[int]:
+    """Response codes from the compact digit-string encoding ("0".."3" per question)."""
+    codes = [ord(digit) - 48 for digit in digits]
+    if codes and (min(codes) < 0 or max(codes) >= len(RESPONSE_OPTION_ORDER)):
+        raise ValueError(f"Response digits must be between 0 and {len(RESPONSE_OPTION_ORDER) - 1}")
+    return codes
 
-def select_top_recommendations(
-    ranked: list[RankedActivity],
-) -> tuple[list[RankedActivity], str | None]:
-    activities = load_activities()
-    ranked_by_code = {item.code: item for item in ranked}
 
-    has_phase_c_in_top_window = any(
-        activity.phase == "Phase C" for activity in ranked[:TOP_K]
-    )
-    should_inject_prerequisites = has_phase_c_in_top_window
+def compute_ranked_activities(responses: list[ResponseOption]) -> list[RankedActivity]:
+    matrix = load_scoring_matrix()
+    return matrix.ranked_activities(matrix.scores(encode_responses(responses)))
+
+
+def compute_ranked_activities_batch(
+    batch: Iterable[Sequence[int]],
+) -> list[list[RankedActivity]]:
+    """Rank activities for many response-code vectors (see ``RESPONSE_OPTION_ORDER``).
+
+    The matrix is loaded once for the whole batch; each vector is then scored on its own.
+    """
+    matrix = load_scoring_matrix()
+    return [matrix.ranked_activities(matrix.scores(codes)) for codes in batch]
 
-    selected: list[RankedActivity] = []
-    seen_codes: set[str] = set()
 
-    if should_inject_prerequisites:
-        phase_a = _find_highest_phase_a(ranked)
-        energy_mapping = _find_energy_mapping(activities, ranked_by_code)
+def select_top_recommendations(
+    ranked: list[RankedActivity],
+) -> tuple[list[RankedActivity], str | None]:
+    from .catalog import current_catalog
 
-        for required in (phase_a, energy_mapping):
-            if required and required.code not in seen_codes:
-                selected.append(required)
-                seen_codes.add(required.code)
+    catalog_index = current_catalog().index
+    index_by_code = catalog_index.index_by_code
+    # Positions in ``ranked``, so the items are picked out directly rather than searched for.
+    positions, injected = catalog_index.select_top_positions([index_by_code[item.code] for item in ranked])
+    return [ranked[position] for position in positions], _prerequisite_note(injected)
 
-    for activity in ranked:
-        if len(selected) >= TOP_K:
-            break
-        if activity.code in seen_codes:
-            continue
-        selected.append(activity)
-        seen_codes.add(activity.code)
 
+def _prerequisite_note(should_inject_prerequisites: bool) -> str | None:
     prerequisite_note = None
     # if should_inject_prerequisites:
     #     prerequisite_note = (
     #         "Phase C activities are sequenced after one Phase A foundation activity and Energy Mapping."
     #     )
-
-    return selected[:TOP_K], prerequisite_note
+    return prerequisite_note
 
 
 def build_recommendation_payload(
     responses: list[ResponseOption],
 ) -> tuple[list[dict[str, str]], str | None]:
-    descriptions = load_activity_descriptions()
-    ranked = compute_ranked_activities(responses)
-    selected, prerequisite_note = select_top_recommendations(ranked)
-
-    items = [
-        {
-            "name": item.name,
-            "description": descriptions[item.code],
-            "phase": item.phase,
-        }
-        for item in selected
-    ]
-
-    return items, prerequisite_note
+    return build_recommendation_payload_from_codes(encode_responses(responses))
+
+
+def select_recommendations(
+    codes: Sequence[int],
+    *,
+    catalog: CatalogSnapshot | None = None,
+) -> tuple[tuple[int, ...], str | None]:
+    """Indexes (into ``catalog.activities``) of the activities to recommend, and the prerequisite note."""
+    if catalog is None:
+        from .catalog import current_catalog
+
+        catalog = current_catalog()
+    selected, injected = catalog.selection_table.select(codes)
+    return selected, _prerequisite_note(injected)
+
+
+def select_recommendations_for_total(
+    total: int,
+    catalog: CatalogSnapshot,
+) -> tuple[tuple[int, ...], str | None]:
+    """``select_recommendations`` for a packed score total (see ``SelectionTable.unpack``)."""
+    selected, injected = catalog.selection_table.select_total(total)
+    return selected, _prerequisite_note(injected)
+
+
+def build_recommendation_payload_from_codes(
+    codes: Sequence[int],
+    *,
+    catalog: CatalogSnapshot | None = None,
+) -> tuple[list[dict[str, str]], str | None]:
+    if catalog is None:
+        from .catalog import current_catalog
+
+        catalog = current_catalog()
+    selected, prerequisite_note = select_recommendations(codes, catalog=catalog)
+    items = catalog.payload_items
+    # Copies, so callers can't mutate the cached items.
+    return [dict(items[index]) for index in selected], prerequisite_note
+
+
+def build_recommendation_payloads(
+    batch: Iterable[Sequence[int]],
+    *,
+    catalog: CatalogSnapshot | None = None,
+) -> list[tuple[list[dict[str, str]], str | None]]:
+    """Build payloads for many response-code vectors.
+
+    Identical vectors within a batch (common in bulk imports) are scored once. Distinct vectors
+    are still scored one at a time.
+    """
+    if catalog is None:
+        from .catalog import current_catalog
+
+        # One snapshot for the whole batch, even if the catalog is reloaded meanwhile.
+        catalog = current_catalog()
+    computed: dict[tuple[int, ...], tuple[list[dict[str, str]], str | None]] = {}
+    payloads = []
+    for codes in batch:
+        key = tuple(codes)
+        payload = computed.get(key)
+        if payload is None:
+            payload = computed[key] = build_recommendation_payload_from_codes(key, catalog=catalog)
+            payloads.append(payload)
+        else:
+            items, prerequisite_note = payload
+            payloads.append(([dict(item) for item in items], prerequisite_note))
+    return payloads
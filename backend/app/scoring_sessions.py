@@ -0,0 +1,264 @@
+"""Survey sessions scored one answer at a time, for provisional recommendations while answering.
+
+A session holds the answers given so far and their packed score total (see
+``app.selection_table``). Setting an answer subtracts the question's previous row from the total
+and adds the new one, so each update is two integer operations whatever the number of questions
+or tags. Subscribers to a session (``iter_session_events``) are sent the provisional top-K,
+rendered from the total, after every change. Submitting a complete session selects from the
+total it already holds.
+
+Sessions are kept in memory, in the process that created them, by ``ScoringSessionStore``: at
+most ``capacity`` sessions, least recently used first out, and each one dropped after
+``ttl_seconds`` without activity. A session costs a few hundred bytes.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from uuid import uuid4
+
+from .catalog import CatalogSnapshot, current_catalog
+from .scoring import RESPONSE_OPTION_ORDER, select_recommendations_for_total
+
+
+UNANSWERED = 0xFF
+DEFAULT_KEEPALIVE_SECONDS = 15.0
+
+CLOSED_SUBMITTED = "submitted"
+CLOSED_EVICTED = "evicted"
+CLOSED_EXPIRED = "expired"
+
+
+class ScoringSessionNotFound(LookupError):
+    pass
+
+
+class ScoringSessionIncomplete(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ScoringSessionStats:
+    size: int
+    capacity: int
+    created: int
+    submitted: int
+    evicted: int
+    expired: int
+
+
+class ScoringSession:
+    __slots__ = ("session_id", "catalog", "answers", "total", "revision", "expires_at", "closed", "_waiters")
+
+    def __init__(self, session_id: str, catalog: CatalogSnapshot, expires_at: float) -> None:
+        self.session_id = session_id
+        # Pinned: the packed rows belong to this catalog version, even if a newer one is published.
+        self.catalog = catalog
+        self.answers = bytearray([UNANSWERED]) * len(catalog.questions)
+        self.total = sum(catalog.selection_table.unanswered_rows)
+        self.revision = 0
+        self.expires_at = expires_at
+        # Why the session ended (``CLOSED_*``), or None while it is open.
+        self.closed: str | None = None
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def answered(self) -> int:
+        return len(self.answers) - self.answers.count(UNANSWERED)
+
+    def _notify(self) -> None:
+        # Subscribers may be waiting on other event loops (or none is running in this thread).
+        for loop, event in self._waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's loop has closed; its stream is gone.
+                pass
+
+
+class ScoringSessionStore:
+    """Bounded, TTL-evicted sessions; safe to use from the event loop and the threadpool."""
+
+    def __init__(
+        self,
+        capacity: int,
+        ttl_seconds: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = max(1, capacity)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+        # Least recently used first; with one TTL for all, that is also soonest to expire first.
+        self._sessions: OrderedDict[str, ScoringSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._created = 0
+        self._submitted = 0
+        self._evicted = 0
+        self._expired = 0
+
+    def create(self, catalog: CatalogSnapshot | None = None) -> ScoringSession:
+        catalog = catalog or current_catalog()
+        now = self._clock()
+        session = ScoringSession(uuid4().hex, catalog, now + self.ttl_seconds)
+        with self._lock:
+            self._expire_locked(now)
+            while len(self._sessions) >= self.capacity:
+                _, evicted = self._sessions.popitem(last=False)
+                self._close_locked(evicted, CLOSED_EVICTED)
+                self._evicted += 1
+            self._sessions[session.session_id] = session
+            self._created += 1
+        return session
+
+    def get(self, session_id: str) -> ScoringSession:
+        with self._lock:
+            return self._touch_locked(session_id)
+
+    def answer(self, session_id: str, question_index: int, code: int) -> ScoringSession:
+        """Set (or change) one answer and update the session's total by the difference."""
+        if not 0 <= code < len(RESPONSE_OPTION_ORDER):
+            raise ValueError(f"Response codes must be between 0 and {len(RESPONSE_OPTION_ORDER) - 1}")
+        with self._lock:
+            session = self._touch_locked(session_id)
+            if not 0 <= question_index < len(session.answers):
+                raise ValueError(f"Question must be between 1 and {len(session.answers)}")
+            previous = session.answers[question_index]
+            if previous == code:
+                return session
+            table = session.catalog.selection_table
+            rows = table.packed_rows[question_index]
+            old_row = table.unanswered_rows[question_index] if previous == UNANSWERED else rows[previous]
+            session.total += rows[code] - old_row
+            session.answers[question_index] = code
+            session.revision += 1
+            session._notify()
+        return session
+
+    def submit(self, session_id: str) -> ScoringSession:
+        """Remove and return a fully answered session; its ``total`` scores the final answers."""
+        with self._lock:
+            session = self._touch_locked(session_id)
+            if UNANSWERED in session.answers:
+                raise ScoringSessionIncomplete(
+                    f"{session.answered} of {len(session.answers)} questions are answered."
+                )
+            del self._sessions[session_id]
+            self._close_locked(session, CLOSED_SUBMITTED)
+            self._submitted += 1
+        return session
+
+    def expire(self) -> None:
+        with self._lock:
+            self._expire_locked(self._clock())
+
+    def stats(self) -> ScoringSessionStats:
+        with self._lock:
+            return ScoringSessionStats(
+                size=len(self._sessions),
+                capacity=self.capacity,
+                created=self._created,
+                submitted=self._submitted,
+                evicted=self._evicted,
+                expired=self._expired,
+            )
+
+    def snapshot(self, session: ScoringSession) -> tuple[int, int, int, str | None]:
+        """``(revision, total, answered, closed)``, read together."""
+        with self._lock:
+            return session.revision, session.total, session.answered, session.closed
+
+    def subscribe(self, session: ScoringSession, event: asyncio.Event) -> None:
+        with self._lock:
+            session._waiters.append((asyncio.get_running_loop(), event))
+
+    def unsubscribe(self, session: ScoringSession, event: asyncio.Event) -> None:
+        with self._lock:
+            session._waiters[:] = [waiter for waiter in session._waiters if waiter[1] is not event]
+
+    def _touch_locked(self, session_id: str) -> ScoringSession:
+        now = self._clock()
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise ScoringSessionNotFound(session_id)
+        if session.expires_at <= now:
+            del self._sessions[session_id]
+            self._close_locked(session, CLOSED_EXPIRED)
+            self._expired += 1
+            raise ScoringSessionNotFound(session_id)
+        session.expires_at = now + self.ttl_seconds
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _expire_locked(self, now: float) -> None:
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.expires_at > now:
+                return
+            del self._sessions[session.session_id]
+            self._close_locked(session, CLOSED_EXPIRED)
+            self._expired += 1
+
+    def _close_locked(self, session: ScoringSession, reason: str) -> None:
+        session.closed = reason
+        session._notify()
+
+
+def render_provisional_event(session: ScoringSession, revision: int, total: int, answered: int) -> bytes:
+    """One ``scores`` Server-Sent Event: the top-K for the answers given so far."""
+    catalog = session.catalog
+    selected, prerequisite_note = select_recommendations_for_total(total, catalog)
+    question_count = len(catalog.questions)
+    data = b"".join(
+        (
+            b'{"revision":%d,"answered":%d,"total_questions":%d,"completion_percent":%d,"recommendations":['
+            % (revision, answered, question_count, answered * 100 // question_count),
+            b",".join([catalog.payload_fragments[index] for index in selected]),
+            b'],"prerequisite_note":%s}' % json.dumps(prerequisite_note, ensure_ascii=False).encode("utf-8"),
+        )
+    )
+    return b"event: scores\nid: %d\ndata: %s\n\n" % (revision, data)
+
+
+def render_closed_event(reason: str) -> bytes:
+    return b"event: closed\ndata: %s\n\n" % json.dumps({"reason": reason}).encode("utf-8")
+
+
+async def iter_session_events(
+    store: ScoringSessionStore,
+    session: ScoringSession,
+    *,
+    keepalive_seconds: float = DEFAULT_KEEPALIVE_SECONDS,
+) -> AsyncIterator[bytes]:
+    """Server-Sent Events for one session: its current state, then one event per change.
+
+    Changes made faster than they are sent are coalesced; only the latest state is rendered. The
+    stream ends with a ``closed`` event once the session is submitted, evicted or expired.
+    """
+    changed = asyncio.Event()
+    store.subscribe(session, changed)
+    sent_revision = -1
+    try:
+        while True:
+            changed.clear()
+            revision, total, answered, closed = store.snapshot(session)
+            if revision != sent_revision:
+                yield render_provisional_event(session, revision, total, answered)
+                sent_revision = revision
+            if closed is not None:
+                yield render_closed_event(closed)
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=keepalive_seconds)
+            except TimeoutError:
+                # Also how an idle session is noticed to have expired.
+                store.expire()
+                yield b": keepalive\n\n"
+    finally:
+        store.unsubscribe(session, changed)
@@ -0,0 +1,167 @@
+"""Recommendation selection precompiled for every possible activity ranking.
+
+The recommendations depend on the answers only through the ranking of activities by clamped score.
+With the catalog's seven activities there are 7! = 5040 rankings, so the top-K selection and the
+prerequisite injection are computed once per ranking when the catalog is built. Serving is then a
+score sum, a sort of seven values, and one dictionary lookup.
+
+The score sum is also precompiled. Each question's contribution row, for each answer, is packed
+into one integer with a fixed-width lane per activity. Lanes hold non-negative offsets, so they
+never carry into each other. Summing 18 integers and unpacking seven lanes replaces summing 18
+seven-value rows.
+
+The packed total can also be kept up to date one answer at a time: replacing an answer subtracts
+the question's old row and adds its new one. ``unanswered_rows`` are the rows of a question that
+has no answer yet (a zero contribution), so a partial survey has a total too.
+
+    cd backend
+    python -m app.selection_table   # prints the table report
+"""
+
+import json
+import sys
+import time
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from itertools import permutations
+from types import MappingProxyType
+
+from .catalog_index import CatalogIndex
+from .scoring import MIN_SCORE_CLAMP, RESPONSE_OPTION_ORDER, ScoringMatrix
+
+
+# Above this many activities the table (n! rankings) is not built and selection runs per request.
+MAX_TABULATED_ACTIVITIES = 8
+
+# Activity indexes to recommend, and whether prerequisites were injected.
+Selection = tuple[tuple[int, ...], bool]
+
+
+@dataclass(frozen=True)
+class SelectionTable:
+    # ``packed_rows[q][code]``: question ``q``'s contribution row for answer ``code``, one lane per activity.
+    packed_rows: tuple[tuple[int, ...], ...]
+    # ``unanswered_rows[q]``: question ``q``'s row before it is answered; every lane holds zero.
+    unanswered_rows: tuple[int, ...]
+    # Per activity: (bit shift of its lane, value added back after unpacking).
+    lanes: tuple[tuple[int, int], ...]
+    lane_mask: int
+    name_order: tuple[int, ...]
+    # Ranking (activity indexes, best first) -> selection; empty when there are too many activities.
+    selections: Mapping[tuple[int, ...], Selection]
+    index: CatalogIndex
+    compile_seconds: float
+
+    def scores(self, codes: Sequence[int]) -> list[int]:
+        """Clamped per-activity scores; the same values as ``ScoringMatrix.scores``."""
+        if len(codes) != len(self.packed_rows):
+            raise ValueError(f"Expected {len(self.packed_rows)} responses, received {len(codes)}")
+        if codes and (min(codes) < 0 or max(codes) >= len(RESPONSE_OPTION_ORDER)):
+            raise ValueError(f"Response codes must be between 0 and {len(RESPONSE_OPTION_ORDER) - 1}")
+        return self.unpack(sum([row[code] for row, code in zip(self.packed_rows, codes)]))
+
+    def unpack(self, total: int) -> list[int]:
+        """Clamped per-activity scores of a packed total, a sum of one row per question."""
+        mask = self.lane_mask
+        scores = [((total >> shift) & mask) + offset for shift, offset in self.lanes]
+        return [score if score > MIN_SCORE_CLAMP else MIN_SCORE_CLAMP for score in scores]
+
+    def select(self, codes: Sequence[int]) -> Selection:
+        return self._select_scores(self.scores(codes))
+
+    def select_total(self, total: int) -> Selection:
+        return self._select_scores(self.unpack(total))
+
+    def _select_scores(self, scores: list[int]) -> Selection:
+        # ``reverse=True`` keeps the sort stable, so equal scores stay in name order.
+        ranking = tuple(sorted(self.name_order, key=scores.__getitem__, reverse=True))
+        selection = self.selections.get(ranking)
+        if selection is None:
+            selected, injected = self.index.select_top(ranking)
+            return tuple(selected), injected
+        return selection
+
+    def report(self) -> dict[str, object]:
+        distinct = set(self.selections.values())
+        table_bytes = sys.getsizeof(self.selections) + sum(
+            sys.getsizeof(ranking) for ranking in self.selections
+        ) + sum(sys.getsizeof(selection) + sys.getsizeof(selection[0]) for selection in distinct)
+        return {
+            "activities": len(self.name_order),
+            "rankings": len(self.selections),
+            "distinct_selections": len(distinct),
+            "injected_rankings": sum(1 for _, injected in self.selections.values() if injected),
+            "lane_bits": self.lane_mask.bit_length(),
+            "packed_row_bits": max((value.bit_length() for row in self.packed_rows for value in row), default=0),
+            "approximate_table_bytes": table_bytes,
+            "compile_ms": round(self.compile_seconds * 1000, 2),
+        }
+
+
+def compile_selection_table(matrix: ScoringMatrix, index: CatalogIndex) -> SelectionTable:
+    started = time.perf_counter()
+    activity_count = len(matrix.activities)
+
+    # Each lane stores a question's contribution minus that question's smallest contribution for the
+    # activity, so every lane value is non-negative; the minimums are added back after unpacking.
+    # The range includes zero, the contribution of an unanswered question.
+    minimums = [
+        [min(0, *(option_row[activity] for option_row in question)) for activity in range(activity_count)]
+        for question in matrix.contributions
+    ]
+    lane_maximum = max(
+        (
+            sum(
+                max(0, *(row[activity] for row in question)) - low[activity]
+                for question, low in zip(matrix.contributions, minimums)
+            )
+            for activity in range(activity_count)
+        ),
+        default=0,
+    )
+    lane_bits = max(1, lane_maximum.bit_length())
+    packed_rows = tuple(
+        tuple(
+            sum((value - low[activity]) << (activity * lane_bits) for activity, value in enumerate(option_row))
+            for option_row in question
+        )
+        for question, low in zip(matrix.contributions, minimums)
+    )
+    unanswered_rows = tuple(
+        sum(-low[activity] << (activity * lane_bits) for activity in range(activity_count)) for low in minimums
+    )
+    lanes = tuple(
+        (activity * lane_bits, sum(low[activity] for low in minimums)) for activity in range(activity_count)
+    )
+
+    selections: dict[tuple[int, ...], Selection] = {}
+    if activity_count <= MAX_TABULATED_ACTIVITIES:
+        interned: dict[Selection, Selection] = {}
+        for ranking in permutations(range(activity_count)):
+            selected, injected = index.select_top(ranking)
+            selection = (tuple(selected), injected)
+            selections[ranking] = interned.setdefault(selection, selection)
+
+    return SelectionTable(
+        packed_rows=packed_rows,
+        unanswered_rows=unanswered_rows,
+        lanes=lanes,
+        lane_mask=(1 << lane_bits) - 1,
+        name_order=matrix.name_order,
+        selections=MappingProxyType(selections),
+        index=index,
+        compile_seconds=time.perf_counter() - started,
+    )
+
+
+def main() -> int:
+    # Imported lazily: the catalog builds its table with this module.
+    from .catalog import current_catalog
+
+    catalog = current_catalog()
+    print(json.dumps({"catalog_version": catalog.version, **catalog.selection_table.report()}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
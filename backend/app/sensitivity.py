@@ -0,0 +1,107 @@
+"""What-if analysis: how the recommendations change when one answer changes.
+
+For every question and each of its other three answers, the recommendations are re-derived from
+the base scores instead of re-scoring the whole survey. A question only moves the activities it
+is tagged with. Their raw scores are shifted by the difference of the two contribution rows, and
+only those activities are re-inserted into the base ranking; the rest keep their relative order.
+The selection for the new ranking comes from the catalog's selection table.
+
+    cd backend
+    python -m benchmarks.sensitivity   # compared with 54 full recomputes
+"""
+
+from bisect import insort
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from .catalog import CatalogSnapshot, current_catalog
+from .scoring import MIN_SCORE_CLAMP, RESPONSE_OPTION_ORDER
+
+
+@dataclass(frozen=True)
+class AnswerChange:
+    question_index: int
+    code: int
+    # Activity indexes recommended with this one answer changed.
+    selected: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class SensitivityReport:
+    codes: tuple[int, ...]
+    selected: tuple[int, ...]
+    # One per question and alternative answer, in question then code order.
+    changes: tuple[AnswerChange, ...]
+
+    def flips_top(self, change: AnswerChange) -> bool:
+        return change.selected[:1] != self.selected[:1]
+
+
+def analyze_sensitivity(codes: Sequence[int], catalog: CatalogSnapshot | None = None) -> SensitivityReport:
+    catalog = catalog or current_catalog()
+    matrix, table = catalog.scoring_matrix, catalog.selection_table
+    raw = matrix.raw_scores(codes)
+    scores = [score if score > MIN_SCORE_CLAMP else MIN_SCORE_CLAMP for score in raw]
+    ranking = matrix.rank(scores)
+    base_selected, _ = table.select(codes)
+    name_rank = [0] * len(scores)
+    for position, index in enumerate(matrix.name_order):
+        name_rank[index] = position
+
+    changes = []
+    for question_index, (contribution, code) in enumerate(zip(matrix.contributions, codes)):
+        current = contribution[code]
+        # The activities this question is tagged with; no other score depends on its answer.
+        affected = [index for index, value in enumerate(contribution[-1]) if value != contribution[0][index]]
+        unaffected = [index for index in ranking if index not in affected]
+        for alternative in range(len(RESPONSE_OPTION_ORDER)):
+            if alternative == code:
+                continue
+            if not affected:
+                changes.append(AnswerChange(question_index, alternative, base_selected))
+                continue
+            row = contribution[alternative]
+            shifted = scores.copy()
+            for index in affected:
+                score = raw[index] - current[index] + row[index]
+                shifted[index] = score if score > MIN_SCORE_CLAMP else MIN_SCORE_CLAMP
+            # Same order as ``ScoringMatrix.rank``: score descending, then name.
+            reranked = unaffected.copy()
+            for index in affected:
+                insort(reranked, index, key=lambda i: (-shifted[i], name_rank[i]))
+            selection = table.selections.get(tuple(reranked))
+            selected = selection[0] if selection is not None else tuple(catalog.index.select_top(reranked)[0])
+            changes.append(AnswerChange(question_index, alternative, selected))
+
+    return SensitivityReport(codes=tuple(codes), selected=base_selected, changes=tuple(changes))
+
+
+def render_sensitivity(report: SensitivityReport, catalog: CatalogSnapshot) -> dict[str, object]:
+    activities = catalog.activities
+
+    def names(selected: Sequence[int]) -> list[str]:
+        return [activities[index].name for index in selected]
+
+    base = set(report.selected)
+    alternatives = [
+        {
+            "question": change.question_index + 1,
+            "response": RESPONSE_OPTION_ORDER[change.code].value,
+            "recommendations": names(change.selected),
+            "added": names([index for index in change.selected if index not in base]),
+            "removed": names([index for index in report.selected if index not in change.selected]),
+            "changed": change.selected != report.selected,
+            "top_changed": report.flips_top(change),
+        }
+        for change in report.changes
+    ]
+    return {
+        "recommendations": names(report.selected),
+        "alternatives": alternatives,
+        "top_flips": [
+            {key: alternative[key] for key in ("question", "response")}
+            | {"top_recommendation": alternative["recommendations"][0]}
+            for alternative in alternatives
+            if alternative["top_changed"]
+        ],
+    }
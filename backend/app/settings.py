@@ -6,6 +6,37 @@ DEFAULT_WORKSHEET_NAME = "Submissions"
 DEFAULT_REQUEST_TIMEOUT_SECONDS = 5.0
 DEFAULT_MAX_RETRIES = 2
 DEFAULT_SCHEMA_VERSION = "v1"
+DEFAULT_SUBMISSION_QUEUE_CAPACITY = 10_000
+DEFAULT_SUBMISSION_QUEUE_DRAIN_TIMEOUT_SECONDS = 10.0
+DEFAULT_SUBMISSION_QUEUE_STATS_LOG_INTERVAL_SECONDS = 60.0
+DEFAULT_GOOGLE_SHEETS_BATCH_SIZE = 200
+DEFAULT_GOOGLE_SHEETS_BATCH_FLUSH_INTERVAL_SECONDS = 2.0
+SUBMISSION_QUEUE_OVERFLOW_POLICIES = ("drop_oldest", "spill_to_disk")
+SUBMISSION_STORE_BACKENDS = ("sheets", "journal")
+DEFAULT_SUBMISSION_JOURNAL_REPLAY_INTERVAL_SECONDS = 30.0
+DEFAULT_RECOMMENDATION_CACHE_SIZE = 4096
+DEFAULT_CATALOG_WATCH_INTERVAL_SECONDS = 5.0
+DEFAULT_GOOGLE_SHEETS_API_BASE_URL = "https://sheets.googleapis.com"
+DEFAULT_GOOGLE_SHEETS_MAX_CONNECTIONS = 100
+DEFAULT_QUESTIONS_CACHE_MAX_AGE_SECONDS = 300
+DEFAULT_METRICS_WRITE_INTERVAL_SECONDS = 5.0
+DEFAULT_PROFILING_DIR = "/tmp/dccd-profiles"
+DEFAULT_PROFILING_MAX_FILES = 100
+DEFAULT_GOOGLE_SHEETS_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_GOOGLE_SHEETS_BREAKER_RESET_SECONDS = 30.0
+GOOGLE_SHEETS_FALLBACKS = ("none", "journal")
+DEFAULT_GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS = 60.0
+DEFAULT_SCORING_SESSION_CAPACITY = 10_000
+DEFAULT_SCORING_SESSION_TTL_SECONDS = 1800.0
+DEFAULT_ADMISSION_MAX_CONCURRENCY = 64
+DEFAULT_ADMISSION_MAX_QUEUE = 128
+DEFAULT_ADMISSION_MAX_WAIT_SECONDS = 0.5
+DEFAULT_ADMISSION_CLIENT_RATE_PER_SECOND = 2.0
+DEFAULT_ADMISSION_CLIENT_BURST = 20
+DEFAULT_ADMISSION_STORAGE_SHED_RATIO = 0.8
+DEFAULT_IDEMPOTENCY_CACHE_SIZE = 10_000
+DEFAULT_IDEMPOTENCY_TTL_SECONDS = 900.0
+DEFAULT_BATCH_MAX_UPLOAD_BYTES = 32 << 20
 
 
 def _parse_bool(raw_value: str | None, *, default: bool = False) -> bool:
@@ -20,13 +51,15 @@ def _parse_bool(raw_value: str | None, *, default: bool = False) -> bool:
     return default
 
 
-def _parse_float(raw_value: str | None, *, default: float) -> float:
+def _parse_float(raw_value: str | None, *, default: float, allow_zero: bool = False) -> float:
     if raw_value is None or raw_value.strip() == "":
         return default
     try:
         parsed = float(raw_value)
     except ValueError:
         return default
+    if allow_zero and parsed == 0:
+        return parsed
     return parsed if parsed > 0 else default
 
 
@@ -40,6 +73,14 @@ def _parse_int(raw_value: str | None, *, default: int) -> int:
     return parsed if parsed >= 0 else default
 
 
+def _parse_choice(raw_value: str | None, *, choices: tuple[str, ...], default: str) -> str:
+    if raw_value is None:
+        return default
+
+    normalized = raw_value.strip().lower().replace("-", "_")
+    return normalized if normalized in choices else default
+
+
 @dataclass(frozen=True)
 class Settings:
     google_sheets_enabled: bool
@@ -52,6 +93,51 @@ class Settings:
     enable_visitor_hash: bool
     visitor_hash_secret: str | None
     schema_version: str
+    submission_queue_enabled: bool = True
+    submission_queue_capacity: int = DEFAULT_SUBMISSION_QUEUE_CAPACITY
+    submission_queue_overflow_policy: str = "drop_oldest"
+    submission_queue_spill_path: str | None = None
+    submission_queue_drain_timeout_seconds: float = DEFAULT_SUBMISSION_QUEUE_DRAIN_TIMEOUT_SECONDS
+    submission_queue_stats_log_interval_seconds: float = DEFAULT_SUBMISSION_QUEUE_STATS_LOG_INTERVAL_SECONDS
+    google_sheets_batch_size: int = DEFAULT_GOOGLE_SHEETS_BATCH_SIZE
+    google_sheets_batch_flush_interval_seconds: float = DEFAULT_GOOGLE_SHEETS_BATCH_FLUSH_INTERVAL_SECONDS
+    submission_store_backend: str = "sheets"
+    submission_journal_path: str | None = None
+    submission_journal_replay_interval_seconds: float = DEFAULT_SUBMISSION_JOURNAL_REPLAY_INTERVAL_SECONDS
+    recommendation_cache_size: int = DEFAULT_RECOMMENDATION_CACHE_SIZE
+    catalog_watch_enabled: bool = True
+    catalog_watch_interval_seconds: float = DEFAULT_CATALOG_WATCH_INTERVAL_SECONDS
+    admin_api_token: str | None = None
+    google_sheets_async: bool = False
+    google_sheets_api_base_url: str = DEFAULT_GOOGLE_SHEETS_API_BASE_URL
+    google_sheets_max_connections: int = DEFAULT_GOOGLE_SHEETS_MAX_CONNECTIONS
+    questions_cache_max_age_seconds: int = DEFAULT_QUESTIONS_CACHE_MAX_AGE_SECONDS
+    metrics_enabled: bool = True
+    metrics_multiproc_dir: str | None = None
+    metrics_write_interval_seconds: float = DEFAULT_METRICS_WRITE_INTERVAL_SECONDS
+    profiling_enabled: bool = False
+    profiling_sample_every: int = 0
+    profiling_dir: str = DEFAULT_PROFILING_DIR
+    profiling_max_files: int = DEFAULT_PROFILING_MAX_FILES
+    google_sheets_breaker_failure_threshold: int = DEFAULT_GOOGLE_SHEETS_BREAKER_FAILURE_THRESHOLD
+    google_sheets_breaker_reset_seconds: float = DEFAULT_GOOGLE_SHEETS_BREAKER_RESET_SECONDS
+    google_sheets_fallback: str = "none"
+    startup_warmup_enabled: bool = True
+    google_token_refresh_interval_seconds: float = DEFAULT_GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS
+    submission_writer_socket: str | None = None
+    scoring_session_capacity: int = DEFAULT_SCORING_SESSION_CAPACITY
+    scoring_session_ttl_seconds: float = DEFAULT_SCORING_SESSION_TTL_SECONDS
+    admission_control_enabled: bool = False
+    admission_max_concurrency: int = DEFAULT_ADMISSION_MAX_CONCURRENCY
+    admission_max_queue: int = DEFAULT_ADMISSION_MAX_QUEUE
+    admission_max_wait_seconds: float = DEFAULT_ADMISSION_MAX_WAIT_SECONDS
+    admission_client_rate_per_second: float = DEFAULT_ADMISSION_CLIENT_RATE_PER_SECOND
+    admission_client_burst: int = DEFAULT_ADMISSION_CLIENT_BURST
+    admission_storage_shed_ratio: float = DEFAULT_ADMISSION_STORAGE_SHED_RATIO
+    idempotency_cache_size: int = DEFAULT_IDEMPOTENCY_CACHE_SIZE
+    idempotency_ttl_seconds: float = DEFAULT_IDEMPOTENCY_TTL_SECONDS
+    idempotency_persistent: bool = False
+    batch_max_upload_bytes: int = DEFAULT_BATCH_MAX_UPLOAD_BYTES
 
 
 def load_settings_from_env() -> Settings:
@@ -62,6 +148,12 @@ def load_settings_from_env() -> Settings:
     service_account_file = (os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE") or "").strip() or None
     visitor_hash_secret = (os.getenv("VISITOR_HASH_SECRET") or "").strip() or None
     schema_version = (os.getenv("SUBMISSION_SCHEMA_VERSION") or "").strip() or DEFAULT_SCHEMA_VERSION
+    queue_spill_path = (os.getenv("SUBMISSION_QUEUE_SPILL_PATH") or "").strip() or None
+    journal_path = (os.getenv("SUBMISSION_JOURNAL_PATH") or "").strip() or None
+    admin_api_token = (os.getenv("ADMIN_API_TOKEN") or "").strip() or None
+    sheets_api_base_url = (
+        (os.getenv("GOOGLE_SHEETS_API_BASE_URL") or "").strip().rstrip("/") or DEFAULT_GOOGLE_SHEETS_API_BASE_URL
+    )
 
     return Settings(
         google_sheets_enabled=_parse_bool(os.getenv("GOOGLE_SHEETS_ENABLED"), default=False),
@@ -80,4 +172,144 @@ def load_settings_from_env() -> Settings:
         enable_visitor_hash=_parse_bool(os.getenv("ENABLE_VISITOR_HASH"), default=False),
         visitor_hash_secret=visitor_hash_secret,
         schema_version=schema_version,
+        submission_queue_enabled=_parse_bool(os.getenv("SUBMISSION_QUEUE_ENABLED"), default=True),
+        submission_queue_capacity=_parse_int(
+            os.getenv("SUBMISSION_QUEUE_CAPACITY"),
+            default=DEFAULT_SUBMISSION_QUEUE_CAPACITY,
+        )
+        or DEFAULT_SUBMISSION_QUEUE_CAPACITY,
+        submission_queue_overflow_policy=_parse_choice(
+            os.getenv("SUBMISSION_QUEUE_OVERFLOW_POLICY"),
+            choices=SUBMISSION_QUEUE_OVERFLOW_POLICIES,
+            default="drop_oldest",
+        ),
+        submission_queue_spill_path=queue_spill_path,
+        submission_queue_drain_timeout_seconds=_parse_float(
+            os.getenv("SUBMISSION_QUEUE_DRAIN_TIMEOUT_SECONDS"),
+            default=DEFAULT_SUBMISSION_QUEUE_DRAIN_TIMEOUT_SECONDS,
+        ),
+        submission_queue_stats_log_interval_seconds=_parse_float(
+            os.getenv("SUBMISSION_QUEUE_STATS_LOG_INTERVAL_SECONDS"),
+            default=DEFAULT_SUBMISSION_QUEUE_STATS_LOG_INTERVAL_SECONDS,
+        ),
+        google_sheets_batch_size=_parse_int(
+            os.getenv("GOOGLE_SHEETS_BATCH_SIZE"),
+            default=DEFAULT_GOOGLE_SHEETS_BATCH_SIZE,
+        )
+        or 1,
+        google_sheets_batch_flush_interval_seconds=_parse_float(
+            os.getenv("GOOGLE_SHEETS_BATCH_FLUSH_INTERVAL_SECONDS"),
+            default=DEFAULT_GOOGLE_SHEETS_BATCH_FLUSH_INTERVAL_SECONDS,
+        ),
+        submission_store_backend=_parse_choice(
+            os.getenv("SUBMISSION_STORE_BACKEND"),
+            choices=SUBMISSION_STORE_BACKENDS,
+            default="sheets",
+        ),
+        submission_journal_path=journal_path,
+        submission_journal_replay_interval_seconds=_parse_float(
+            os.getenv("SUBMISSION_JOURNAL_REPLAY_INTERVAL_SECONDS"),
+            default=DEFAULT_SUBMISSION_JOURNAL_REPLAY_INTERVAL_SECONDS,
+            allow_zero=True,
+        ),
+        recommendation_cache_size=_parse_int(
+            os.getenv("RECOMMENDATION_CACHE_SIZE"),
+            default=DEFAULT_RECOMMENDATION_CACHE_SIZE,
+        ),
+        catalog_watch_enabled=_parse_bool(os.getenv("CATALOG_WATCH_ENABLED"), default=True),
+        catalog_watch_interval_seconds=_parse_float(
+            os.getenv("CATALOG_WATCH_INTERVAL_SECONDS"),
+            default=DEFAULT_CATALOG_WATCH_INTERVAL_SECONDS,
+        ),
+        admin_api_token=admin_api_token,
+        google_sheets_async=_parse_bool(os.getenv("GOOGLE_SHEETS_ASYNC"), default=False),
+        google_sheets_api_base_url=sheets_api_base_url,
+        google_sheets_max_connections=_parse_int(
+            os.getenv("GOOGLE_SHEETS_MAX_CONNECTIONS"),
+            default=DEFAULT_GOOGLE_SHEETS_MAX_CONNECTIONS,
+        )
+        or DEFAULT_GOOGLE_SHEETS_MAX_CONNECTIONS,
+        questions_cache_max_age_seconds=_parse_int(
+            os.getenv("QUESTIONS_CACHE_MAX_AGE_SECONDS"),
+            default=DEFAULT_QUESTIONS_CACHE_MAX_AGE_SECONDS,
+        ),
+        metrics_enabled=_parse_bool(os.getenv("METRICS_ENABLED"), default=True),
+        metrics_multiproc_dir=(os.getenv("METRICS_MULTIPROC_DIR") or "").strip() or None,
+        metrics_write_interval_seconds=_parse_float(
+            os.getenv("METRICS_WRITE_INTERVAL_SECONDS"),
+            default=DEFAULT_METRICS_WRITE_INTERVAL_SECONDS,
+        ),
+        profiling_enabled=_parse_bool(os.getenv("PROFILING_ENABLED"), default=False),
+        profiling_sample_every=_parse_int(os.getenv("PROFILING_SAMPLE_EVERY"), default=0),
+        profiling_dir=(os.getenv("PROFILING_DIR") or "").strip() or DEFAULT_PROFILING_DIR,
+        profiling_max_files=_parse_int(os.getenv("PROFILING_MAX_FILES"), default=DEFAULT_PROFILING_MAX_FILES)
+        or DEFAULT_PROFILING_MAX_FILES,
+        google_sheets_breaker_failure_threshold=_parse_int(
+            os.getenv("GOOGLE_SHEETS_BREAKER_FAILURE_THRESHOLD"),
+            default=DEFAULT_GOOGLE_SHEETS_BREAKER_FAILURE_THRESHOLD,
+        ),
+        google_sheets_breaker_reset_seconds=_parse_float(
+            os.getenv("GOOGLE_SHEETS_BREAKER_RESET_SECONDS"),
+            default=DEFAULT_GOOGLE_SHEETS_BREAKER_RESET_SECONDS,
+        ),
+        google_sheets_fallback=_parse_choice(
+            os.getenv("GOOGLE_SHEETS_FALLBACK"),
+            choices=GOOGLE_SHEETS_FALLBACKS,
+            default="none",
+        ),
+        startup_warmup_enabled=_parse_bool(os.getenv("STARTUP_WARMUP_ENABLED"), default=True),
+        google_token_refresh_interval_seconds=_parse_float(
+            os.getenv("GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS"),
+            default=DEFAULT_GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS,
+            allow_zero=True,
+        ),
+        submission_writer_socket=os.getenv("SUBMISSION_WRITER_SOCKET") or None,
+        scoring_session_capacity=_parse_int(
+            os.getenv("SCORING_SESSION_CAPACITY"),
+            default=DEFAULT_SCORING_SESSION_CAPACITY,
+        )
+        or DEFAULT_SCORING_SESSION_CAPACITY,
+        scoring_session_ttl_seconds=_parse_float(
+            os.getenv("SCORING_SESSION_TTL_SECONDS"),
+            default=DEFAULT_SCORING_SESSION_TTL_SECONDS,
+        ),
+        admission_control_enabled=_parse_bool(os.getenv("ADMISSION_CONTROL_ENABLED"), default=False),
+        admission_max_concurrency=_parse_int(
+            os.getenv("ADMISSION_MAX_CONCURRENCY"),
+            default=DEFAULT_ADMISSION_MAX_CONCURRENCY,
+        )
+        or DEFAULT_ADMISSION_MAX_CONCURRENCY,
+        admission_max_queue=_parse_int(os.getenv("ADMISSION_MAX_QUEUE"), default=DEFAULT_ADMISSION_MAX_QUEUE),
+        admission_max_wait_seconds=_parse_float(
+            os.getenv("ADMISSION_MAX_WAIT_SECONDS"),
+            default=DEFAULT_ADMISSION_MAX_WAIT_SECONDS,
+        ),
+        admission_client_rate_per_second=_parse_float(
+            os.getenv("ADMISSION_CLIENT_RATE_PER_SECOND"),
+            default=DEFAULT_ADMISSION_CLIENT_RATE_PER_SECOND,
+            allow_zero=True,
+        ),
+        admission_client_burst=_parse_int(
+            os.getenv("ADMISSION_CLIENT_BURST"),
+            default=DEFAULT_ADMISSION_CLIENT_BURST,
+        )
+        or DEFAULT_ADMISSION_CLIENT_BURST,
+        admission_storage_shed_ratio=_parse_float(
+            os.getenv("ADMISSION_STORAGE_SHED_RATIO"),
+            default=DEFAULT_ADMISSION_STORAGE_SHED_RATIO,
+        ),
+        idempotency_cache_size=_parse_int(
+            os.getenv("IDEMPOTENCY_CACHE_SIZE"),
+            default=DEFAULT_IDEMPOTENCY_CACHE_SIZE,
+        ),
+        idempotency_ttl_seconds=_parse_float(
+            os.getenv("IDEMPOTENCY_TTL_SECONDS"),
+            default=DEFAULT_IDEMPOTENCY_TTL_SECONDS,
+        ),
+        idempotency_persistent=_parse_bool(os.getenv("IDEMPOTENCY_PERSISTENT"), default=False),
+        batch_max_upload_bytes=_parse_int(
+            os.getenv("BATCH_MAX_UPLOAD_BYTES"),
+            default=DEFAULT_BATCH_MAX_UPLOAD_BYTES,
+        )
+        or DEFAULT_BATCH_MAX_UPLOAD_BYTES,
     )
@@ -0,0 +1,377 @@
+"""Durable local submission journal backed by SQLite in WAL mode.
+
+Appends are group-committed: concurrent callers hand their rows to a single committer thread, which
+writes everything pending in one transaction (one WAL fsync) and then releases all of them. Rows are
+kept in the ``SUBMISSION_COLUMNS`` layout and can be forwarded to Google Sheets later by
+``JournalReplayer``.
+"""
+
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .settings import load_settings_from_env
+from .submission_store import (
+    SUBMISSION_COLUMNS,
+    SubmissionRecord,
+    SubmissionStore,
+    SubmissionStoreError,
+    build_submission_row,
+    create_google_sheets_store,
+    parse_submission_row,
+)
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMIT_WAIT_TIMEOUT_SECONDS = 10.0
+DEFAULT_REPLAY_BATCH_SIZE = 200
+DEFAULT_REPLAY_CLAIM_LEASE_SECONDS = 300.0
+
+_COLUMN_LIST = ", ".join(SUBMISSION_COLUMNS)
+_INSERT_SQL = (
+    f"INSERT OR IGNORE INTO submissions ({_COLUMN_LIST}) "
+    f"VALUES ({', '.join('?' for _ in SUBMISSION_COLUMNS)})"
+)
+_CREATE_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS submissions ("
+    "journal_seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+    + ", ".join(
+        f"{column} TEXT NOT NULL UNIQUE" if column == "submission_id" else f"{column} TEXT NOT NULL DEFAULT ''"
+        for column in SUBMISSION_COLUMNS
+    )
+    + ", forwarded_at_utc TEXT, claim_token TEXT, claim_expires_at REAL)"
+)
+# Columns added after the first journal release; created on open for older journal files.
+_MIGRATION_COLUMNS = {
+    "claim_token": "TEXT",
+    "claim_expires_at": "REAL",
+    "catalog_version": "TEXT NOT NULL DEFAULT ''",
+}
+_CREATE_PENDING_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS submissions_pending ON submissions (journal_seq) WHERE forwarded_at_utc IS NULL"
+)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=FULL")
+    return connection
+
+
+def iter_journal_records(
+    path: str | Path,
+    *,
+    page_size: int = 1000,
+    pending_only: bool = False,
+) -> Iterator[list[SubmissionRecord]]:
+    """Read a journal page by page on its own connection, without opening a ``JournalSubmissionStore``."""
+    if not Path(path).exists():
+        raise SubmissionStoreError(f"Submission journal {path} does not exist.")
+    return _iter_journal_pages(Path(path), page_size=page_size, pending_only=pending_only)
+
+
+def _iter_journal_pages(path: Path, *, page_size: int, pending_only: bool) -> Iterator[list[SubmissionRecord]]:
+    connection = _connect(path)
+    try:
+        last_seq = 0
+        where = "journal_seq > ?" + (" AND forwarded_at_utc IS NULL" if pending_only else "")
+        while True:
+            rows = connection.execute(
+                f"SELECT journal_seq, {_COLUMN_LIST} FROM submissions WHERE {where} ORDER BY journal_seq LIMIT ?",
+                (last_seq, page_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_seq = rows[-1][0]
+            yield [parse_submission_row(row[1:]) for row in rows]
+    finally:
+        connection.close()
+
+
+@dataclass
+class _PendingWrite:
+    rows: list[list[str]]
+    done: threading.Event = field(default_factory=threading.Event)
+    error: BaseException | None = None
+
+
+class JournalSubmissionStore:
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        commit_wait_timeout_seconds: float = DEFAULT_COMMIT_WAIT_TIMEOUT_SECONDS,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_wait_timeout_seconds = commit_wait_timeout_seconds
+
+        self._connection = _connect(self.path)
+        self._connection.execute(_CREATE_TABLE_SQL)
+        existing_columns = {row[1] for row in self._connection.execute("PRAGMA table_info(submissions)")}
+        for column, column_type in _MIGRATION_COLUMNS.items():
+            if column not in existing_columns:
+                self._connection.execute(f"ALTER TABLE submissions ADD COLUMN {column} {column_type}")
+        self._connection.execute(_CREATE_PENDING_INDEX_SQL)
+
+        self._pending: list[_PendingWrite] = []
+        self._condition = threading.Condition()
+        self._connection_lock = threading.Lock()
+        self._closing = False
+        self._committer = threading.Thread(target=self._run_committer, name="submission-journal-committer", daemon=True)
+        self._committer.start()
+        self._replayer: "JournalReplayer | None" = None
+
+    def append_submission(
+        self,
+        *,
+        submitted_at_utc: str,
+        submission_id: str,
+        responses: list[str],
+        recommendations: list[str],
+        visitor_hash: str | None,
+        schema_version: str,
+        catalog_version: str | None = None,
+    ) -> None:
+        row = build_submission_row(
+            submitted_at_utc=submitted_at_utc,
+            submission_id=submission_id,
+            responses=responses,
+            recommendations=recommendations,
+            visitor_hash=visitor_hash,
+            schema_version=schema_version,
+            catalog_version=catalog_version,
+        )
+        self._commit([row])
+
+    def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        self._commit([build_submission_row(**record.as_kwargs()) for record in records])
+
+    def pending_count(self) -> int:
+        with self._connection_lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM submissions WHERE forwarded_at_utc IS NULL"
+            ).fetchone()
+        return int(count)
+
+    def iter_records(self, *, page_size: int = 1000, pending_only: bool = False) -> Iterator[list[SubmissionRecord]]:
+        """Yield journaled submissions page by page in append order."""
+        return iter_journal_records(self.path, page_size=page_size, pending_only=pending_only)
+
+    def claim_pending(
+        self,
+        *,
+        limit: int,
+        lease_seconds: float = DEFAULT_REPLAY_CLAIM_LEASE_SECONDS,
+    ) -> tuple[str, list[SubmissionRecord]]:
+        """Claim up to ``limit`` unforwarded rows for one replayer.
+
+        Claims are taken inside a ``BEGIN IMMEDIATE`` transaction, so replayers in several worker
+        processes sharing one journal never forward the same row concurrently. A claim that is not
+        completed (e.g. the process died) expires after ``lease_seconds``.
+        """
+        token = uuid.uuid4().hex
+        now = time.time()
+        with self._connection_lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._connection.execute(
+                    f"SELECT journal_seq, {_COLUMN_LIST} FROM submissions "
+                    "WHERE forwarded_at_utc IS NULL AND (claim_expires_at IS NULL OR claim_expires_at < ?) "
+                    "ORDER BY journal_seq LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                self._connection.executemany(
+                    "UPDATE submissions SET claim_token = ?, claim_expires_at = ? WHERE journal_seq = ?",
+                    [(token, now + lease_seconds, row[0]) for row in rows],
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return token, [parse_submission_row(row[1:]) for row in rows]
+
+    def release_claim(self, token: str) -> None:
+        with self._connection_lock:
+            self._connection.execute(
+                "UPDATE submissions SET claim_token = NULL, claim_expires_at = NULL "
+                "WHERE claim_token = ? AND forwarded_at_utc IS NULL",
+                (token,),
+            )
+
+    def mark_forwarded(self, submission_ids: list[str]) -> None:
+        if not submission_ids:
+            return
+        forwarded_at = datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+        with self._connection_lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(
+                    "UPDATE submissions SET forwarded_at_utc = ?, claim_token = NULL, claim_expires_at = NULL "
+                    "WHERE submission_id = ?",
+                    [(forwarded_at, submission_id) for submission_id in submission_ids],
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def start_replay(self, target: SubmissionStore, *, interval_seconds: float) -> None:
+        self._replayer = JournalReplayer(self, target)
+        self._replayer.start(interval_seconds=interval_seconds)
+
+    def close(self) -> None:
+        if self._replayer is not None:
+            self._replayer.stop()
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        self._committer.join(self.commit_wait_timeout_seconds)
+        self._connection.close()
+
+    def _commit(self, rows: list[list[str]]) -> None:
+        if not rows:
+            return
+        pending = _PendingWrite(rows=rows)
+        with self._condition:
+            if self._closing:
+                raise SubmissionStoreError("Submission journal is closed.")
+            self._pending.append(pending)
+            self._condition.notify()
+
+        if not pending.done.wait(self.commit_wait_timeout_seconds):
+            raise SubmissionStoreError("Timed out waiting for the submission journal to commit.")
+        if pending.error is not None:
+            raise SubmissionStoreError("Failed to append submission to the local journal.") from pending.error
+
+    def _run_committer(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closing:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                group, self._pending = self._pending, []
+
+            # Everything that queued up while the previous transaction was syncing shares this one.
+            with self._connection_lock:
+                try:
+                    self._insert(group)
+                except sqlite3.Error:
+                    logger.warning(
+                        "Submission journal group commit failed; retrying %d writers individually.", len(group)
+                    )
+                    # One bad writer must not fail everyone else's rows.
+                    for pending in group:
+                        try:
+                            self._insert([pending])
+                        except sqlite3.Error as exc:
+                            logger.exception("Submission journal commit failed")
+                            pending.error = exc
+
+            for pending in group:
+                pending.done.set()
+
+    def _insert(self, group: list[_PendingWrite]) -> None:
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+            for pending in group:
+                self._connection.executemany(_INSERT_SQL, pending.rows)
+            self._connection.execute("COMMIT")
+        except sqlite3.Error:
+            if self._connection.in_transaction:
+                self._connection.execute("ROLLBACK")
+            raise
+
+
+class JournalReplayer:
+    """Forwards journaled submissions that have not reached ``target`` yet, oldest first."""
+
+    def __init__(
+        self,
+        journal: JournalSubmissionStore,
+        target: SubmissionStore,
+        *,
+        batch_size: int = DEFAULT_REPLAY_BATCH_SIZE,
+    ) -> None:
+        self.journal = journal
+        self.target = target
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def replay_pending(self) -> int:
+        forwarded = 0
+        while True:
+            token, records = self.journal.claim_pending(limit=self.batch_size)
+            if not records:
+                return forwarded
+            try:
+                append_submissions = getattr(self.target, "append_submissions", None)
+                if callable(append_submissions):
+                    append_submissions(records)
+                else:
+                    for record in records:
+                        self.target.append_submission(**record.as_kwargs())
+            except BaseException:
+                self.journal.release_claim(token)
+                raise
+            self.journal.mark_forwarded([record.submission_id for record in records])
+            forwarded += len(records)
+
+    def start(self, *, interval_seconds: float) -> None:
+        self._thread = threading.Thread(
+            target=self._run, args=(interval_seconds,), name="submission-journal-replayer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=DEFAULT_COMMIT_WAIT_TIMEOUT_SECONDS)
+
+    def _run(self, interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            try:
+                forwarded = self.replay_pending()
+            except (SubmissionStoreError, sqlite3.Error):
+                logger.exception("Replaying journaled submissions failed; will retry.")
+                continue
+            if forwarded:
+                logger.info("Forwarded %d journaled submissions.", forwarded)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Forward journaled survey submissions to Google Sheets.")
+    parser.add_argument("journal_path", nargs="?", help="Defaults to SUBMISSION_JOURNAL_PATH.")
+    args = parser.parse_args(argv)
+
+    settings = load_settings_from_env()
+    journal_path = args.journal_path or settings.submission_journal_path
+    if not journal_path:
+        parser.error("No journal path given and SUBMISSION_JOURNAL_PATH is not set.")
+
+    target = create_google_sheets_store(settings)
+    if target is None:
+        parser.error("Google Sheets storage is not configured; see the backend README.")
+
+    journal = JournalSubmissionStore(journal_path)
+    try:
+        forwarded = JournalReplayer(journal, target).replay_pending()
+    finally:
+        journal.close()
+    print(f"Forwarded {forwarded} submissions.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
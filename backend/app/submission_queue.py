@@ -0,0 +1,370 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from .submission_store import SubmissionRecord, SubmissionStore, SubmissionStoreError
+
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_SPILL_TO_DISK = "spill_to_disk"
+SPILL_RECOVERY_INTERVAL_SECONDS = 30.0
+DEFAULT_STATS_LOG_INTERVAL_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class SubmissionQueueStats:
+    depth: int
+    capacity: int
+    enqueued: int
+    written: int
+    failed: int
+    dropped: int
+    spilled: int
+    oldest_pending_age_seconds: float
+    last_write_lag_seconds: float
+    max_write_lag_seconds: float
+
+
+class QueuedSubmissionStore:
+    """Write-behind wrapper that hands submissions to a dedicated flusher thread.
+
+    ``append_submission`` only appends to a bounded in-memory queue, so request handlers never
+    wait on the wrapped store (or on its retry sleeps).
+    """
+
+    nonblocking_append = True
+
+    def __init__(
+        self,
+        store: SubmissionStore,
+        *,
+        capacity: int,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+        spill_path: str | None = None,
+        drain_timeout_seconds: float = 10.0,
+        batch_size: int = 1,
+        flush_interval_seconds: float = 0.0,
+        stats_log_interval_seconds: float = DEFAULT_STATS_LOG_INTERVAL_SECONDS,
+    ) -> None:
+        if overflow_policy == OVERFLOW_SPILL_TO_DISK and not spill_path:
+            logger.warning(
+                "SUBMISSION_QUEUE_OVERFLOW_POLICY is spill_to_disk, but SUBMISSION_QUEUE_SPILL_PATH is missing. "
+                "Falling back to drop_oldest."
+            )
+            overflow_policy = OVERFLOW_DROP_OLDEST
+
+        self.store = store
+        self.capacity = max(1, capacity)
+        self.overflow_policy = overflow_policy
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.stats_log_interval_seconds = stats_log_interval_seconds
+
+        self._pending: deque[tuple[float, SubmissionRecord]] = deque()
+        self._condition = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closing = False
+        self._last_recovery_at = float("-inf")
+        self._last_stats_log_at = time.monotonic()
+
+        self._enqueued = 0
+        self._written = 0
+        self._failed = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._last_write_lag_seconds = 0.0
+        self._max_write_lag_seconds = 0.0
+
+    def append_submission(
+        self,
+        *,
+        submitted_at_utc: str,
+        submission_id: str,
+        responses: list[str],
+        recommendations: list[str],
+        visitor_hash: str | None,
+        schema_version: str,
+        catalog_version: str | None = None,
+    ) -> None:
+        self.enqueue(
+            SubmissionRecord(
+                submitted_at_utc=submitted_at_utc,
+                submission_id=submission_id,
+                responses=responses,
+                recommendations=recommendations,
+                visitor_hash=visitor_hash,
+                schema_version=schema_version,
+                catalog_version=catalog_version,
+            )
+        )
+
+    def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        """Queue a bulk import for the flusher, waiting for room instead of overflowing.
+
+        Raises ``SubmissionStoreError`` if the queue is closed, or stays full for longer than the
+        drain timeout.
+        """
+        for record in records:
+            deadline = time.monotonic() + self.drain_timeout_seconds
+            with self._condition:
+                while not self._closing and len(self._pending) >= self.capacity:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise SubmissionStoreError("Submission queue stayed full during a bulk import.")
+                    self._condition.wait(remaining)
+                if self._closing:
+                    raise SubmissionStoreError("Submission queue is closed.")
+                self._ensure_started()
+                self._pending.append((time.monotonic(), record))
+                self._enqueued += 1
+                self._condition.notify_all()
+
+    def enqueue(self, record: SubmissionRecord) -> None:
+        overflow: SubmissionRecord | None = None
+        with self._condition:
+            if self._closing:
+                raise SubmissionStoreError("Submission queue is closed.")
+            self._ensure_started()
+
+            if len(self._pending) >= self.capacity:
+                if self.overflow_policy == OVERFLOW_SPILL_TO_DISK:
+                    overflow = record
+                else:
+                    self._pending.popleft()
+                    self._dropped += 1
+                    logger.warning("Submission queue is full; dropped the oldest pending submission.")
+
+            if overflow is None:
+                self._pending.append((time.monotonic(), record))
+                self._enqueued += 1
+                # The flusher only needs waking to start its flush timer or once a full batch is ready.
+                if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                    self._condition.notify_all()
+
+        if overflow is not None:
+            self._spill([overflow])
+
+    def stats(self) -> SubmissionQueueStats:
+        with self._condition:
+            oldest_age = time.monotonic() - self._pending[0][0] if self._pending else 0.0
+            return SubmissionQueueStats(
+                depth=len(self._pending),
+                capacity=self.capacity,
+                enqueued=self._enqueued,
+                written=self._written,
+                failed=self._failed,
+                dropped=self._dropped,
+                spilled=self._spilled,
+                oldest_pending_age_seconds=oldest_age,
+                last_write_lag_seconds=self._last_write_lag_seconds,
+                max_write_lag_seconds=self._max_write_lag_seconds,
+            )
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop accepting submissions and drain what is pending into the wrapped store.
+
+        Anything still queued once ``timeout`` elapses is spilled to disk when a spill path is
+        configured, and logged as lost otherwise.
+        """
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join(self.drain_timeout_seconds if timeout is None else timeout)
+
+        with self._condition:
+            leftover = [record for _, record in self._pending]
+            self._pending.clear()
+
+        if not leftover:
+            return
+        if self.spill_path is not None:
+            self._spill(leftover)
+        else:
+            with self._condition:
+                self._dropped += len(leftover)
+            logger.error("Submission queue shut down with %d unwritten submissions.", len(leftover))
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="submission-queue-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                batch = self._wait_for_batch()
+            if batch is None:
+                return
+            try:
+                if batch:
+                    self._write_batch(batch)
+                else:
+                    self._recover_spilled()
+                self._maybe_log_stats()
+            except Exception:
+                # Keep the flusher alive; a dead flusher would leave every later submission pending.
+                logger.exception("Submission queue flusher hit an unexpected error")
+
+    def _wait_for_batch(self) -> list[tuple[float, SubmissionRecord]] | None:
+        """Block until a batch is due; must be called with ``_condition`` held.
+
+        Returns ``None`` once the queue is closed and drained, and an empty list when the flusher is
+        idle and may look for spilled submissions.
+        """
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return None
+                notified = self._condition.wait(self._idle_wait_seconds())
+                if not notified and not self._pending:
+                    return []
+                continue
+
+            age = time.monotonic() - self._pending[0][0]
+            if self._closing or len(self._pending) >= self.batch_size or age >= self.flush_interval_seconds:
+                count = min(self.batch_size, len(self._pending))
+                batch = [self._pending.popleft() for _ in range(count)]
+                # Wake bulk importers waiting for room.
+                self._condition.notify_all()
+                return batch
+            self._condition.wait(self.flush_interval_seconds - age)
+
+    def _idle_wait_seconds(self) -> float | None:
+        intervals = [self.stats_log_interval_seconds] if self.stats_log_interval_seconds > 0 else []
+        if self.spill_path is not None:
+            intervals.append(SPILL_RECOVERY_INTERVAL_SECONDS)
+        return min(intervals) if intervals else None
+
+    def _maybe_log_stats(self) -> None:
+        if self.stats_log_interval_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_stats_log_at < self.stats_log_interval_seconds:
+            return
+        self._last_stats_log_at = now
+
+        stats = self.stats()
+        logger.info(
+            "Submission queue: depth=%d/%d oldest_pending_age=%.2fs last_write_lag=%.2fs max_write_lag=%.2fs "
+            "enqueued=%d written=%d failed=%d dropped=%d spilled=%d",
+            stats.depth,
+            stats.capacity,
+            stats.oldest_pending_age_seconds,
+            stats.last_write_lag_seconds,
+            stats.max_write_lag_seconds,
+            stats.enqueued,
+            stats.written,
+            stats.failed,
+            stats.dropped,
+            stats.spilled,
+        )
+
+    def _write_batch(self, batch: list[tuple[float, SubmissionRecord]], *, spill_failures: bool = False) -> None:
+        append_submissions = getattr(self.store, "append_submissions", None)
+        if callable(append_submissions):
+            records = [record for _, record in batch]
+            try:
+                append_submissions(records)
+            except Exception:  # Any store failure, not just SubmissionStoreError, must not stop the flusher.
+                logger.exception("Failed to store a batch of %d survey submissions", len(records))
+                self._record_failure(records, spill=spill_failures)
+                return
+            self._record_written(batch[0][0], len(records))
+            return
+
+        for enqueued_at, record in batch:
+            try:
+                self.store.append_submission(**record.as_kwargs())
+            except Exception:
+                logger.exception("Failed to store survey submission (submission_id=%s)", record.submission_id)
+                self._record_failure([record], spill=spill_failures)
+                continue
+            self._record_written(enqueued_at, 1)
+
+    def _record_written(self, enqueued_at: float, count: int) -> None:
+        lag = time.monotonic() - enqueued_at
+        with self._condition:
+            self._written += count
+            self._last_write_lag_seconds = lag
+            self._max_write_lag_seconds = max(self._max_write_lag_seconds, lag)
+
+    def _record_failure(self, records: list[SubmissionRecord], *, spill: bool = False) -> None:
+        with self._condition:
+            self._failed += len(records)
+        if spill or self.overflow_policy == OVERFLOW_SPILL_TO_DISK:
+            self._spill(records)
+
+    def _spill(self, records: list[SubmissionRecord]) -> None:
+        if self.spill_path is None:
+            return
+        with self._spill_lock:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("a", encoding="utf-8") as spill_file:
+                for record in records:
+                    spill_file.write(json.dumps(record.as_kwargs()) + "\n")
+                spill_file.flush()
+                os.fsync(spill_file.fileno())
+        with self._condition:
+            self._spilled += len(records)
+
+    def _recover_spilled(self) -> None:
+        if self.spill_path is None or self._closing:
+            return
+        # Throttled so a persistently failing store is not retried in a tight loop.
+        now = time.monotonic()
+        if now - self._last_recovery_at < SPILL_RECOVERY_INTERVAL_SECONDS:
+            return
+        self._last_recovery_at = now
+
+        # The spill file is moved aside (atomically) rather than deleted, and only removed once every
+        # record in it has been written or re-spilled, so a crash mid-recovery loses nothing.
+        recovering_path = self.spill_path.with_name(self.spill_path.name + ".recovering")
+        with self._spill_lock:
+            if not recovering_path.exists():
+                if not self.spill_path.exists():
+                    return
+                os.replace(self.spill_path, recovering_path)
+
+        records = self._read_spilled(recovering_path)
+        if records:
+            logger.info("Writing %d spilled submissions from %s", len(records), recovering_path)
+        for start in range(0, len(records), self.batch_size):
+            batch = [(now, record) for record in records[start : start + self.batch_size]]
+            self._write_batch(batch, spill_failures=True)
+        recovering_path.unlink()
+
+    def _read_spilled(self, path: Path) -> list[SubmissionRecord]:
+        """Parse a spill file line by line, moving unreadable lines (e.g. a torn last write) aside."""
+        records: list[SubmissionRecord] = []
+        unreadable: list[bytes] = []
+        for line in path.read_bytes().splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(SubmissionRecord(**json.loads(line.decode("utf-8"))))
+            except (ValueError, TypeError):
+                unreadable.append(line)
+
+        if unreadable:
+            assert self.spill_path is not None
+            quarantine_path = self.spill_path.with_name(self.spill_path.name + ".quarantine")
+            with quarantine_path.open("ab") as quarantine_file:
+                quarantine_file.write(b"".join(line + b"\n" for line in unreadable))
+                quarantine_file.flush()
+                os.fsync(quarantine_file.fileno())
+            logger.error("Moved %d unreadable spilled submissions to %s", len(unreadable), quarantine_path)
+        return records
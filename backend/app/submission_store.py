@@ -1,11 +1,18 @@
 import hashlib
 import hmac
+import inspect
 import json
 import logging
+import random
+import re
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Protocol
 
+from .metrics import SHEETS_REQUEST_DURATION, SUBMISSION_STORE_FAILURES, SUBMISSION_STORE_RETRIES
 from .settings import Settings
 
 
@@ -16,14 +23,42 @@ SUBMISSION_COLUMNS = (
     ["submitted_at_utc", "submission_id"]
     + [f"q{index}" for index in range(1, 19)]
     + [f"rec_{index}" for index in range(1, 6)]
-    + ["visitor_hash", "schema_version"]
+    + ["visitor_hash", "schema_version", "catalog_version"]
 )
+RECENT_SUBMISSION_IDS_LIMIT = 10_000
+RETRY_BASE_DELAY_SECONDS = 0.2
+RETRY_MAX_DELAY_SECONDS = 10.0
+
+UPDATED_RANGE_PATTERN = re.compile(r"![A-Z]+\d+:[A-Z]+(\d+)$")
+DEFAULT_READ_PAGE_SIZE = 1000
 
 
 class SubmissionStoreError(RuntimeError):
     pass
 
 
+@dataclass(frozen=True)
+class SubmissionRecord:
+    submitted_at_utc: str
+    submission_id: str
+    responses: list[str]
+    recommendations: list[str]
+    visitor_hash: str | None
+    schema_version: str
+    catalog_version: str | None = None
+
+    def as_kwargs(self) -> dict[str, object]:
+        return {
+            "submitted_at_utc": self.submitted_at_utc,
+            "submission_id": self.submission_id,
+            "responses": self.responses,
+            "recommendations": self.recommendations,
+            "visitor_hash": self.visitor_hash,
+            "schema_version": self.schema_version,
+            "catalog_version": self.catalog_version,
+        }
+
+
 class SubmissionStore(Protocol):
     def append_submission(
         self,
@@ -34,10 +69,13 @@ class SubmissionStore(Protocol):
         recommendations: list[str],
         visitor_hash: str | None,
         schema_version: str,
+        catalog_version: str | None = None,
     ) -> None: ...
 
 
 class NoopSubmissionStore:
+    nonblocking_append = True
+
     def append_submission(
         self,
         *,
@@ -47,6 +85,7 @@ class NoopSubmissionStore:
         recommendations: list[str],
         visitor_hash: str | None,
         schema_version: str,
+        catalog_version: str | None = None,
     ) -> None:
         return
 
@@ -60,6 +99,9 @@ class GoogleSheetsSubmissionStore:
     request_timeout_seconds: float
     max_retries: int
     _service: object | None = None
+    _credentials: object | None = None
+    _recent_submission_ids: OrderedDict[str, None] = field(default_factory=OrderedDict)
+    _next_row: int | None = None
 
     def append_submission(
         self,
@@ -70,7 +112,11 @@ class GoogleSheetsSubmissionStore:
         recommendations: list[str],
         visitor_hash: str | None,
         schema_version: str,
+        catalog_version: str | None = None,
     ) -> None:
+        if submission_id in self._recent_submission_ids:
+            return
+
         row = build_submission_row(
             submitted_at_utc=submitted_at_utc,
             submission_id=submission_id,
@@ -78,30 +124,142 @@ class GoogleSheetsSubmissionStore:
             recommendations=recommendations,
             visitor_hash=visitor_hash,
             schema_version=schema_version,
+            catalog_version=catalog_version,
         )
 
         for attempt in range(self.max_retries + 1):
             try:
                 self._append_row(row)
+                self._remember_submission_ids([submission_id])
                 return
             except Exception as exc:  # pragma: no cover - broad catch required for API client failures.
                 is_last_attempt = attempt >= self.max_retries
                 if is_last_attempt:
+                    SUBMISSION_STORE_FAILURES.labels("sheets").inc()
                     raise SubmissionStoreError("Failed to append submission to Google Sheets.") from exc
-                time.sleep(0.2 * (2**attempt))
+                SUBMISSION_STORE_RETRIES.labels("sheets").inc()
+                time.sleep(retry_delay_seconds(attempt, exc))
+
+    def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        """Append several submissions with a single ``values.append`` call.
+
+        The batch is retried as a unit. Submission ids already written by this store, repeated within
+        the batch, or found in rows that landed despite a failed attempt are skipped.
+        """
+        rows_by_id: dict[str, list[str]] = {}
+        for record in records:
+            if record.submission_id in self._recent_submission_ids or record.submission_id in rows_by_id:
+                continue
+            rows_by_id[record.submission_id] = build_submission_row(**record.as_kwargs())
+
+        for attempt in range(self.max_retries + 1):
+            if not rows_by_id:
+                return
+            try:
+                self._append_rows(list(rows_by_id.values()))
+                self._remember_submission_ids(list(rows_by_id))
+                return
+            except Exception as exc:  # pragma: no cover - broad catch required for API client failures.
+                is_last_attempt = attempt >= self.max_retries
+                if is_last_attempt:
+                    SUBMISSION_STORE_FAILURES.labels("sheets").inc()
+                    raise SubmissionStoreError("Failed to append submission batch to Google Sheets.") from exc
+                SUBMISSION_STORE_RETRIES.labels("sheets").inc()
+                time.sleep(retry_delay_seconds(attempt, exc))
+                # A timed-out append may still have landed; never write those rows twice.
+                for submission_id in self._find_landed_submission_ids(set(rows_by_id)):
+                    del rows_by_id[submission_id]
+
+    def iter_records(self, *, page_size: int = DEFAULT_READ_PAGE_SIZE) -> Iterator[list[SubmissionRecord]]:
+        """Yield the worksheet's submissions page by page (one ``values.get`` of ``page_size`` rows each)."""
+        last_column = _column_letter(len(SUBMISSION_COLUMNS))
+        start_row = 1
+        while True:
+            end_row = start_row + page_size - 1
+            rows = self._get_values(f"{self.worksheet_name}!A{start_row}:{last_column}{end_row}")
+            records = [
+                parse_submission_row(row)
+                for row in rows
+                # A header row, if the sheet has one, and blank rows are not submissions.
+                if len(row) > 1 and row[1] and row[1] != "submission_id"
+            ]
+            if records:
+                yield records
+            if len(rows) < page_size:
+                return
+            start_row = end_row + 1
+
+    def _get_values(self, range_name: str) -> list[list[str]]:
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = (
+                    self._get_service()
+                    .spreadsheets()
+                    .values()
+                    .get(spreadsheetId=self.spreadsheet_id, range=range_name)
+                    .execute()
+                )
+                return (response or {}).get("values", [])
+            except SubmissionStoreError:
+                raise
+            except Exception as exc:  # pragma: no cover - broad catch required for API client failures.
+                if attempt >= self.max_retries:
+                    raise SubmissionStoreError(f"Failed to read {range_name} from Google Sheets.") from exc
+                time.sleep(retry_delay_seconds(attempt, exc))
+            finally:
+                SHEETS_REQUEST_DURATION.labels("sheets_read").observe(time.perf_counter() - started)
 
     def _append_row(self, row: list[str]) -> None:
+        self._append_rows([row])
+
+    def _append_rows(self, rows: list[list[str]]) -> None:
         service = self._get_service()
-        body = {"values": [row]}
+        body = {"values": rows}
         range_name = f"{self.worksheet_name}!A:Z"
 
-        service.spreadsheets().values().append(
-            spreadsheetId=self.spreadsheet_id,
-            range=range_name,
-            valueInputOption="RAW",
-            insertDataOption="INSERT_ROWS",
-            body=body,
-        ).execute()
+        started = time.perf_counter()
+        try:
+            response = service.spreadsheets().values().append(
+                spreadsheetId=self.spreadsheet_id,
+                range=range_name,
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body=body,
+            ).execute()
+        finally:
+            SHEETS_REQUEST_DURATION.labels("sheets").observe(time.perf_counter() - started)
+
+        updated_range = ((response or {}).get("updates") or {}).get("updatedRange") or ""
+        match = UPDATED_RANGE_PATTERN.search(updated_range)
+        if match:
+            self._next_row = int(match.group(1)) + 1
+
+    def _find_landed_submission_ids(self, submission_ids: set[str]) -> set[str]:
+        # Only rows appended after the last confirmed write need checking. Until this process has seen
+        # a confirmed write (e.g. the first batch after a restart) the whole id column is read once.
+        start_row = self._next_row or 1
+        try:
+            response = (
+                self._get_service()
+                .spreadsheets()
+                .values()
+                .get(spreadsheetId=self.spreadsheet_id, range=f"{self.worksheet_name}!B{start_row}:B")
+                .execute()
+            )
+        except Exception:  # pragma: no cover - best effort; the retry proceeds without the check.
+            logger.warning("Could not read back submission ids before retrying a failed batch.")
+            return set()
+
+        landed = {row[0] for row in (response or {}).get("values", []) if row} & submission_ids
+        self._remember_submission_ids(list(landed))
+        return landed
+
+    def _remember_submission_ids(self, submission_ids: list[str]) -> None:
+        for submission_id in submission_ids:
+            self._recent_submission_ids[submission_id] = None
+        while len(self._recent_submission_ids) > RECENT_SUBMISSION_IDS_LIMIT:
+            self._recent_submission_ids.popitem(last=False)
 
     def _get_service(self) -> object:
         if self._service is not None:
@@ -117,7 +275,7 @@ class GoogleSheetsSubmissionStore:
                 "Google Sheets dependencies are not installed. Install backend requirements."
             ) from exc
 
-        credentials = _build_service_account_credentials(
+        credentials = build_service_account_credentials(
             service_account_json=self.service_account_json,
             service_account_file=self.service_account_file,
             service_account_module=service_account,
@@ -128,10 +286,81 @@ class GoogleSheetsSubmissionStore:
             http=httplib2.Http(timeout=self.request_timeout_seconds),
         )
         self._service = build("sheets", "v4", http=authorized_http, cache_discovery=False)
+        self._credentials = credentials
         return self._service
 
-
-def _build_service_account_credentials(
+    def warm_up(self) -> None:
+        """Import the client libraries, build the Sheets client and mint a token now, not on the first write."""
+        self._get_service()
+        self.refresh_credentials(margin_seconds=0.0)
+
+    def refresh_credentials(self, *, margin_seconds: float) -> bool:
+        """Refresh the token if it is missing or expires within ``margin_seconds``; returns whether it did."""
+        credentials = self._credentials
+        if credentials is None or not credentials_need_refresh(credentials, margin_seconds=margin_seconds):
+            return False
+        refresh_service_account_credentials(credentials)
+        return True
+
+
+def credentials_need_refresh(credentials: object, *, margin_seconds: float) -> bool:
+    if not credentials.valid:
+        return True
+    expiry = getattr(credentials, "expiry", None)
+    if expiry is None:
+        return False
+    # google-auth keeps ``expiry`` as a naive UTC datetime.
+    remaining = expiry - datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    return remaining.total_seconds() < margin_seconds
+
+
+def refresh_service_account_credentials(credentials: object) -> None:
+    try:
+        import google_auth_httplib2
+        import httplib2
+    except ImportError as exc:
+        raise SubmissionStoreError(
+            "Google Sheets dependencies are not installed. Install backend requirements."
+        ) from exc
+
+    try:
+        credentials.refresh(google_auth_httplib2.Request(httplib2.Http()))
+    except Exception as exc:  # pragma: no cover - broad catch required for auth client failures.
+        raise SubmissionStoreError("Failed to refresh Google service account credentials.") from exc
+
+
+def iter_wrapped_stores(store: object) -> Iterator[object]:
+    """``store`` and every store it wraps (write-behind queue, circuit breaker and its fallback)."""
+    pending = [store]
+    while pending:
+        current = pending.pop(0)
+        if current is None:
+            continue
+        yield current
+        pending.extend((getattr(current, "store", None), getattr(current, "fallback", None)))
+
+
+def retry_delay_seconds(attempt: int, exc: BaseException | None = None) -> float:
+    """Full-jitter exponential backoff; honours (up to the cap) a ``Retry-After`` sent with a 429 or 503."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2**attempt))
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RETRY_MAX_DELAY_SECONDS))
+    return delay
+
+
+def _retry_after_seconds(exc: BaseException | None) -> float | None:
+    # googleapiclient's HttpError carries an httplib2 response dict as ``resp``; httpx errors a ``response``.
+    response = getattr(exc, "response", None) or getattr(exc, "resp", None)
+    headers = getattr(response, "headers", response)
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def build_service_account_credentials(
     *,
     service_account_json: str | None,
     service_account_file: str | None,
@@ -160,6 +389,7 @@ def build_submission_row(
     recommendations: list[str],
     visitor_hash: str | None,
     schema_version: str,
+    catalog_version: str | None = None,
 ) -> list[str]:
     response_columns = [str(response) for response in responses]
     recommendation_columns = [str(recommendation) for recommendation in recommendations[:5]]
@@ -173,9 +403,32 @@ def build_submission_row(
         *recommendation_columns,
         visitor_hash or "",
         schema_version,
+        catalog_version or "",
     ]
 
 
+def parse_submission_row(row: Sequence[str]) -> SubmissionRecord:
+    """The inverse of ``build_submission_row``; missing trailing cells (Sheets omits them) are empty."""
+    values = dict(zip(SUBMISSION_COLUMNS, [*row, *[""] * (len(SUBMISSION_COLUMNS) - len(row))]))
+    return SubmissionRecord(
+        submitted_at_utc=values["submitted_at_utc"],
+        submission_id=values["submission_id"],
+        responses=[values[f"q{index}"] for index in range(1, 19)],
+        recommendations=[values[f"rec_{index}"] for index in range(1, 6) if values[f"rec_{index}"]],
+        visitor_hash=values["visitor_hash"] or None,
+        schema_version=values["schema_version"],
+        catalog_version=values["catalog_version"] or None,
+    )
+
+
+def _column_letter(column_number: int) -> str:
+    letters = ""
+    while column_number:
+        column_number, remainder = divmod(column_number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
 def build_visitor_hash(*, ip_address: str, user_agent: str | None, secret: str) -> str:
     message = f"{ip_address}|{user_agent or ''}"
     digest = hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
@@ -183,20 +436,104 @@ def build_visitor_hash(*, ip_address: str, user_agent: str | None, secret: str)
 
 
 def create_submission_store(settings: Settings) -> SubmissionStore:
+    if settings.submission_writer_socket:
+        # Rows go to the host's submission-writer process, which owns the configured store.
+        from .submission_writer import SocketSubmissionStore
+
+        return SocketSubmissionStore(settings.submission_writer_socket)
+    if settings.submission_store_backend == "journal":
+        return _create_journal_store(settings)
+
+    store = create_google_sheets_store(settings)
+    if store is None:
+        return NoopSubmissionStore()
+    if settings.google_sheets_async:
+        # Awaited on the event loop instead of going through the write-behind queue.
+        from .async_submission_store import create_async_google_sheets_store
+
+        return _with_circuit_breaker(create_async_google_sheets_store(settings), settings, with_fallback=True)
+    store = _with_circuit_breaker(store, settings, with_fallback=True)
+    if not settings.submission_queue_enabled:
+        return store
+
+    # Imported lazily: the queue module depends on this one for the record and error types.
+    from .submission_queue import QueuedSubmissionStore
+
+    return QueuedSubmissionStore(
+        store,
+        capacity=settings.submission_queue_capacity,
+        overflow_policy=settings.submission_queue_overflow_policy,
+        spill_path=settings.submission_queue_spill_path,
+        drain_timeout_seconds=settings.submission_queue_drain_timeout_seconds,
+        batch_size=settings.google_sheets_batch_size,
+        flush_interval_seconds=settings.google_sheets_batch_flush_interval_seconds,
+        stats_log_interval_seconds=settings.submission_queue_stats_log_interval_seconds,
+    )
+
+
+def _with_circuit_breaker(store: object, settings: Settings, *, with_fallback: bool) -> object:
+    """Wrap a Sheets store in a circuit breaker (``GOOGLE_SHEETS_BREAKER_FAILURE_THRESHOLD=0`` disables it)."""
+    if settings.google_sheets_breaker_failure_threshold <= 0:
+        return store
+
+    from .circuit_breaker import (
+        AsyncCircuitBreakerSubmissionStore,
+        CircuitBreaker,
+        CircuitBreakerSubmissionStore,
+    )
+
+    breaker = CircuitBreaker(
+        failure_threshold=settings.google_sheets_breaker_failure_threshold,
+        reset_timeout_seconds=settings.google_sheets_breaker_reset_seconds,
+    )
+    fallback = _create_fallback_store(settings, breaker) if with_fallback else None
+    if inspect.iscoroutinefunction(store.append_submission):
+        return AsyncCircuitBreakerSubmissionStore(store, breaker, fallback=fallback)
+    return CircuitBreakerSubmissionStore(store, breaker, fallback=fallback)
+
+
+def _create_fallback_store(settings: Settings, breaker: object) -> SubmissionStore | None:
+    if settings.google_sheets_fallback != "journal":
+        return None
+    if not settings.submission_journal_path:
+        logger.warning("GOOGLE_SHEETS_FALLBACK is journal, but SUBMISSION_JOURNAL_PATH is missing.")
+        return None
+
+    from .circuit_breaker import CircuitBreakerSubmissionStore
+    from .submission_journal import JournalSubmissionStore
+
+    journal = JournalSubmissionStore(settings.submission_journal_path)
+    if settings.submission_journal_replay_interval_seconds > 0:
+        # Diverted rows reach Sheets once the shared breaker lets calls through again. The replayer
+        # gets its own Sheets client: the discovery client must not be shared between threads.
+        journal.start_replay(
+            CircuitBreakerSubmissionStore(create_google_sheets_store(settings), breaker),
+            interval_seconds=settings.submission_journal_replay_interval_seconds,
+        )
+    return journal
+
+
+def close_submission_store(store: object) -> None:
+    close = getattr(store, "close", None)
+    if callable(close):
+        close()
+
+
+def create_google_sheets_store(settings: Settings) -> GoogleSheetsSubmissionStore | None:
     if not settings.google_sheets_enabled:
         logger.info("Google Sheets submission storage is disabled.")
-        return NoopSubmissionStore()
+        return None
 
     if not settings.google_sheets_spreadsheet_id:
         logger.warning("GOOGLE_SHEETS_ENABLED is true, but GOOGLE_SHEETS_SPREADSHEET_ID is missing.")
-        return NoopSubmissionStore()
+        return None
 
     if not settings.google_service_account_json and not settings.google_service_account_file:
         logger.warning(
             "GOOGLE_SHEETS_ENABLED is true, but no service account credentials were provided "
             "(GOOGLE_SERVICE_ACCOUNT_JSON or GOOGLE_SERVICE_ACCOUNT_FILE)."
         )
-        return NoopSubmissionStore()
+        return None
 
     return GoogleSheetsSubmissionStore(
         spreadsheet_id=settings.google_sheets_spreadsheet_id,
@@ -206,3 +543,20 @@ def create_submission_store(settings: Settings) -> SubmissionStore:
         request_timeout_seconds=settings.google_sheets_request_timeout_seconds,
         max_retries=settings.google_sheets_max_retries,
     )
+
+
+def _create_journal_store(settings: Settings) -> SubmissionStore:
+    if not settings.submission_journal_path:
+        logger.warning("SUBMISSION_STORE_BACKEND is journal, but SUBMISSION_JOURNAL_PATH is missing.")
+        return NoopSubmissionStore()
+
+    from .submission_journal import JournalSubmissionStore
+
+    journal = JournalSubmissionStore(settings.submission_journal_path)
+    sheets_store = create_google_sheets_store(settings)
+    if sheets_store is not None and settings.submission_journal_replay_interval_seconds > 0:
+        journal.start_replay(
+            _with_circuit_breaker(sheets_store, settings, with_fallback=False),
+            interval_seconds=settings.submission_journal_replay_interval_seconds,
+        )
+    return journal
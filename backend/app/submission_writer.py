@@ -0,0 +1,210 @@
+"""One submission-writer process shared by all workers on a host.
+
+With ``SUBMISSION_WRITER_SOCKET`` set, each worker's submission store is a ``SocketSubmissionStore``.
+It sends every row as one datagram to a Unix socket and does not wait for the write. A single
+``SubmissionWriter`` process (``python -m app.submission_writer``, started by ``gunicorn.conf.py``)
+receives the rows. It writes them through the store the settings describe, batched by the
+write-behind queue. So one Sheets client, one access token and one batching queue serve the whole
+host, instead of one of each per worker.
+
+Unix datagrams are not lost or reordered. When the writer falls behind and the socket buffer fills,
+or when the writer is not running, the append fails with ``SubmissionStoreError``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import threading
+from dataclasses import replace
+from pathlib import Path
+
+from .metrics import REGISTRY, MultiprocessMetrics
+from .settings import Settings, load_settings_from_env
+from .submission_store import (
+    SubmissionRecord,
+    SubmissionStore,
+    SubmissionStoreError,
+    close_submission_store,
+    create_submission_store,
+)
+
+
+logger = logging.getLogger(__name__)
+
+MAX_DATAGRAM_BYTES = 65536
+DEFAULT_MAX_BATCH_SIZE = 500
+_RECEIVE_TIMEOUT_SECONDS = 0.5
+
+
+class SocketSubmissionStore:
+    """Worker side: hands each submission to the writer process over a Unix datagram socket."""
+
+    nonblocking_append = True
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self._socket: socket.socket | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def append_submission(self, **kwargs: object) -> None:
+        self.append_submissions([SubmissionRecord(**kwargs)])
+
+    def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        sock = self._get_socket()
+        for record in records:
+            payload = json.dumps(record.as_kwargs(), separators=(",", ":")).encode("utf-8")
+            if len(payload) > MAX_DATAGRAM_BYTES:
+                raise SubmissionStoreError("Submission is too large to send to the submission writer.")
+            try:
+                sock.sendto(payload, self.socket_path)
+            except BlockingIOError as exc:
+                raise SubmissionStoreError("Submission writer is not keeping up; its socket buffer is full.") from exc
+            except OSError as exc:
+                raise SubmissionStoreError(f"Submission writer at {self.socket_path} is not reachable.") from exc
+
+    def close(self) -> None:
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+    def _get_socket(self) -> socket.socket:
+        # Created on first use, and again in a forked child, so workers never share one socket.
+        with self._lock:
+            if self._socket is None or self._pid != os.getpid():
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._socket.setblocking(False)
+                self._pid = os.getpid()
+            return self._socket
+
+
+class SubmissionWriter:
+    """Writer side: receives rows from every worker and appends them in batches to ``store``."""
+
+    def __init__(
+        self,
+        store: SubmissionStore,
+        socket_path: str,
+        *,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ) -> None:
+        self.store = store
+        self.socket_path = Path(socket_path)
+        self.max_batch_size = max(1, max_batch_size)
+        self._stop = threading.Event()
+        self._socket: socket.socket | None = None
+        self.received = 0
+        self.failed = 0
+
+    def bind(self) -> None:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # A socket file left behind by a writer that did not shut down cleanly.
+        self.socket_path.unlink(missing_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(str(self.socket_path))
+        self._socket.setblocking(False)
+
+    def serve_forever(self) -> None:
+        if self._socket is None:
+            self.bind()
+        logger.info("Submission writer listening on %s", self.socket_path)
+        try:
+            while not self._stop.is_set():
+                records = self._receive_batch()
+                if records:
+                    self._write(records)
+        finally:
+            self._socket.close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _receive_batch(self) -> list[SubmissionRecord]:
+        readable, _, _ = select.select([self._socket], [], [], _RECEIVE_TIMEOUT_SECONDS)
+        if not readable:
+            return []
+        # Everything already waiting goes into the same batch.
+        datagrams = []
+        while len(datagrams) < self.max_batch_size:
+            try:
+                datagrams.append(self._socket.recv(MAX_DATAGRAM_BYTES))
+            except BlockingIOError:
+                break
+
+        records = []
+        for datagram in datagrams:
+            try:
+                records.append(SubmissionRecord(**json.loads(datagram)))
+            except (TypeError, ValueError):
+                logger.warning("Ignoring a malformed datagram on the submission writer socket.")
+        self.received += len(records)
+        return records
+
+    def _write(self, records: list[SubmissionRecord]) -> None:
+        try:
+            append_submissions = getattr(self.store, "append_submissions", None)
+            if callable(append_submissions):
+                append_submissions(records)
+            else:
+                for record in records:
+                    self.store.append_submission(**record.as_kwargs())
+        except SubmissionStoreError:
+            self.failed += len(records)
+            logger.exception("Submission writer failed to store %d submissions.", len(records))
+
+
+def create_writer_store(settings: Settings) -> SubmissionStore:
+    """The store behind the writer: the configured one, always behind the write-behind queue."""
+    return create_submission_store(
+        replace(settings, submission_writer_socket=None, submission_queue_enabled=True, google_sheets_async=False)
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Receive submissions from local workers and store them.")
+    parser.add_argument("socket_path", nargs="?", help="Defaults to SUBMISSION_WRITER_SOCKET.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    settings = load_settings_from_env()
+    socket_path = args.socket_path or settings.submission_writer_socket
+    if not socket_path:
+        parser.error("No socket path given and SUBMISSION_WRITER_SOCKET is not set.")
+
+    store = create_writer_store(settings)
+    writer = SubmissionWriter(store, socket_path)
+    writer.bind()
+    signal.signal(signal.SIGTERM, lambda *_: writer.stop())
+    signal.signal(signal.SIGINT, lambda *_: writer.stop())
+
+    # The Sheets timings of this process show up in /metrics alongside the workers'.
+    multiprocess_metrics = (
+        MultiprocessMetrics(
+            REGISTRY,
+            settings.metrics_multiproc_dir,
+            interval_seconds=settings.metrics_write_interval_seconds,
+        )
+        if settings.metrics_multiproc_dir
+        else None
+    )
+    if multiprocess_metrics is not None:
+        multiprocess_metrics.start()
+    try:
+        writer.serve_forever()
+    finally:
+        # Drains the write-behind queue before exiting.
+        close_submission_store(store)
+        if multiprocess_metrics is not None:
+            multiprocess_metrics.stop()
+    logger.info("Submission writer stopped after %d submissions (%d failed).", writer.received, writer.failed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Startup warmup, run in the background from the app lifespan.
+
+Two tasks run concurrently so neither waits for the other. One loads and validates the catalog. The
+other prepares every Sheets store: it imports the client libraries, builds the client and mints an
+access token. Until both finish, ``/api/v1/ready`` answers 503 while ``/health`` stays up, so a
+platform health check can route traffic only to warm workers. Afterwards a background thread
+refreshes access tokens before they expire, so no write waits for a token.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from .catalog import current_catalog
+from .submission_store import SubmissionStoreError, iter_wrapped_stores
+
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+DEFAULT_TOKEN_REFRESH_MARGIN_SECONDS = 300.0
+
+
+class Warmup:
+    def __init__(
+        self,
+        store: object,
+        *,
+        token_refresh_interval_seconds: float,
+        token_refresh_margin_seconds: float = DEFAULT_TOKEN_REFRESH_MARGIN_SECONDS,
+    ) -> None:
+        self.store = store
+        self.token_refresh_interval_seconds = token_refresh_interval_seconds
+        self.token_refresh_margin_seconds = token_refresh_margin_seconds
+        self.state = PENDING
+        self.durations: dict[str, float] = {}
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+
+    @property
+    def warming(self) -> bool:
+        return self.state in (PENDING, WARMING)
+
+    async def run(self) -> None:
+        self.state = WARMING
+        started = time.perf_counter()
+        stores = [store for store in iter_wrapped_stores(self.store) if callable(getattr(store, "warm_up", None))]
+        results = await asyncio.gather(
+            self._timed("catalog", run_in_threadpool(current_catalog)),
+            *(self._timed(type(store).__name__, _warm_up_store(store)) for store in stores),
+            return_exceptions=True,
+        )
+        self.durations["total"] = time.perf_counter() - started
+
+        catalog_result, *store_results = results
+        for store, result in zip(stores, store_results):
+            if isinstance(result, Exception):
+                # Writes are off the response path; the store retries the setup on first use.
+                logger.warning("Warming up %s failed: %s", type(store).__name__, result)
+        if isinstance(catalog_result, Exception):
+            logger.error("Loading the catalog during warmup failed: %s", catalog_result)
+            self.state = FAILED
+        else:
+            self.state = READY
+            logger.info("Warm in %.3fs (%s)", self.durations["total"], self._format_durations())
+
+        refreshable = [store for store in iter_wrapped_stores(self.store) if hasattr(store, "refresh_credentials")]
+        if refreshable and self.token_refresh_interval_seconds > 0:
+            self._refresher = threading.Thread(
+                target=self._refresh_tokens, args=(refreshable,), name="token-refresher", daemon=True
+            )
+            self._refresher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=5)
+
+    async def _timed(self, name: str, awaitable: object) -> object:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.durations[name] = time.perf_counter() - started
+
+    def _format_durations(self) -> str:
+        return ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.durations.items() if name != "total")
+
+    def _refresh_tokens(self, stores: list[object]) -> None:
+        while not self._stop.wait(self.token_refresh_interval_seconds):
+            for store in stores:
+                try:
+                    if store.refresh_credentials(margin_seconds=self.token_refresh_margin_seconds):
+                        logger.info("Refreshed Google access token ahead of expiry.")
+                except SubmissionStoreError:
+                    logger.exception("Background token refresh failed; the next write will retry it.")
+
+
+async def _warm_up_store(store: object) -> None:
+    if inspect.iscoroutinefunction(store.warm_up):
+        await store.warm_up()
+    else:
+        await run_in_threadpool(store.warm_up)
@@ -0,0 +1,74 @@
+"""Cold-start cost of a fresh worker process, with and without the startup warmup.
+
+Each run starts a new interpreter and reports how long ``import app.main`` takes, how long
+``Warmup.run()`` takes (``warm`` mode only), and the latency of the first questions and
+recommendations requests. The warmup moves catalog loading and client setup out of those first
+requests. Set the Google Sheets variables to include the client import and the token fetch.
+
+    cd backend
+    python -m benchmarks.cold_start --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+MODES = ("cold", "warm")
+
+_CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from app.main import app
+from app.warmup import Warmup
+timings = {"import_app_ms": (time.perf_counter() - started) * 1000}
+from fastapi.testclient import TestClient
+client = TestClient(app)
+if sys.argv[1] == "warm":
+    warmup = Warmup(app.state.submission_store, token_refresh_interval_seconds=0)
+    asyncio.run(warmup.run())
+    timings["warmup_ms"] = warmup.durations["total"] * 1000
+started = time.perf_counter()
+client.get("/api/v1/questions").raise_for_status()
+timings["first_questions_ms"] = (time.perf_counter() - started) * 1000
+started = time.perf_counter()
+client.post("/api/v1/recommendations", json={"codes": "2" * 18}).raise_for_status()
+timings["first_recommendations_ms"] = (time.perf_counter() - started) * 1000
+print(json.dumps(timings))
+"""
+
+
+def measure(mode: str) -> dict[str, float]:
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD, mode],
+        cwd=BACKEND_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure worker cold start with and without warmup.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    report = {}
+    for mode in MODES:
+        runs = [measure(mode) for _ in range(max(1, args.runs))]
+        report[mode] = {
+            name: round(statistics.median(run[name] for run in runs), 2)
+            for name in runs[0]
+        }
+    # Medians over --runs fresh processes.
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
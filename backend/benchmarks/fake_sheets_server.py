@@ -0,0 +1,203 @@
+"""Local HTTP stand-in for the Sheets v4 ``values`` REST API, with injected latency and failures.
+
+Point ``AsyncGoogleSheetsSubmissionStore`` (or ``GOOGLE_SHEETS_API_BASE_URL``) at its base URL.
+``FakeSheetsProcess`` runs it in a child process so its handler threads do not compete with the
+app under test for the GIL:
+
+    python -m benchmarks.fake_sheets_server --latency-ms 150 --failure-rate 0.01 --port 9100
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import httpx
+
+STATS_PATH = "/_stats"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connection bursts and makes clients wait for SYN retries.
+    request_queue_size = 1024
+
+
+class FakeSheetsServer:
+    def __init__(
+        self,
+        *,
+        latency_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        seed: int = 0,
+        port: int = 0,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.appended_rows = 0
+        self.append_calls = 0
+        self.failed_calls = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._submission_ids: list[str] = []
+        self._server = _Server(("127.0.0.1", port), self._handler_class())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeSheetsServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-sheets-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "append_calls": self.append_calls,
+                "failed_calls": self.failed_calls,
+                "appended_rows": self.appended_rows,
+            }
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def _append(self, rows: list[list[str]]) -> str:
+        with self._lock:
+            self.append_calls += 1
+            start_row = len(self._submission_ids) + 1
+            self._submission_ids.extend(row[1] if len(row) > 1 else "" for row in rows)
+            self.appended_rows += len(rows)
+            return f"Submissions!A{start_row}:AB{start_row + len(rows) - 1}"
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("content-length") or 0))
+                if not self._delay_or_fail():
+                    return
+                rows = json.loads(body or b"{}").get("values", [])
+                self._send_json({"updates": {"updatedRange": server._append(rows)}})
+
+            def do_GET(self) -> None:
+                if self.path == STATS_PATH:
+                    self._send_json(server.stats())
+                    return
+                if not self._delay_or_fail():
+                    return
+                # Only the submission id column (B) is ever read back.
+                start = unquote(urlsplit(self.path).path).rsplit("!B", 1)[-1].split(":", 1)[0]
+                start_row = int(start) if start.isdigit() else 1
+                with server._lock:
+                    values = [[submission_id] for submission_id in server._submission_ids[start_row - 1 :]]
+                self._send_json({"values": values})
+
+            def _delay_or_fail(self) -> bool:
+                if server.latency_seconds > 0:
+                    time.sleep(server.latency_seconds)
+                if server._should_fail():
+                    with server._lock:
+                        server.failed_calls += 1
+                    self._send_json({"error": {"code": server.failure_status}}, status=server.failure_status)
+                    return False
+                return True
+
+            def _send_json(self, payload: object, *, status: int = 200) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                return
+
+        return Handler
+
+
+class FakeSheetsProcess:
+    """Runs ``FakeSheetsServer`` in a child process; use as a context manager."""
+
+    def __init__(self, *, latency_seconds: float, failure_rate: float, seed: int = 0) -> None:
+        self._command = [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_sheets_server",
+            "--latency-ms",
+            str(latency_seconds * 1000),
+            "--failure-rate",
+            str(failure_rate),
+            "--seed",
+            str(seed),
+        ]
+        self._process: subprocess.Popen[str] | None = None
+        self.base_url = ""
+
+    def __enter__(self) -> "FakeSheetsProcess":
+        self._process = subprocess.Popen(
+            self._command, cwd=Path(__file__).resolve().parents[1], stdout=subprocess.PIPE, text=True
+        )
+        # The child prints its base URL once it is listening.
+        self.base_url = (self._process.stdout.readline() if self._process.stdout else "").strip()
+        if not self.base_url:
+            self.__exit__(None, None, None)
+            raise RuntimeError("fake Sheets server did not start")
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+
+    def stats(self) -> dict[str, int]:
+        return httpx.get(self.base_url + STATS_PATH, timeout=10).json()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a fake Sheets values API on localhost.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = FakeSheetsServer(
+        latency_seconds=args.latency_ms / 1000,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        seed=args.seed,
+        port=args.port,
+    )
+    print(server.base_url, flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
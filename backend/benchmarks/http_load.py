@@ -0,0 +1,335 @@
+"""Latency and throughput benchmark for the API.
+
+Drives ``/api/v1/questions`` and ``/api/v1/recommendations`` either in-process (ASGI transport, no
+sockets) or against a local uvicorn server, at one or more concurrency levels. Submission storage is
+either disabled or the async Sheets store pointed at a local fake Sheets server with injected latency
+and failures. Results are printed (and optionally written) as JSON; pass ``--compare`` with an
+earlier result file to print the change per scenario.
+
+    cd backend
+    python -m benchmarks.http_load --mode asgi --concurrency 1,16,64 --requests 2000
+    python -m benchmarks.http_load --store sheets --sheets-latency-ms 150 --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.async_submission_store import AsyncGoogleSheetsSubmissionStore  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import ResponseOption  # noqa: E402
+from app.submission_store import NoopSubmissionStore  # noqa: E402
+from benchmarks.fake_sheets_server import FakeSheetsProcess  # noqa: E402
+
+
+ENDPOINTS = ("questions", "recommendations")
+MODES = ("asgi", "uvicorn")
+STORES = ("noop", "sheets")
+DISTINCT_PAYLOADS = 1000
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    mode: str
+    endpoint: str
+    store: str
+    concurrency: int
+    requests: int
+    errors: int
+    duration_seconds: float
+    throughput_rps: float
+    latency_ms: dict[str, float]
+
+
+class _StaticCredentials:
+    valid = True
+    token = "benchmark"
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies_seconds: Sequence[float]) -> dict[str, float]:
+    ordered = sorted(value * 1000 for value in latencies_seconds)
+    return {
+        "p50": round(percentile(ordered, 0.50), 3),
+        "p95": round(percentile(ordered, 0.95), 3),
+        "p99": round(percentile(ordered, 0.99), 3),
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+        "mean": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+    }
+
+
+def build_payloads(count: int, *, seed: int) -> list[dict[str, list[str]]]:
+    rng = random.Random(seed)
+    options = [option.value for option in ResponseOption]
+    return [{"responses": [rng.choice(options) for _ in range(18)]} for _ in range(count)]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    *,
+    mode: str,
+    endpoint: str,
+    store: str,
+    concurrency: int,
+    total_requests: int,
+    payloads: Sequence[dict[str, list[str]]],
+) -> ScenarioResult:
+    latencies: list[float] = []
+    errors = 0
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_request
+        while next_request < total_requests:
+            request_index = next_request
+            next_request += 1
+            started = time.perf_counter()
+            try:
+                if endpoint == "questions":
+                    response = await client.get("/api/v1/questions")
+                else:
+                    response = await client.post(
+                        "/api/v1/recommendations", json=payloads[request_index % len(payloads)]
+                    )
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    return ScenarioResult(
+        mode=mode,
+        endpoint=endpoint,
+        store=store,
+        concurrency=concurrency,
+        requests=total_requests,
+        errors=errors,
+        duration_seconds=round(duration, 4),
+        throughput_rps=round(total_requests / duration, 1) if duration else 0.0,
+        latency_ms=summarize_latencies(latencies),
+    )
+
+
+async def run_benchmarks(args: argparse.Namespace, sheets_server: FakeSheetsProcess | None) -> list[ScenarioResult]:
+    payloads = build_payloads(DISTINCT_PAYLOADS, seed=args.seed)
+    results: list[ScenarioResult] = []
+
+    original_store = app.state.submission_store
+    try:
+        for mode in args.modes:
+            results.extend(await _run_mode(mode, args, sheets_server, payloads))
+    finally:
+        app.state.submission_store = original_store
+    return results
+
+
+async def _run_mode(
+    mode: str,
+    args: argparse.Namespace,
+    sheets_server: FakeSheetsProcess | None,
+    payloads: Sequence[dict[str, list[str]]],
+) -> list[ScenarioResult]:
+    store = _create_store(args, sheets_server)
+    app.state.submission_store = store
+    server = None
+    if mode == "asgi":
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    else:
+        server, base_url = _start_uvicorn()
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(max_connections=max(args.concurrency)),
+            timeout=30.0,
+        )
+
+    results = []
+    try:
+        async with client:
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    scenario = {
+                        "mode": mode,
+                        "endpoint": endpoint,
+                        "store": args.store,
+                        "concurrency": concurrency,
+                        "payloads": payloads,
+                    }
+                    await run_scenario(client, total_requests=min(args.warmup, args.requests), **scenario)
+                    results.append(await run_scenario(client, total_requests=args.requests, **scenario))
+    finally:
+        if server is not None:
+            server.should_exit = True
+        elif isinstance(store, AsyncGoogleSheetsSubmissionStore):
+            # Under uvicorn the store's connections belong to the server's event loop and close with it.
+            await store.aclose()
+    return results
+
+
+def compare_results(baseline: dict[str, object], current: dict[str, object]) -> list[str]:
+    def key(result: dict[str, object]) -> tuple[object, ...]:
+        return (result["mode"], result["endpoint"], result["store"], result["concurrency"])
+
+    previous = {key(result): result for result in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        lines.append(
+            "{} {} store={} c={}: rps {:+.1%}, p50 {:+.1%}, p99 {:+.1%}".format(
+                *key(result),
+                _change(before["throughput_rps"], result["throughput_rps"]),
+                _change(before["latency_ms"]["p50"], result["latency_ms"]["p50"]),
+                _change(before["latency_ms"]["p99"], result["latency_ms"]["p99"]),
+            )
+        )
+    return lines
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before if before else 0.0
+
+
+def _create_store(args: argparse.Namespace, sheets_server: FakeSheetsProcess | None) -> object:
+    if sheets_server is None:
+        return NoopSubmissionStore()
+    return AsyncGoogleSheetsSubmissionStore(
+        spreadsheet_id="benchmark",
+        worksheet_name="Submissions",
+        service_account_json=None,
+        service_account_file=None,
+        request_timeout_seconds=10.0,
+        max_retries=args.sheets_max_retries,
+        base_url=sheets_server.base_url,
+        _credentials=_StaticCredentials(),
+    )
+
+
+def _start_uvicorn() -> tuple[object, str]:
+    import uvicorn
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    # Lifespan is off: the benchmark owns the submission store and there is nothing to drain.
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, name="benchmark-uvicorn", daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start within 10 seconds")
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def _git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the API in-process or against local uvicorn.")
+    parser.add_argument("--mode", dest="modes", type=_csv, default=["asgi"], help="asgi, uvicorn or both (comma-separated)")
+    parser.add_argument("--endpoints", type=_csv, default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", type=lambda value: [int(item) for item in _csv(value)], default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests before each scenario")
+    parser.add_argument("--store", choices=STORES, default="noop")
+    parser.add_argument("--sheets-latency-ms", type=float, default=150.0)
+    parser.add_argument("--sheets-failure-rate", type=float, default=0.0)
+    parser.add_argument("--sheets-max-retries", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="also write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    for name, values, choices in (("mode", args.modes, MODES), ("endpoints", args.endpoints, ENDPOINTS)):
+        unknown = sorted(set(values) - set(choices))
+        if unknown:
+            parser.error(f"unknown {name}: {', '.join(unknown)}")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    sheets_server = None
+    fake_sheets_stats = None
+    if args.store == "sheets":
+        with FakeSheetsProcess(
+            latency_seconds=args.sheets_latency_ms / 1000,
+            failure_rate=args.sheets_failure_rate,
+            seed=args.seed,
+        ) as sheets_server:
+            results = asyncio.run(run_benchmarks(args, sheets_server))
+            fake_sheets_stats = sheets_server.stats()
+    else:
+        results = asyncio.run(run_benchmarks(args, None))
+
+    report = {
+        "commit": _git_commit(),
+        "created_at_utc": datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "store": args.store,
+            "sheets_latency_ms": args.sheets_latency_ms if sheets_server else None,
+            "sheets_failure_rate": args.sheets_failure_rate if sheets_server else None,
+        },
+        "results": [asdict(result) for result in results],
+        "fake_sheets": fake_sheets_stats,
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        for line in compare_results(baseline, report):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+"""Boot cost of one worker: import ``app.main`` and build the app, in a fresh interpreter per run.
+
+Uses ``python -X importtime`` and reports the median import time of ``app.main``, the time
+``create_app()`` takes, the peak RSS, and the slowest modules ``app.main`` imports. It also lists
+the optional client modules (httpx, the Google client stack) that were loaded. With Google Sheets
+disabled there should be none. Exits with status 1 when the median import time exceeds
+``--budget-ms`` (``DEFAULT_BUDGET_MS`` unless given).
+
+    cd backend
+    python -m benchmarks.import_time --runs 5
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+# The median import of ``app.main`` measured about 390 ms under ``-X importtime`` (which adds its own
+# overhead), nearly all of it FastAPI and Pydantic. The margin of about 25% absorbs machine noise
+# but not a new eager import of a heavy stack. Re-measure and lower this when imports get cheaper.
+DEFAULT_BUDGET_MS = 500.0
+
+# Imported only once a Sheets store is created (or first used).
+LAZY_MODULES = ("httpx", "googleapiclient", "google.oauth2", "google_auth_httplib2", "httplib2")
+
+_CHILD = """
+import json, resource, sys, time
+from app.main import create_app
+started = time.perf_counter()
+create_app()
+print(json.dumps({
+    "create_app_ms": (time.perf_counter() - started) * 1000,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "lazy_modules_loaded": sorted(name for name in sys.argv[1:] if name in sys.modules),
+}))
+"""
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure() -> dict[str, object]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, *LAZY_MODULES],
+        cwd=BACKEND_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_microseconds = 0
+    children: dict[str, int] = {}
+    pending: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        # Indentation is the nesting depth (one space for the script's own imports, two more per
+        # level), and a module is listed after everything it imports.
+        indent, name, cumulative = len(match.group(3)), match.group(4), int(match.group(2))
+        if indent == 3:
+            pending[name] = cumulative
+        elif indent == 1:
+            if name == "app.main":
+                import_microseconds, children = cumulative, pending
+            pending = {}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["import_ms"] = import_microseconds / 1000
+    result["slowest_imports_ms"] = {
+        name: round(microseconds / 1000, 2)
+        for name, microseconds in sorted(children.items(), key=lambda item: item[1], reverse=True)[:10]
+    }
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure worker import time and memory.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    runs = [measure() for _ in range(max(1, args.runs))]
+    report = {
+        "import_ms": round(statistics.median(run["import_ms"] for run in runs), 2),
+        "create_app_ms": round(statistics.median(run["create_app_ms"] for run in runs), 2),
+        "max_rss_kb": statistics.median(run["max_rss_kb"] for run in runs),
+        "lazy_modules_loaded": runs[-1]["lazy_modules_loaded"],
+        "slowest_imports_ms": runs[-1]["slowest_imports_ms"],
+    }
+    print(json.dumps(report, indent=2))
+    if report["import_ms"] > args.budget_ms:
+        print(f"import time {report['import_ms']}ms exceeds the {args.budget_ms}ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
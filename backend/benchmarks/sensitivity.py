@@ -0,0 +1,79 @@
+"""CPU cost of a what-if sensitivity analysis (one survey, 18 questions x 3 other answers).
+
+Compares ``analyze_sensitivity``, which shifts the base scores of the affected activities and
+re-inserts only those into the base ranking, with 54 full recomputes through
+``compute_ranked_activities`` and ``select_top_recommendations``. Both must agree on every
+alternative before anything is timed.
+
+    cd backend
+    python -m benchmarks.sensitivity --surveys 200
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.catalog import current_catalog  # noqa: E402
+from app.scoring import (  # noqa: E402
+    RESPONSE_OPTION_ORDER,
+    compute_ranked_activities,
+    select_top_recommendations,
+)
+from app.sensitivity import analyze_sensitivity  # noqa: E402
+
+
+def naive_sensitivity(codes: list[int]) -> list[list[str]]:
+    """The recommended activity codes for every single-answer change, each scored from scratch."""
+    results = []
+    for question_index, code in enumerate(codes):
+        for alternative in range(len(RESPONSE_OPTION_ORDER)):
+            if alternative == code:
+                continue
+            responses = [RESPONSE_OPTION_ORDER[value] for value in codes]
+            responses[question_index] = RESPONSE_OPTION_ORDER[alternative]
+            selected, _ = select_top_recommendations(compute_ranked_activities(responses))
+            results.append([item.code for item in selected])
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare delta-scored what-if analysis with full recomputes.")
+    parser.add_argument("--surveys", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    catalog = current_catalog()
+    rng = random.Random(args.seed)
+    surveys = [[rng.randrange(len(RESPONSE_OPTION_ORDER)) for _ in catalog.questions] for _ in range(max(1, args.surveys))]
+
+    for codes in surveys:
+        delta = [
+            [catalog.activities[index].code for index in change.selected]
+            for change in analyze_sensitivity(codes, catalog).changes
+        ]
+        if delta != naive_sensitivity(codes):
+            raise SystemExit(f"analyses disagree for {codes}")
+
+    report = {"surveys": len(surveys), "alternatives_per_survey": len(delta)}
+    for name, analyze in (
+        ("full_recompute", naive_sensitivity),
+        ("delta", lambda codes: analyze_sensitivity(codes, catalog)),
+    ):
+        started = time.perf_counter()
+        for codes in surveys:
+            analyze(codes)
+        report[name] = {"us_per_survey": round((time.perf_counter() - started) / len(surveys) * 1e6, 1)}
+    report["speedup"] = round(report["full_recompute"]["us_per_survey"] / report["delta"]["us_per_survey"], 1)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""Per-request CPU cost of rendering a recommendations response.
+
+Compares the fragment-joining renderer with the path the endpoint used before: build a
+``RecommendationResponse``, then let FastAPI dump, re-validate and JSON-encode it for
+``response_model``. Both start from the same cached selection, so scoring is excluded.
+
+    cd backend
+    python -m benchmarks.serialization --iterations 20000
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.catalog import CatalogSnapshot, current_catalog  # noqa: E402
+from app.models import RecommendationResponse  # noqa: E402
+from app.recommendation_response import (  # noqa: E402
+    COMPLETION_PERCENT,
+    SCORING_NOTE,
+    render_recommendation_response,
+)
+from app.scoring import select_recommendations  # noqa: E402
+
+
+def render_via_response_model(catalog: CatalogSnapshot, selected: tuple[int, ...], note: str | None) -> bytes:
+    response = RecommendationResponse(
+        recommendations=[dict(catalog.payload_items[index]) for index in selected],
+        total_questions=len(catalog.questions),
+        completion_percent=COMPLETION_PERCENT,
+        scoring_note=SCORING_NOTE,
+        prerequisite_note=note,
+    )
+    # What FastAPI's serialize_response does with a returned model and a response_model.
+    validated = RecommendationResponse.model_validate(response.model_dump(by_alias=True))
+    content = validated.model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare recommendation response rendering paths.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    catalog = current_catalog()
+    selected, note = select_recommendations([2] * 18, catalog=catalog)
+    if json.loads(render_via_response_model(catalog, selected, note)) != json.loads(
+        render_recommendation_response(catalog, selected, note)
+    ):
+        raise SystemExit("renderers disagree")
+
+    report = {}
+    for name, render in (
+        ("response_model", render_via_response_model),
+        ("fragments", render_recommendation_response),
+    ):
+        seconds = min(timeit.repeat(lambda: render(catalog, selected, note), number=args.iterations, repeat=3))
+        report[name] = {"us_per_request": round(seconds / args.iterations * 1e6, 2)}
+    report["speedup"] = round(report["response_model"]["us_per_request"] / report["fragments"]["us_per_request"], 1)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
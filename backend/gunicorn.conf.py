@@ -0,0 +1,87 @@
+"""Pre-fork deployment: several uvicorn workers under one gunicorn master.
+
+    cd backend
+    gunicorn app.main:app
+
+gunicorn reads this file from the working directory. Before forking, the master imports the app
+modules and loads and indexes the catalog. Every worker then shares those pages copy-on-write.
+``gc.freeze()`` keeps the workers' garbage collector from writing to them and un-sharing them. Each
+worker builds its own app, submission store and clients after the fork (``app`` is created on first
+access).
+
+With ``SUBMISSION_WRITER_SOCKET`` set, the master also starts one submission-writer process
+(``app.submission_writer``). The workers send it their rows, and it batches them to the configured store.
+"""
+
+import gc
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parent
+WRITER_START_TIMEOUT_SECONDS = 10.0
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1)
+worker_class = "uvicorn_worker.UvicornWorker"
+# The app itself is built in each worker; only modules and the catalog are loaded in the master.
+preload_app = False
+graceful_timeout = 30
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def on_starting(server) -> None:
+    writer_socket = os.getenv("SUBMISSION_WRITER_SOCKET")
+    if writer_socket:
+        server.submission_writer = _start_submission_writer(writer_socket)
+
+    import app.main  # noqa: F401  # Imported, not built: create_app() runs in each worker.
+    from app.catalog import current_catalog
+
+    snapshot = current_catalog()
+    gc.collect()
+    gc.freeze()
+    logger.info("Loaded catalog %s before forking %d workers.", snapshot.version, workers)
+
+
+def child_exit(server, worker) -> None:
+    metrics_dir = (os.getenv("METRICS_MULTIPROC_DIR") or "").strip()
+    if not metrics_dir:
+        return
+    from app.metrics import absorb_exited_worker
+
+    # Keeps the worker's counters but not its file, which would otherwise pile up with every restart.
+    try:
+        absorb_exited_worker(metrics_dir, worker.pid)
+    except OSError:
+        logger.exception("Could not fold the metrics of worker %d into %s.", worker.pid, metrics_dir)
+
+
+def on_exit(server) -> None:
+    writer = getattr(server, "submission_writer", None)
+    if writer is None or writer.poll() is not None:
+        return
+    writer.terminate()
+    try:
+        # Long enough for the writer to drain its queue into the store.
+        writer.wait(timeout=graceful_timeout)
+    except subprocess.TimeoutExpired:
+        logger.error("Submission writer did not stop in %ss; killing it.", graceful_timeout)
+        writer.kill()
+
+
+def _start_submission_writer(socket_path: str) -> subprocess.Popen:
+    Path(socket_path).unlink(missing_ok=True)
+    writer = subprocess.Popen([sys.executable, "-m", "app.submission_writer", socket_path], cwd=BACKEND_ROOT)
+    # Workers start sending as soon as they serve; wait until the writer is bound.
+    deadline = time.monotonic() + WRITER_START_TIMEOUT_SECONDS
+    while not Path(socket_path).exists():
+        if writer.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError(f"Submission writer did not start listening on {socket_path}.")
+        time.sleep(0.05)
+    logger.info("Submission writer (pid %d) listening on %s.", writer.pid, socket_path)
+    return writer
@@ -4,3 +4,71 @@ from pathlib import Path
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
+
+from collections.abc import Callable
+
+import pytest
+
+from app.settings import Settings
+from app.submission_store import GoogleSheetsSubmissionStore, SubmissionRecord
+
+
+@pytest.fixture
+def make_submission() -> Callable[..., dict[str, object]]:
+    def factory(submission_id: str, **overrides: object) -> dict[str, object]:
+        return {
+            "submitted_at_utc": "2026-02-11T00:00:00Z",
+            "submission_id": submission_id,
+            "responses": ["agree"] * 18,
+            "recommendations": ["A", "B", "C", "D", "E"],
+            "visitor_hash": None,
+            "schema_version": "v1",
+            **overrides,
+        }
+
+    return factory
+
+
+@pytest.fixture
+def make_record(make_submission: Callable[..., dict[str, object]]) -> Callable[..., SubmissionRecord]:
+    def factory(submission_id: str, **overrides: object) -> SubmissionRecord:
+        return SubmissionRecord(**make_submission(submission_id, **overrides))
+
+    return factory
+
+
+@pytest.fixture
+def make_settings() -> Callable[..., Settings]:
+    def factory(**overrides: object) -> Settings:
+        values: dict[str, object] = {
+            "google_sheets_enabled": False,
+            "google_sheets_spreadsheet_id": None,
+            "google_sheets_worksheet_name": "Submissions",
+            "google_service_account_json": None,
+            "google_service_account_file": None,
+            "google_sheets_request_timeout_seconds": 5.0,
+            "google_sheets_max_retries": 2,
+            "enable_visitor_hash": False,
+            "visitor_hash_secret": None,
+            "schema_version": "v1",
+        }
+        values.update(overrides)
+        return Settings(**values)
+
+    return factory
+
+
+@pytest.fixture
+def make_sheets_store() -> Callable[..., GoogleSheetsSubmissionStore]:
+    def factory(service: object, *, max_retries: int = 2) -> GoogleSheetsSubmissionStore:
+        return GoogleSheetsSubmissionStore(
+            spreadsheet_id="spreadsheet-id",
+            worksheet_name="Submissions",
+            service_account_json='{"type":"service_account"}',
+            service_account_file=None,
+            request_timeout_seconds=5.0,
+            max_retries=max_retries,
+            _service=service,
+        )
+
+    return factory
@@ -0,0 +1,125 @@
+"""In-memory stand-in for the Google Sheets v4 ``spreadsheets().values()`` client.
+
+Used by tests in place of the discovery-built service, e.g.
+``GoogleSheetsSubmissionStore(..., _service=FakeSheetsService())``.
+"""
+
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+
+_RANGE_PATTERN = re.compile(r"^(?P<sheet>[^!]+)!(?P<start_col>[A-Z]+)(?P<start_row>\d*):(?P<end_col>[A-Z]+)(?P<end_row>\d*)$")
+
+
+class FakeSheetsError(RuntimeError):
+    def __init__(self, message: str, *, status: int = 503, retry_after_seconds: float | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        # Shaped like googleapiclient's HttpError.resp (an httplib2 response, i.e. a header dict).
+        self.resp = {"status": str(status)}
+        if retry_after_seconds is not None:
+            self.resp["retry-after"] = str(retry_after_seconds)
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - ord("A") + 1)
+    return index - 1
+
+
+@dataclass
+class FakeSheetsService:
+    latency_seconds: float = 0.0
+    failure_rate: float = 0.0
+    failure_status: int = 503
+    seed: int = 0
+    rows: dict[str, list[list[str]]] = field(default_factory=dict)
+    append_calls: int = 0
+    get_calls: int = 0
+    # Queue of scripted outcomes for upcoming appends: "fail" raises before writing, "throttle" raises a 429
+    # with Retry-After, "timeout" writes then raises.
+    scripted_failures: list[str] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _random: random.Random = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def spreadsheets(self) -> "FakeSheetsService":
+        return self
+
+    def values(self) -> "FakeSheetsService":
+        return self
+
+    def append(
+        self,
+        *,
+        spreadsheetId: str,
+        range: str,
+        valueInputOption: str,
+        insertDataOption: str,
+        body: dict[str, list[list[str]]],
+    ) -> "_FakeRequest":
+        return _FakeRequest(lambda: self._append(range, body["values"]))
+
+    def get(self, *, spreadsheetId: str, range: str) -> "_FakeRequest":
+        return _FakeRequest(lambda: self._get(range))
+
+    def all_rows(self, worksheet_name: str = "Submissions") -> list[list[str]]:
+        with self._lock:
+            return [list(row) for row in self.rows.get(worksheet_name, [])]
+
+    def _append(self, range_name: str, values: list[list[str]]) -> dict[str, object]:
+        self._simulate_latency()
+        sheet = range_name.split("!", 1)[0]
+        with self._lock:
+            self.append_calls += 1
+            outcome = self.scripted_failures.pop(0) if self.scripted_failures else None
+            if outcome == "fail" or (outcome is None and self._random.random() < self.failure_rate):
+                raise FakeSheetsError("Simulated Sheets failure.", status=self.failure_status)
+            if outcome == "throttle":
+                raise FakeSheetsError("Simulated rate limit.", status=429, retry_after_seconds=1.5)
+
+            sheet_rows = self.rows.setdefault(sheet, [])
+            first_row = len(sheet_rows) + 1
+            sheet_rows.extend(list(row) for row in values)
+            last_row = len(sheet_rows)
+
+        if outcome == "timeout":
+            raise FakeSheetsError("Simulated timeout after the rows were written.", status=504)
+
+        return {"updates": {"updatedRange": f"{sheet}!A{first_row}:AA{last_row}", "updatedRows": len(values)}}
+
+    def _get(self, range_name: str) -> dict[str, object]:
+        self._simulate_latency()
+        match = _RANGE_PATTERN.match(range_name)
+        if not match:
+            raise FakeSheetsError(f"Unsupported range: {range_name}", status=400)
+
+        with self._lock:
+            self.get_calls += 1
+            sheet_rows = self.rows.get(match["sheet"], [])
+            start_row = int(match["start_row"] or 1)
+            end_row = int(match["end_row"]) if match["end_row"] else len(sheet_rows)
+            start_col = _column_index(match["start_col"])
+            end_col = _column_index(match["end_col"])
+            values = [row[start_col : end_col + 1] for row in sheet_rows[start_row - 1 : end_row]]
+
+        return {"range": range_name, "values": values} if values else {"range": range_name}
+
+    def _simulate_latency(self) -> None:
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+
+
+@dataclass(frozen=True)
+class _FakeRequest:
+    _call: Callable[[], dict[str, object]]
+
+    def execute(self) -> dict[str, object]:
+        return self._call()
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.admission import (
+    REJECTED_DEADLINE,
+    REJECTED_QUEUE_FULL,
+    AdmissionController,
+    AdmissionRejected,
+    ClientRateLimiter,
+    ConcurrencyLimiter,
+)
+from app.main import app
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.submission_ids: list[str] = []
+
+    def append_submission(self, **kwargs: object) -> None:
+        self.submission_ids.append(str(kwargs["submission_id"]))
+
+
+def _controller(**overrides: object) -> AdmissionController:
+    values: dict[str, object] = {
+        "max_concurrency": 4,
+        "max_queue": 4,
+        "max_wait_seconds": 1.0,
+        "client_rate_per_second": 0.0,
+        "client_burst": 1,
+        "storage_shed_ratio": 2.0,
+    }
+    values.update(overrides)
+    return AdmissionController(**values)
+
+
+def test_token_buckets_refill_per_client_and_forget_idle_clients() -> None:
+    clock = FakeClock()
+    limiter = ClientRateLimiter(rate_per_second=1.0, burst=2, max_clients=2, clock=clock)
+
+    assert [limiter.take("a"), limiter.take("a")] == [0.0, 0.0]
+    assert limiter.take("a") == pytest.approx(1.0)
+    assert limiter.take("b") == 0.0
+    clock.now = 1.0
+    assert limiter.take("a") == 0.0
+
+    limiter.take("c")
+    assert list(limiter._buckets) == ["a", "c"]
+
+
+def test_queued_requests_get_released_slots_in_order_and_overflow_is_rejected() -> None:
+    limiter = ConcurrencyLimiter(limit=1, max_queue=1, max_wait_seconds=5.0)
+
+    async def scenario() -> None:
+        assert await limiter.acquire() is False
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert (rejected.value.reason, rejected.value.status_code) == (REJECTED_QUEUE_FULL, 503)
+
+        limiter.release(0.01)
+        assert await waiting is True
+        assert (limiter.in_flight, limiter.queued) == (1, 0)
+        limiter.release(0.01)
+        assert limiter.in_flight == 0
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def test_waits_longer_than_the_deadline_are_rejected() -> None:
+    limiter = ConcurrencyLimiter(limit=1, max_queue=4, max_wait_seconds=0.05)
+
+    async def scenario() -> None:
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await limiter.acquire()
+        assert timed_out.value.reason == REJECTED_DEADLINE
+        assert limiter.queued == 0
+
+        # Once holds are known to be slow, the next request is turned away without waiting.
+        limiter.release(10.0)
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as predicted:
+            await asyncio.wait_for(limiter.acquire(), timeout=0.01)
+        assert predicted.value.reason == REJECTED_DEADLINE
+        assert predicted.value.headers == {"Retry-After": "2"}
+
+    asyncio.run(scenario())
+
+
+def test_storage_is_shed_before_requests_are_rejected() -> None:
+    controller = _controller(max_concurrency=2, storage_shed_ratio=1.0)
+
+    async def scenario() -> list[bool]:
+        first = await controller.admit("a")
+        second = await controller.admit("b")
+        first.release()
+        second.release()
+        return [first.shed_storage, second.shed_storage]
+
+    assert asyncio.run(scenario()) == [False, True]
+    stats = controller.stats()
+    assert (stats.admitted, stats.storage_shed, stats.in_flight) == (2, 1, 0)
+
+
+def test_recommendations_rate_limit_returns_429_with_retry_after(monkeypatch) -> None:
+    store = RecordingStore()
+    monkeypatch.setattr(app.state, "submission_store", store, raising=False)
+    monkeypatch.setattr(
+        app.state, "admission", _controller(client_rate_per_second=0.5, client_burst=1), raising=False
+    )
+    client = TestClient(app)
+
+    first = client.post("/api/v1/recommendations", json={"codes": "2" * 18})
+    second = client.post("/api/v1/recommendations", json={"codes": "2" * 18})
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "2"
+    assert len(store.submission_ids) == 1
+    assert app.state.admission.stats().rejected_rate_limited == 1
+
+
+def test_shed_requests_are_scored_but_not_stored(monkeypatch) -> None:
+    store = RecordingStore()
+    monkeypatch.setattr(app.state, "submission_store", store, raising=False)
+    monkeypatch.setattr(app.state, "admission", _controller(storage_shed_ratio=0.0), raising=False)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/recommendations", json={"codes": "2" * 18})
+
+    assert response.status_code == 200
+    assert response.json()["recommendations"]
+    assert store.submission_ids == []
+    assert app.state.admission.stats().storage_shed == 1
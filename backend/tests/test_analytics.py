@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.analytics import (
+    SubmissionAggregates,
+    iter_csv_chunks,
+    main as analytics_main,
+    open_submission_pages,
+    parse_stored_response,
+    summarize,
+)
+from app.main import app
+from app.models import ResponseOption
+from app.submission_journal import JournalSubmissionStore
+from app.submission_store import SUBMISSION_COLUMNS, SubmissionStoreError
+from fake_sheets import FakeSheetsService
+
+
+def _journal_settings(make_settings, path):
+    return make_settings(submission_store_backend="journal", submission_journal_path=str(path))
+
+
+@pytest.fixture
+def journal_path(tmp_path, make_submission):
+    path = tmp_path / "journal.db"
+    journal = JournalSubmissionStore(path)
+    journal.append_submission(**make_submission("a", submitted_at_utc="2026-02-11T10:00:00Z"))
+    journal.append_submission(**make_submission("b", responses=["ResponseOption.STRONGLY_AGREE"] * 18))
+    journal.append_submission(**make_submission("c", responses=["agree"] * 17 + ["maybe"], catalog_version="v2"))
+    journal.close()
+    return path
+
+
+def test_parse_stored_response_accepts_values_and_legacy_enum_strings() -> None:
+    assert parse_stored_response("agree") is ResponseOption.AGREE
+    assert parse_stored_response("ResponseOption.STRONGLY_DISAGREE") is ResponseOption.STRONGLY_DISAGREE
+    assert parse_stored_response("maybe") is None
+
+
+def test_aggregates_count_responses_positions_and_injections(make_settings, journal_path) -> None:
+    pages = open_submission_pages(_journal_settings(make_settings, journal_path), page_size=2)
+
+    summary = summarize(pages).as_dict()
+
+    assert summary["submissions"] == 3
+    assert summary["first_submitted_at_utc"] == "2026-02-11T00:00:00Z"
+    assert summary["last_submitted_at_utc"] == "2026-02-11T10:00:00Z"
+    assert summary["catalog_versions"] == {"unknown": 2, "v2": 1}
+    assert summary["question_responses"]["q1"] == {"agree": 2, "strongly_agree": 1}
+    assert summary["question_responses"]["q18"] == {"agree": 1, "strongly_agree": 1, "invalid": 1}
+    assert summary["recommendation_positions"]["rec_1"] == {"A": 3}
+    injection = summary["prerequisite_injection"]
+    assert (injection["scored"], injection["unscored"]) == (2, 1)
+    assert injection["injected"] == 2
+    assert injection["by_trigger_phase"]["Phase C"] == {"count": 2, "rate": 1.0}
+
+
+def test_csv_export_streams_one_chunk_per_page(make_settings, journal_path) -> None:
+    aggregates = SubmissionAggregates()
+    pages = open_submission_pages(_journal_settings(make_settings, journal_path), page_size=2)
+
+    chunks = list(iter_csv_chunks(pages, aggregates=aggregates))
+
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == SUBMISSION_COLUMNS
+    assert [row[1] for row in rows[1:]] == ["a", "b", "c"]
+    assert aggregates.submissions == 3
+
+
+def test_sheets_source_reads_the_worksheet_in_pages(make_sheets_store, make_record) -> None:
+    service = FakeSheetsService()
+    service.rows["Submissions"] = [list(SUBMISSION_COLUMNS)]
+    store = make_sheets_store(service)
+    store.append_submissions([make_record(f"s{index}") for index in range(5)])
+
+    pages = list(store.iter_records(page_size=2))
+
+    assert [[record.submission_id for record in page] for page in pages] == [["s0"], ["s1", "s2"], ["s3", "s4"]]
+    assert pages[0][0].responses == ["agree"] * 18
+    # Three full pages, then an empty one ends the read.
+    assert service.get_calls == 4
+
+
+def test_missing_source_is_reported_before_streaming(make_settings, tmp_path) -> None:
+    with pytest.raises(SubmissionStoreError):
+        open_submission_pages(make_settings())
+    with pytest.raises(SubmissionStoreError):
+        open_submission_pages(_journal_settings(make_settings, tmp_path / "missing.db"))
+
+
+def test_export_endpoint_requires_admin_token_and_streams(monkeypatch, make_settings, journal_path) -> None:
+    settings = make_settings(
+        admin_api_token="secret",
+        submission_store_backend="journal",
+        submission_journal_path=str(journal_path),
+    )
+    monkeypatch.setattr(app.state, "settings", settings, raising=False)
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer secret"}
+
+    unauthorized = client.get("/api/v1/admin/submissions:export")
+    summary = client.get("/api/v1/admin/submissions:export", headers=headers)
+    exported = client.get("/api/v1/admin/submissions:export", params={"format": "csv"}, headers=headers)
+
+    assert unauthorized.status_code == 401
+    assert summary.json()["submissions"] == 3
+    assert exported.headers["content-type"].startswith("text/csv")
+    assert exported.text.splitlines()[0] == ",".join(SUBMISSION_COLUMNS)
+    assert len(exported.text.splitlines()) == 4
+
+
+def test_cli_writes_csv_and_prints_summary(monkeypatch, tmp_path, journal_path, capsys) -> None:
+    monkeypatch.setenv("SUBMISSION_STORE_BACKEND", "journal")
+    monkeypatch.setenv("SUBMISSION_JOURNAL_PATH", str(journal_path))
+    csv_path = tmp_path / "export.csv"
+
+    assert analytics_main(["--csv", str(csv_path), "--page-size", "1"]) == 0
+
+    assert json.loads(capsys.readouterr().out)["submissions"] == 3
+    assert len(csv_path.read_text(encoding="utf-8").splitlines()) == 4
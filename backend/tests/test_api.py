@@ -1,8 +1,13 @@
+import json
+
+import pytest
 from fastapi.testclient import TestClient
 
-from app.main import app
+from app.catalog import current_catalog
+from app.circuit_breaker import CircuitBreaker, CircuitBreakerSubmissionStore
+from app.main import app, create_app
 from app.settings import Settings
-from app.submission_store import SubmissionStoreError
+from app.submission_store import NoopSubmissionStore, SubmissionStoreError
 
 
 client = TestClient(app)
@@ -22,6 +27,29 @@ def test_ready_endpoint_returns_ok() -> None:
     assert response.json() == {"status": "ok"}
 
 
+def test_ready_endpoint_reports_circuit_breaker_state(monkeypatch) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=60)
+    breaker.record_failure()
+    store = CircuitBreakerSubmissionStore(NoopSubmissionStore(), breaker)
+    monkeypatch.setattr(client.app.state, "submission_store", store, raising=False)
+
+    response = client.get("/api/v1/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "submission_store": {"circuit": "open"}}
+
+
+def test_metrics_endpoint_reports_route_latency_and_cache_counters() -> None:
+    client.post("/api/v1/recommendations", json={"codes": "2" * 18})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/recommendations",status="2xx"}' in response.text
+    assert "recommendation_cache_hits_total" in response.text
+
+
 def test_cors_allows_localhost_frontend_origin() -> None:
     response = client.options(
         "/api/v1/health",
@@ -44,6 +72,24 @@ def test_questions_endpoint_returns_18_questions() -> None:
     assert payload["questions"][0]["id"] == 1
 
 
+def test_questions_endpoint_is_gzipped_and_revalidated_by_etag() -> None:
+    response = client.get("/api/v1/questions", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert len(response.json()["questions"]) == 18
+
+    revalidated = client.get(
+        "/api/v1/questions",
+        headers={"Accept-Encoding": "identity", "If-None-Match": response.headers["etag"]},
+    )
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] != response.headers["etag"]
+
+
 def test_recommendations_endpoint_returns_top_five() -> None:
     payload = {"responses": ["agree"] * 18}
 
@@ -63,6 +109,26 @@ def test_recommendations_endpoint_validates_response_length() -> None:
     assert response.status_code == 422
 
 
+def test_recommendations_accept_compact_encodings() -> None:
+    answers = ["strongly_disagree", "disagree", "agree", "strongly_agree"] * 4 + ["agree", "disagree"]
+    digits = "012301230123012321"
+
+    expected = client.post("/api/v1/recommendations", json={"responses": answers}).json()
+
+    assert client.post("/api/v1/recommendations", json={"codes": digits}).json() == expected
+    assert client.post("/api/v1/recommendations", json={"packed": int(digits, 4)}).json() == expected
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"codes": "01230123012301234"}, {"codes": "4" * 18}, {"packed": 1 << 36}, {"packed": "12"}, {}],
+)
+def test_recommendations_reject_invalid_compact_encodings(payload: dict[str, object]) -> None:
+    response = client.post("/api/v1/recommendations", json=payload)
+
+    assert response.status_code == 422
+
+
 def test_recommendations_appends_submission_row(monkeypatch) -> None:
     calls: list[dict[str, object]] = []
 
@@ -94,7 +160,9 @@ def test_recommendations_appends_submission_row(monkeypatch) -> None:
 
     assert response.status_code == 200
     assert len(calls) == 1
+    assert calls[0]["responses"] == ["agree"] * 18
     assert calls[0]["schema_version"] == "v1"
+    assert calls[0]["catalog_version"] == current_catalog().version
     assert len(calls[0]["responses"]) == 18
     assert len(calls[0]["recommendations"]) == 5
     assert isinstance(calls[0]["recommendations"][0], str)
@@ -130,3 +198,123 @@ def test_recommendations_returns_success_when_submission_store_fails(monkeypatch
     assert response.status_code == 200
     data = response.json()
     assert len(data["recommendations"]) == 5
+
+
+def test_batch_recommendations_streams_ndjson_results_in_order() -> None:
+    lines = [
+        json.dumps({"responses": ["agree"] * 18}),
+        "not json",
+        json.dumps({"responses": ["strongly_agree"] * 18}),
+        json.dumps({"responses": ["agree"] * 17}),
+    ]
+
+    response = client.post(
+        "/api/v1/recommendations:batch",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    single = client.post("/api/v1/recommendations", json={"responses": ["agree"] * 18}).json()
+    assert results[0]["recommendations"] == single["recommendations"]
+    assert "error" in results[1]
+    assert len(results[2]["recommendations"]) == 5
+    assert "error" in results[3]
+
+
+def test_batch_recommendations_bulk_stores_submissions(monkeypatch, make_settings) -> None:
+    batches: list[list[object]] = []
+
+    class BatchStore:
+        def append_submission(self, **kwargs: object) -> None:
+            raise AssertionError("bulk mode should use append_submissions")
+
+        def append_submissions(self, records: list[object]) -> None:
+            batches.append(records)
+
+    monkeypatch.setattr(client.app.state, "submission_store", BatchStore(), raising=False)
+    monkeypatch.setattr(client.app.state, "settings", make_settings(admin_api_token="secret"), raising=False)
+    body = [{"responses": ["agree"] * 18}, {"responses": ["disagree"] * 18}]
+
+    assert client.post("/api/v1/recommendations:batch?store=bulk", json=body).status_code == 401
+    response = client.post(
+        "/api/v1/recommendations:batch?store=bulk", json=body, headers={"Authorization": "Bearer secret"}
+    )
+
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+    assert len(batches) == 1
+    assert [record.responses[0] for record in batches[0]] == ["agree", "disagree"]
+
+
+def test_batch_recommendations_rejects_non_array_json() -> None:
+    response = client.post("/api/v1/recommendations:batch", json={"responses": ["agree"] * 18})
+
+    assert response.status_code == 400
+
+
+def test_batch_recommendations_accepts_single_ndjson_line() -> None:
+    response = client.post(
+        "/api/v1/recommendations:batch",
+        content=json.dumps({"responses": ["agree"] * 18}),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert json.loads(response.text)["index"] == 0
+
+
+def test_batch_recommendations_report_undecodable_bytes_per_item() -> None:
+    valid = json.dumps({"responses": ["agree"] * 18}).encode()
+
+    ndjson = client.post(
+        "/api/v1/recommendations:batch",
+        content=valid + b"\n\xff\xfe\n" + valid,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    array = client.post(
+        "/api/v1/recommendations:batch",
+        content=b"[" + valid + b', "\xff"]',
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert ndjson.status_code == array.status_code == 200
+    assert ["error" in json.loads(line) for line in ndjson.text.splitlines()] == [False, True, False]
+    assert ["error" in json.loads(line) for line in array.text.splitlines()] == [False, True]
+
+
+def test_batch_recommendations_reject_oversized_uploads(monkeypatch, make_settings) -> None:
+    monkeypatch.setattr(client.app.state, "settings", make_settings(batch_max_upload_bytes=64), raising=False)
+    lines = "\n".join([json.dumps({"codes": "2" * 18})] * 4)
+
+    response = client.post(
+        "/api/v1/recommendations:batch", content=lines, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 413
+
+
+def test_catalog_reload_endpoint_requires_admin_token(monkeypatch, make_settings) -> None:
+    assert client.post("/api/v1/admin/catalog:reload").status_code == 404
+
+    monkeypatch.setattr(client.app.state, "settings", make_settings(admin_api_token="secret"), raising=False)
+
+    assert client.post("/api/v1/admin/catalog:reload").status_code == 401
+    response = client.post("/api/v1/admin/catalog:reload", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert response.json() == {"version": current_catalog().version, "changed": False}
+
+
+def test_create_app_builds_an_independent_app_from_settings(make_settings) -> None:
+    settings = make_settings(metrics_enabled=False, startup_warmup_enabled=False)
+
+    other = create_app(settings)
+    other_client = TestClient(other)
+
+    assert other is not app
+    assert other.state.settings is settings
+    assert other.state.recommendation_cache is not app.state.recommendation_cache
+    assert other_client.get("/api/v1/ready").json() == {"status": "ok"}
+    assert other_client.get("/metrics").status_code == 404
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import sys
+import types
+
+import httpx
+import pytest
+
+from app.async_submission_store import AsyncGoogleSheetsSubmissionStore, append_submission_async
+from app.circuit_breaker import AsyncCircuitBreakerSubmissionStore
+from app.submission_store import SubmissionStoreError, create_submission_store
+
+
+class FakeCredentials:
+    def __init__(self) -> None:
+        self.valid = True
+        self.token = "token"
+
+
+def _store(handler, *, max_retries: int = 2) -> AsyncGoogleSheetsSubmissionStore:
+    return AsyncGoogleSheetsSubmissionStore(
+        spreadsheet_id="spreadsheet-id",
+        worksheet_name="Submissions",
+        service_account_json=None,
+        service_account_file=None,
+        request_timeout_seconds=5.0,
+        max_retries=max_retries,
+        _credentials=FakeCredentials(),
+        _transport=httpx.MockTransport(handler),
+    )
+
+
+def test_async_store_appends_rows_over_rest(make_record) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"updates": {"updatedRange": "Submissions!A2:AB3"}})
+
+    store = _store(handler)
+
+    async def run() -> None:
+        await store.append_submissions([make_record("a"), make_record("b"), make_record("a")])
+        await store.append_submission(**make_record("a").as_kwargs())
+        await store.aclose()
+
+    asyncio.run(run())
+
+    assert len(requests) == 1
+    assert requests[0].url.path == "/v4/spreadsheets/spreadsheet-id/values/Submissions!A:Z:append"
+    assert requests[0].headers["authorization"] == "Bearer token"
+    assert [row[1] for row in json.loads(requests[0].content)["values"]] == ["a", "b"]
+    assert store._next_row == 4
+
+
+def test_async_store_skips_landed_rows_when_retrying(make_record, monkeypatch) -> None:
+    monkeypatch.setattr("app.async_submission_store.asyncio.sleep", _no_sleep)
+    appends: list[list[str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"values": [["submission_id"], ["a"]]})
+        appends.append([row[1] for row in json.loads(request.content)["values"]])
+        if len(appends) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={})
+
+    store = _store(handler)
+    asyncio.run(store.append_submissions([make_record("a"), make_record("b")]))
+
+    assert appends == [["a", "b"], ["b"]]
+
+
+def test_async_store_raises_store_error_after_retries(make_record, monkeypatch) -> None:
+    monkeypatch.setattr("app.async_submission_store.asyncio.sleep", _no_sleep)
+    store = _store(lambda request: httpx.Response(500), max_retries=1)
+
+    with pytest.raises(SubmissionStoreError):
+        asyncio.run(store.append_submissions([make_record("a")]))
+
+
+def test_async_store_wraps_credential_and_parse_failures(make_record, monkeypatch) -> None:
+    monkeypatch.setattr("app.async_submission_store.asyncio.sleep", _no_sleep)
+
+    def reject_key(info: object, scopes: object) -> object:
+        raise ValueError("No key could be detected.")
+
+    service_account = types.SimpleNamespace(
+        Credentials=types.SimpleNamespace(from_service_account_info=reject_key)
+    )
+    monkeypatch.setitem(sys.modules, "google", types.ModuleType("google"))
+    monkeypatch.setitem(sys.modules, "google.oauth2", types.SimpleNamespace(service_account=service_account))
+    badly_configured = AsyncGoogleSheetsSubmissionStore(
+        spreadsheet_id="spreadsheet-id",
+        worksheet_name="Submissions",
+        service_account_json='{"type": "service_account", "private_key": "not a key"}',
+        service_account_file=None,
+        request_timeout_seconds=5.0,
+        max_retries=1,
+        _transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+    )
+    not_json = _store(lambda request: httpx.Response(200, content=b"<html>"), max_retries=1)
+
+    for store in (badly_configured, not_json):
+        with pytest.raises(SubmissionStoreError):
+            asyncio.run(store.append_submissions([make_record("a")]))
+
+
+def test_append_submission_async_runs_sync_stores(make_submission) -> None:
+    calls: list[str] = []
+
+    class SyncStore:
+        def append_submission(self, **kwargs: object) -> None:
+            calls.append(str(kwargs["submission_id"]))
+
+    asyncio.run(append_submission_async(SyncStore(), **make_submission("sync")))
+
+    assert calls == ["sync"]
+
+
+def test_create_submission_store_selects_async_sheets_store(make_settings) -> None:
+    settings = make_settings(
+        google_sheets_enabled=True,
+        google_sheets_spreadsheet_id="spreadsheet-id",
+        google_service_account_json='{"type":"service_account"}',
+        google_sheets_async=True,
+    )
+
+    store = create_submission_store(settings)
+
+    assert isinstance(store, AsyncCircuitBreakerSubmissionStore)
+    assert isinstance(store.store, AsyncGoogleSheetsSubmissionStore)
+    asyncio.run(store.aclose())
+
+
+async def _no_sleep(seconds: float) -> None:
+    return None
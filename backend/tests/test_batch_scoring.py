@@ -0,0 +1,31 @@
+import io
+
+import pytest
+
+from app.batch_scoring import BatchItemError, decode_batch_item, iter_json_array
+
+
+def _items(text: str) -> list[object]:
+    return list(iter_json_array(io.StringIO(text)))
+
+
+def test_iter_json_array_yields_elements_incrementally(monkeypatch) -> None:
+    monkeypatch.setattr("app.batch_scoring._READ_CHUNK_SIZE", 3)
+
+    assert _items(' [ {"a": [1, 2]}, 12345 ,"x" ] ') == [{"a": [1, 2]}, 12345, "x"]
+    assert _items("[]") == []
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}', "[1, 2", "[1 2]", '[{"a": ]'])
+def test_iter_json_array_rejects_malformed_input(text: str) -> None:
+    with pytest.raises(BatchItemError):
+        _items(text)
+
+
+def test_decode_batch_item_accepts_compact_encodings() -> None:
+    codes = [0, 1, 2, 3] * 4 + [2, 1]
+
+    assert decode_batch_item({"codes": "012301230123012321"}) == codes
+    assert decode_batch_item({"packed": int("012301230123012321", 4)}) == codes
+    with pytest.raises(BatchItemError):
+        decode_batch_item({"codes": "0123"})
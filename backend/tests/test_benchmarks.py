@@ -0,0 +1,67 @@
+import json
+
+from benchmarks.http_load import compare_results, main, percentile
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_in_process_benchmark_emits_comparable_json(tmp_path, capsys) -> None:
+    output = tmp_path / "bench.json"
+
+    exit_code = main(
+        ["--concurrency", "2", "--requests", "10", "--warmup", "0", "--output", str(output)]
+    )
+
+    assert exit_code == 0
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert json.loads(capsys.readouterr().out) == report
+    assert [(result["endpoint"], result["errors"]) for result in report["results"]] == [
+        ("questions", 0),
+        ("recommendations", 0),
+    ]
+    assert set(report["results"][0]["latency_ms"]) == {"p50", "p95", "p99", "max", "mean"}
+    assert len(compare_results(report, report)) == 2
+
+
+def test_serialization_benchmark_runs(capsys) -> None:
+    from benchmarks.serialization import main as serialization_main
+
+    assert serialization_main(["--iterations", "10"]) == 0
+    assert "speedup" in json.loads(capsys.readouterr().out)
+
+
+def test_cold_start_benchmark_reports_both_modes(capsys) -> None:
+    from benchmarks.cold_start import main as cold_start_main
+
+    assert cold_start_main(["--runs", "1"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert "warmup_ms" in report["warm"]
+    assert "first_questions_ms" in report["cold"]
+
+
+def test_worker_import_stays_within_budget_without_client_libraries(monkeypatch, capsys) -> None:
+    from benchmarks.import_time import main as import_time_main
+
+    monkeypatch.setenv("GOOGLE_SHEETS_ENABLED", "false")
+
+    # The median of three runs against the default budget, which sits about 25% above the measured import.
+    assert import_time_main(["--runs", "3"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["lazy_modules_loaded"] == []
+    assert report["import_ms"] > 0
+
+
+def test_sensitivity_benchmark_checks_parity_and_reports_speedup(capsys) -> None:
+    from benchmarks.sensitivity import main as sensitivity_main
+
+    assert sensitivity_main(["--surveys", "5"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["alternatives_per_survey"] == 54
+    assert "speedup" in report
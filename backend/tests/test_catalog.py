@@ -0,0 +1,50 @@
+import shutil
+
+import pytest
+
+from app.catalog import (
+    DATA_FILE_PATHS,
+    CatalogValidationError,
+    build_catalog,
+    current_catalog,
+    reload_catalog,
+)
+
+
+@pytest.fixture
+def data_files(tmp_path, monkeypatch):
+    paths = tuple(tmp_path / path.name for path in DATA_FILE_PATHS)
+    for source, target in zip(DATA_FILE_PATHS, paths):
+        shutil.copyfile(source, target)
+    monkeypatch.setattr("app.catalog.DATA_FILE_PATHS", paths)
+    monkeypatch.setattr("app.catalog._current", None)
+    return paths
+
+
+def test_catalog_version_is_a_content_hash(data_files) -> None:
+    assert build_catalog().version == build_catalog().version == current_catalog().version
+
+
+def test_reload_publishes_only_when_content_changes(data_files) -> None:
+    original = current_catalog()
+    assert reload_catalog() == (original, False)
+
+    questions_path = data_files[0]
+    content = questions_path.read_text(encoding="utf-8")
+    questions_path.write_text(content.replace('"statement": "', '"statement": "Updated: ', 1), encoding="utf-8")
+    snapshot, changed = reload_catalog()
+
+    assert changed
+    assert snapshot.version != original.version
+    assert current_catalog() is snapshot
+
+
+def test_reload_keeps_old_snapshot_when_new_files_are_invalid(data_files) -> None:
+    original = current_catalog()
+    order_path = data_files[1]
+    order_path.write_text(order_path.read_text(encoding="utf-8").replace("(NRG)", "(XYZ)"), encoding="utf-8")
+
+    with pytest.raises(CatalogValidationError, match="NRG"):
+        reload_catalog()
+
+    assert current_catalog() is original
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from app.catalog import current_catalog
+from app.catalog_index import compile_catalog_index, parse_prerequisite_phases
+from app.data_loader import Activity
+from app.scoring import TOP_K
+
+
+def _activity(code: str, phase: str, prerequisite: str = "None (entry point)") -> Activity:
+    return Activity(code=code, name=code, phase=phase, prerequisite=prerequisite)
+
+
+def _hardcoded_selection(order: list[int]) -> list[int]:
+    """The selection rule used before prerequisites were read from order.csv."""
+    activities = current_catalog().activities
+    if not any(activities[index].phase == "Phase C" for index in order[:TOP_K]):
+        return order[:TOP_K]
+    phase_a = next(index for index in order if activities[index].phase == "Phase A")
+    energy_mapping = next(index for index in order if activities[index].name == "Energy Mapping")
+    selected = [phase_a, energy_mapping]
+    return selected + [index for index in order if index not in selected][: TOP_K - len(selected)]
+
+
+def test_parse_prerequisite_phases() -> None:
+    assert parse_prerequisite_phases("None (entry point)") == ()
+    assert parse_prerequisite_phases("At least 1 Phase A activity") == ("Phase A",)
+    assert parse_prerequisite_phases("Phase A + Phase B complete") == ("Phase A", "Phase B")
+
+
+def test_table_driven_selection_matches_previous_rule() -> None:
+    catalog = current_catalog()
+    rng = random.Random(3)
+    for _ in range(500):
+        order = list(range(len(catalog.activities)))
+        rng.shuffle(order)
+
+        selected, injected = catalog.index.select_top(order)
+
+        assert injected
+        assert selected == _hardcoded_selection(order)
+
+
+def test_prerequisites_are_resolved_transitively_in_dependency_order() -> None:
+    index = compile_catalog_index(
+        [
+            _activity("C1", "Phase C", "Phase B complete"),
+            _activity("B1", "Phase B", "At least 1 Phase A activity"),
+            _activity("A1", "Phase A"),
+            _activity("A2", "Phase A"),
+            _activity("C2", "Phase C", "Phase B complete"),
+        ]
+    )
+
+    assert index.phase_order == ("Phase A", "Phase B", "Phase C")
+    assert index.codes_by_phase["Phase A"] == ("A1", "A2")
+    assert index.select_top([0, 4, 3, 2, 1], k=3) == ([3, 1, 0], True)
+    assert index.select_top([3, 2], k=2) == ([3, 2], False)
+    assert index.select_top_positions([0, 4, 3, 2, 1], k=3) == ([2, 4, 0], True)
+
+
+def test_circular_prerequisites_are_rejected() -> None:
+    with pytest.raises(ValueError, match="Circular"):
+        compile_catalog_index(
+            [_activity("A1", "Phase A", "Phase B complete"), _activity("B1", "Phase B", "Phase A complete")]
+        )
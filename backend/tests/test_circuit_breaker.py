@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from app.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AsyncCircuitBreakerSubmissionStore,
+    CircuitBreaker,
+    CircuitBreakerSubmissionStore,
+    CircuitOpenError,
+)
+from app.submission_store import GoogleSheetsSubmissionStore, SubmissionStoreError, retry_delay_seconds
+from fake_sheets import FakeSheetsError, FakeSheetsService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.submission_ids: list[str] = []
+
+    def append_submission(self, **kwargs: object) -> None:
+        self.submission_ids.append(str(kwargs["submission_id"]))
+
+
+def _sheets_store(service: FakeSheetsService) -> GoogleSheetsSubmissionStore:
+    return GoogleSheetsSubmissionStore(
+        spreadsheet_id="spreadsheet-id",
+        worksheet_name="Submissions",
+        service_account_json=None,
+        service_account_file=None,
+        request_timeout_seconds=5.0,
+        max_retries=0,
+        _service=service,
+    )
+
+
+def test_breaker_opens_after_threshold_and_allows_one_half_open_trial() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_half_open_trial_frees_the_trial_slot(make_record) -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+
+    class HangingStore:
+        async def append_submissions(self, records: list[object]) -> None:
+            await asyncio.sleep(60)
+
+    store = AsyncCircuitBreakerSubmissionStore(HangingStore(), breaker)
+
+    async def cancel_trial() -> None:
+        trial = asyncio.create_task(store.append_submissions([make_record("a")]))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancel_trial())
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_outage_fails_fast_then_recovers(make_submission) -> None:
+    clock = FakeClock()
+    service = FakeSheetsService(scripted_failures=["fail", "fail"])
+    store = CircuitBreakerSubmissionStore(
+        _sheets_store(service), CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30, clock=clock)
+    )
+
+    for submission_id in ("a", "b"):
+        with pytest.raises(SubmissionStoreError):
+            store.append_submission(**make_submission(submission_id))
+    with pytest.raises(CircuitOpenError):
+        store.append_submission(**make_submission("c"))
+    assert service.append_calls == 2
+
+    clock.now = 30
+    store.append_submission(**make_submission("d"))
+
+    assert store.health() == {"circuit": CLOSED}
+    assert [row[1] for row in service.all_rows()] == ["d"]
+
+
+def test_open_circuit_diverts_to_fallback(make_submission) -> None:
+    fallback = RecordingStore()
+    service = FakeSheetsService(scripted_failures=["fail"])
+    store = CircuitBreakerSubmissionStore(
+        _sheets_store(service),
+        CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30),
+        fallback=fallback,
+    )
+
+    with pytest.raises(SubmissionStoreError):
+        store.append_submission(**make_submission("a"))
+    store.append_submission(**make_submission("b"))
+
+    assert fallback.submission_ids == ["b"]
+    assert store.health() == {"circuit": OPEN, "fallback": "RecordingStore"}
+
+
+def test_rate_limited_retries_wait_for_retry_after(monkeypatch, make_submission) -> None:
+    delays: list[float] = []
+    monkeypatch.setattr("app.submission_store.time.sleep", delays.append)
+    service = FakeSheetsService(scripted_failures=["throttle"])
+    store = _sheets_store(service)
+    store.max_retries = 1
+
+    store.append_submission(**make_submission("a"))
+
+    assert delays == [1.5]
+    assert service.append_calls == 2
+
+
+def test_retry_delay_is_jittered_and_capped() -> None:
+    delays = [retry_delay_seconds(10) for _ in range(200)]
+
+    assert all(0 <= delay <= 10.0 for delay in delays)
+    assert len(set(delays)) > 1
+    assert retry_delay_seconds(0, FakeSheetsError("slow down", status=429, retry_after_seconds=60)) == 10.0
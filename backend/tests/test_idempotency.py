@@ -0,0 +1,149 @@
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.idempotency import (
+    IdempotencyIndex,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyMismatch,
+    validate_idempotency_key,
+)
+from app.main import app
+from app.scoring_sessions import ScoringSessionStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.submission_ids: list[str] = []
+
+    def append_submission(self, **kwargs: object) -> None:
+        self.submission_ids.append(str(kwargs["submission_id"]))
+
+
+def test_index_replays_completed_keys_and_refuses_duplicates_in_progress() -> None:
+    index = IdempotencyIndex(capacity=10, ttl_seconds=60)
+
+    assert index.begin("k", 7) is None
+    with pytest.raises(IdempotencyKeyInProgress):
+        index.begin("k", 7)
+    index.complete("k", b"body", 7)
+
+    assert index.begin("k", 7) == b"body"
+    assert index.begin("k") == b"body"
+    with pytest.raises(IdempotencyKeyMismatch):
+        index.begin("k", 8)
+    assert index.stats().replays == 2
+
+    assert index.begin("failed", 1) is None
+    index.abandon("failed")
+    assert index.begin("failed", 1) is None
+
+
+def test_index_is_bounded_and_time_windowed() -> None:
+    clock = FakeClock()
+    index = IdempotencyIndex(capacity=2, ttl_seconds=60, clock=clock)
+    for key in ("a", "b", "c"):
+        index.begin(key)
+        index.complete(key, key.encode())
+
+    assert index.stats().size == 2
+    assert index.stats().evictions == 1
+    assert index.begin("a") is None
+    clock.now += 61
+    assert index.begin("b") is None
+    assert index.stats().size == 1
+
+
+def test_persistent_index_replays_across_instances(tmp_path) -> None:
+    clock = FakeClock()
+    path = tmp_path / "journal.db"
+    first = IdempotencyIndex(capacity=10, ttl_seconds=60, path=path, clock=clock)
+    first.begin("k", 7)
+    first.complete("k", b"body", 7)
+    first.close()
+
+    second = IdempotencyIndex(capacity=10, ttl_seconds=60, path=path, clock=clock)
+    try:
+        assert second.begin("k", 7) == b"body"
+        clock.now += 61
+        assert second.begin("k", 7) is None
+    finally:
+        second.close()
+
+
+def test_locked_persistent_index_falls_back_to_memory(tmp_path) -> None:
+    path = tmp_path / "journal.db"
+    index = IdempotencyIndex(capacity=10, ttl_seconds=60, path=path)
+    locker = sqlite3.connect(path, isolation_level=None)
+    locker.execute("BEGIN EXCLUSIVE")
+    try:
+        started = time.monotonic()
+        assert index.begin("k", 7) is None
+        index.complete("k", b"body", 7)
+        assert time.monotonic() - started < 2
+        assert index.begin("k", 7) == b"body"
+    finally:
+        locker.rollback()
+        locker.close()
+        index.close()
+
+
+def test_keys_must_be_short_and_printable() -> None:
+    assert validate_idempotency_key(" abc ") == "abc"
+    for key in ("", "x" * 129, "a\nb"):
+        with pytest.raises(ValueError):
+            validate_idempotency_key(key)
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_retried_recommendations_are_replayed_without_a_second_row(monkeypatch, tmp_path, persistent) -> None:
+    store = RecordingStore()
+    index = IdempotencyIndex(capacity=10, ttl_seconds=60, path=tmp_path / "journal.db" if persistent else None)
+    monkeypatch.setattr(app.state, "submission_store", store, raising=False)
+    monkeypatch.setattr(app.state, "idempotency", index, raising=False)
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "survey-1"}
+
+    first = client.post("/api/v1/recommendations", json={"codes": "2" * 18}, headers=headers)
+    retry = client.post("/api/v1/recommendations", json={"codes": "2" * 18}, headers=headers)
+    reused = client.post("/api/v1/recommendations", json={"codes": "3" * 18}, headers=headers)
+    invalid = client.post("/api/v1/recommendations", json={"codes": "2" * 18}, headers={"Idempotency-Key": " "})
+
+    assert retry.content == first.content
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert len(store.submission_ids) == 1
+    assert reused.status_code == 422
+    assert invalid.status_code == 400
+    assert index.stats().replays == 1
+    index.close()
+
+
+def test_session_submit_retry_and_fallback_reuse_the_response(monkeypatch) -> None:
+    store = RecordingStore()
+    monkeypatch.setattr(app.state, "submission_store", store, raising=False)
+    monkeypatch.setattr(app.state, "idempotency", IdempotencyIndex(capacity=10, ttl_seconds=60), raising=False)
+    monkeypatch.setattr(app.state, "scoring_sessions", ScoringSessionStore(capacity=10, ttl_seconds=60), raising=False)
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "survey-2"}
+    session_id = client.post("/api/v1/sessions").json()["session_id"]
+    for question_id in range(1, 19):
+        client.put(f"/api/v1/sessions/{session_id}/answers/{question_id}", json={"code": 1})
+
+    submitted = client.post(f"/api/v1/sessions/{session_id}/submit", headers=headers)
+    retried = client.post(f"/api/v1/sessions/{session_id}/submit", headers=headers)
+    fallback = client.post("/api/v1/recommendations", json={"codes": "1" * 18}, headers=headers)
+
+    assert submitted.status_code == 200
+    assert retried.content == fallback.content == submitted.content
+    assert len(store.submission_ids) == 1
@@ -0,0 +1,61 @@
+import json
+import os
+
+from app.metrics import MetricsRegistry, MultiprocessMetrics, absorb_exited_worker, gauge, render_text
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels("/a").observe(value)
+
+    text = render_text(registry.collect())
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+
+
+def test_multiprocess_totals_keep_counters_of_exited_workers(tmp_path) -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests", "Requests.").inc(3)
+    registry.register_collector(lambda: [gauge("queue_depth", "Depth.", 2)])
+    # A worker that has exited (no such pid) left its last samples behind.
+    exited = {
+        "pid": 2**22 + 1,
+        "families": [
+            ["requests", "counter", "Requests.", "sum", [["_total", {}, 4]]],
+            ["queue_depth", "gauge", "Depth.", "sum", [["", {}, 7]]],
+        ],
+    }
+    (tmp_path / "exited.json").write_text(json.dumps(exited), encoding="utf-8")
+
+    text = render_text(MultiprocessMetrics(registry, str(tmp_path), interval_seconds=5).collect())
+
+    assert "requests_total 7" in text
+    assert "queue_depth 2" in text
+
+
+def test_exited_worker_files_are_folded_into_one(tmp_path) -> None:
+    def worker_metrics(requests: int) -> MultiprocessMetrics:
+        registry = MetricsRegistry()
+        registry.counter("requests", "Requests.").inc(requests)
+        registry.register_collector(lambda: [gauge("queue_depth", "Depth.", 5)])
+        return MultiprocessMetrics(registry, str(tmp_path), interval_seconds=5)
+
+    live = worker_metrics(1)
+    for pid, requests in ((2**22 + 1, 2), (2**22 + 2, 3)):
+        exited = worker_metrics(requests)
+        exited.write()
+        payload = json.loads((tmp_path / f"{os.getpid()}.json").read_text(encoding="utf-8"))
+        (tmp_path / f"{pid}.json").write_text(json.dumps({**payload, "pid": pid}), encoding="utf-8")
+        before = render_text(live.collect())
+        absorb_exited_worker(str(tmp_path), pid)
+        assert render_text(live.collect()) == before
+
+    assert sorted(path.name for path in tmp_path.glob("*.json")) == [f"{os.getpid()}.json", "exited-workers.json"]
+    text = render_text(live.collect())
+    assert "requests_total 6" in text
+    assert "queue_depth 5" in text
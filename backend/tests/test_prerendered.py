@@ -0,0 +1,32 @@
+import gzip
+
+from app.prerendered import IDENTITY, etag_matches, negotiate_encoding, prerender
+
+
+def test_prerender_compresses_deterministically_with_distinct_etags() -> None:
+    first = prerender(b'{"questions": []}' * 20)
+    second = prerender(b'{"questions": []}' * 20)
+
+    assert gzip.decompress(first.bodies["gzip"]) == first.bodies[IDENTITY]
+    assert first.bodies == second.bodies
+    assert first.etags == second.etags
+    assert len(set(first.etags.values())) == len(first.etags)
+
+
+def test_negotiate_encoding_respects_quality_values() -> None:
+    available = {IDENTITY: b"", "gzip": b"", "br": b""}
+
+    assert negotiate_encoding("gzip, deflate, br", available) == "br"
+    assert negotiate_encoding("br;q=0, gzip", available) == "gzip"
+    assert negotiate_encoding("*", {IDENTITY: b"", "gzip": b""}) == "gzip"
+    assert negotiate_encoding("gzip;q=0", available) == IDENTITY
+    assert negotiate_encoding("", available) == IDENTITY
+
+
+def test_etag_matches_lists_wildcards_and_weak_tags() -> None:
+    etags = ['"abc"', '"abc-gzip"']
+
+    assert etag_matches('"other", W/"abc-gzip"', etags)
+    assert etag_matches("*", etags)
+    assert not etag_matches('"other"', etags)
+    assert not etag_matches(None, etags)
@@ -0,0 +1,55 @@
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.profiling import (
+    ProfileDirectory,
+    ProfilingMiddleware,
+    sign_profile_request,
+    verify_profile_signature,
+)
+
+
+def _profiled_client(tmp_path, **options: object) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work() -> dict[str, int]:
+        return {"total": sum(range(1000))}
+
+    app.add_middleware(ProfilingMiddleware, directory=ProfileDirectory(str(tmp_path), max_files=2), **options)
+    return TestClient(app)
+
+
+def test_signature_is_bound_to_path_secret_and_time() -> None:
+    header = sign_profile_request("secret", "/work", timestamp=1_000)
+
+    assert verify_profile_signature("secret", "/work", header, now=1_100)
+    assert not verify_profile_signature("secret", "/other", header, now=1_100)
+    assert not verify_profile_signature("wrong", "/work", header, now=1_100)
+    assert not verify_profile_signature("secret", "/work", header, now=2_000)
+    assert not verify_profile_signature("secret", "/work", "garbage", now=1_100)
+
+
+def test_sampled_requests_write_rotating_pstats_files(tmp_path) -> None:
+    client = _profiled_client(tmp_path, sample_every=2)
+
+    for _ in range(6):
+        assert client.get("/work").status_code == 200
+
+    profiles = sorted(tmp_path.glob("*.prof"))
+    assert len(profiles) == 2
+    assert "GET-work" in profiles[0].name
+    assert pstats.Stats(str(profiles[0])).total_calls > 0
+
+
+def test_signed_header_profiles_a_single_request(tmp_path) -> None:
+    client = _profiled_client(tmp_path, secret="secret")
+
+    client.get("/work")
+    client.get("/work", headers={"X-Debug-Profile": "0:forged"})
+    assert list(tmp_path.glob("*.prof")) == []
+
+    client.get("/work", headers={"X-Debug-Profile": sign_profile_request("secret", "/work")})
+    assert len(list(tmp_path.glob("*.prof"))) == 1
@@ -0,0 +1,54 @@
+from dataclasses import replace
+
+import pytest
+
+from app.catalog import current_catalog
+from app.recommendation_cache import RecommendationCache, pack_response_codes, unpack_response_codes
+from app.scoring import build_recommendation_payload_from_codes
+
+
+def test_pack_response_codes_fits_in_36_bits() -> None:
+    assert pack_response_codes([3] * 18) == (1 << 36) - 1
+    assert pack_response_codes([0] * 17 + [1]) == 1
+    with pytest.raises(ValueError):
+        pack_response_codes([2] * 17 + [4])
+
+
+def test_cache_counts_hits_misses_and_evictions() -> None:
+    cache = RecommendationCache(capacity=2)
+
+    first = cache.payload([2] * 18)
+    assert cache.payload([2] * 18) == first == build_recommendation_payload_from_codes([2] * 18)
+    cache.payload([1] * 18)
+    cache.payload([0] * 18)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 3, 1, 2)
+
+
+def test_cached_payload_is_not_shared_with_callers() -> None:
+    cache = RecommendationCache(capacity=8)
+
+    items, _ = cache.payload([2] * 18)
+    items[0]["name"] = "changed"
+
+    assert cache.payload([2] * 18)[0][0]["name"] != "changed"
+
+
+def test_cache_is_invalidated_when_a_new_catalog_is_published(monkeypatch) -> None:
+    cache = RecommendationCache(capacity=8)
+    cache.payload([2] * 18)
+
+    monkeypatch.setattr("app.catalog._current", replace(current_catalog(), version="next"))
+    cache.payload([2] * 18)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.invalidations) == (0, 2, 1)
+
+
+def test_unpack_response_codes_inverts_packing() -> None:
+    codes = [0, 1, 2, 3] * 4 + [3, 0]
+
+    assert unpack_response_codes(pack_response_codes(codes)) == codes
+    with pytest.raises(ValueError):
+        unpack_response_codes(1 << 36)
@@ -0,0 +1,26 @@
+import pytest
+
+from app.catalog import current_catalog
+from app.models import RecommendationResponse
+from app.recommendation_response import COMPLETION_PERCENT, SCORING_NOTE, render_recommendation_response
+
+
+@pytest.mark.parametrize("prerequisite_note", [None, 'Start with "Phase A" – déjà vu'])
+def test_rendered_bytes_match_the_response_model(prerequisite_note: str | None) -> None:
+    catalog = current_catalog()
+    selected = (4, 0, 6)
+
+    expected = RecommendationResponse(
+        recommendations=[catalog.payload_items[index] for index in selected],
+        total_questions=len(catalog.questions),
+        completion_percent=COMPLETION_PERCENT,
+        scoring_note=SCORING_NOTE,
+        prerequisite_note=prerequisite_note,
+    )
+
+    assert render_recommendation_response(catalog, selected, prerequisite_note) == expected.model_dump_json().encode()
+
+
+def test_empty_selection_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        render_recommendation_response(current_catalog(), (), None)
@@ -1,5 +1,26 @@
+import random
+
+import pytest
+
+from app.data_loader import load_activities, load_questions
 from app.models import ResponseOption
-from app.scoring import compute_ranked_activities, select_top_recommendations
+from app.scoring import (
+    RESPONSE_OPTION_ORDER,
+    RESPONSE_WEIGHTS,
+    compute_ranked_activities,
+    compute_ranked_activities_batch,
+    load_scoring_matrix,
+    select_top_recommendations,
+)
+
+
+def _reference_ranking(responses: list[ResponseOption]) -> list[tuple[str, int]]:
+    score_map = {activity.code: 0 for activity in load_activities()}
+    for question, response in zip(load_questions(), responses, strict=True):
+        for tag in question.tags:
+            score_map[tag] += RESPONSE_WEIGHTS[response]
+    ranked = sorted(load_activities(), key=lambda activity: (-max(0, score_map[activity.code]), activity.name))
+    return [(activity.code, max(0, score_map[activity.code])) for activity in ranked]
 
 
 def test_all_strongly_disagree_clamps_scores_to_zero() -> None:
@@ -21,3 +42,35 @@ def test_prerequisites_are_prepended_when_phase_c_is_high() -> None:
         "Energy Mapping",
     ]
     assert note is not None
+
+
+def test_compiled_matrix_matches_reference_scoring() -> None:
+    rng = random.Random(7)
+    for _ in range(500):
+        responses = [rng.choice(RESPONSE_OPTION_ORDER) for _ in range(18)]
+
+        ranked = compute_ranked_activities(responses)
+
+        assert [(item.code, item.score) for item in ranked] == _reference_ranking(responses)
+
+
+def test_batch_scoring_matches_single_scoring() -> None:
+    rng = random.Random(11)
+    batch = [[rng.randrange(4) for _ in range(18)] for _ in range(50)]
+
+    ranked_batch = compute_ranked_activities_batch(batch)
+
+    assert ranked_batch == [
+        compute_ranked_activities([RESPONSE_OPTION_ORDER[code] for code in codes]) for codes in batch
+    ]
+
+
+def test_scoring_matrix_rejects_wrong_response_count() -> None:
+    with pytest.raises(ValueError):
+        load_scoring_matrix().scores([2] * 17)
+
+
+@pytest.mark.parametrize("code", [-1, 4])
+def test_scoring_matrix_rejects_out_of_range_codes(code: int) -> None:
+    with pytest.raises(ValueError):
+        load_scoring_matrix().scores([2] * 17 + [code])
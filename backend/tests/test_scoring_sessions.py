@@ -0,0 +1,141 @@
+import asyncio
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.catalog import current_catalog
+from app.main import app
+from app.scoring import MIN_SCORE_CLAMP, select_recommendations
+from app.scoring_sessions import (
+    CLOSED_EVICTED,
+    CLOSED_EXPIRED,
+    ScoringSessionIncomplete,
+    ScoringSessionNotFound,
+    ScoringSessionStore,
+    iter_session_events,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _partial_scores(codes: dict[int, int]) -> list[int]:
+    contributions = current_catalog().scoring_matrix.contributions
+    rows = [contributions[question][code] for question, code in codes.items()]
+    totals = [sum(column) for column in zip(*rows)] if rows else [0] * len(contributions[0][0])
+    return [max(MIN_SCORE_CLAMP, total) for total in totals]
+
+
+def _parse_event(chunk: bytes) -> tuple[str, dict[str, object]]:
+    fields = dict(line.split(": ", 1) for line in chunk.decode("utf-8").strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_incremental_totals_match_scoring_from_scratch() -> None:
+    store = ScoringSessionStore(capacity=10, ttl_seconds=60)
+    session = store.create()
+    table = session.catalog.selection_table
+    rng = random.Random(7)
+    given: dict[int, int] = {}
+
+    assert table.unpack(session.total) == _partial_scores({})
+    for _ in range(60):
+        question, code = rng.randrange(18), rng.randrange(4)
+        store.answer(session.session_id, question, code)
+        given[question] = code
+        assert table.unpack(session.total) == _partial_scores(given)
+
+    for question in range(18):
+        store.answer(session.session_id, question, given.get(question, 2))
+    codes = list(store.submit(session.session_id).answers)
+    assert table.select_total(session.total) == table.select(codes)
+    assert select_recommendations(codes)[0] == table.select_total(session.total)[0]
+
+
+def test_store_is_bounded_and_expires_idle_sessions() -> None:
+    clock = FakeClock()
+    store = ScoringSessionStore(capacity=2, ttl_seconds=10, clock=clock)
+    first, second = store.create(), store.create()
+    store.get(first.session_id)
+
+    third = store.create()
+
+    assert second.closed == CLOSED_EVICTED
+    with pytest.raises(ScoringSessionNotFound):
+        store.get(second.session_id)
+    clock.now = 11
+    with pytest.raises(ScoringSessionNotFound):
+        store.answer(first.session_id, 0, 1)
+    assert first.closed == CLOSED_EXPIRED
+    store.expire()
+    assert third.closed == CLOSED_EXPIRED
+    stats = store.stats()
+    assert (stats.size, stats.created, stats.evicted, stats.expired) == (0, 3, 1, 2)
+
+
+def test_incomplete_sessions_cannot_be_submitted() -> None:
+    store = ScoringSessionStore(capacity=10, ttl_seconds=60)
+    session = store.create()
+    store.answer(session.session_id, 0, 3)
+
+    with pytest.raises(ScoringSessionIncomplete):
+        store.submit(session.session_id)
+    with pytest.raises(ValueError):
+        store.answer(session.session_id, 18, 0)
+
+
+def test_events_follow_answers_and_end_when_the_session_closes() -> None:
+    store = ScoringSessionStore(capacity=10, ttl_seconds=60)
+    session = store.create()
+
+    async def scenario() -> list[tuple[str, dict[str, object]]]:
+        events = iter_session_events(store, session, keepalive_seconds=5)
+        received = [_parse_event(await anext(events))]
+        store.answer(session.session_id, 0, 3)
+        received.append(_parse_event(await anext(events)))
+        for question in range(18):
+            store.answer(session.session_id, question, 3)
+        store.submit(session.session_id)
+        received.extend([_parse_event(chunk) async for chunk in events])
+        return received
+
+    received = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    assert [event for event, _ in received] == ["scores", "scores", "scores", "closed"]
+    assert (received[0][1]["answered"], received[1][1]["answered"], received[2][1]["answered"]) == (0, 1, 18)
+    assert received[2][1]["completion_percent"] == 100
+    assert received[-1][1] == {"reason": "submitted"}
+
+
+def test_session_endpoints_score_answers_and_submit(monkeypatch) -> None:
+    monkeypatch.setattr(app.state, "scoring_sessions", ScoringSessionStore(capacity=10, ttl_seconds=60), raising=False)
+    client = TestClient(app)
+    codes = "321032103210321032"
+
+    created = client.post("/api/v1/sessions")
+    session_id = created.json()["session_id"]
+    early = client.post(f"/api/v1/sessions/{session_id}/submit")
+    for question_id, code in enumerate(codes, start=1):
+        answered = client.put(f"/api/v1/sessions/{session_id}/answers/{question_id}", json={"code": int(code)})
+        assert answered.status_code == 204
+    session = app.state.scoring_sessions.get(session_id)
+    event, data = _parse_event(asyncio.run(anext(iter_session_events(app.state.scoring_sessions, session))))
+    submitted = client.post(f"/api/v1/sessions/{session_id}/submit")
+    direct = client.post("/api/v1/recommendations", json={"codes": codes})
+
+    assert created.status_code == 201
+    assert created.json()["total_questions"] == 18
+    assert early.status_code == 409
+    assert (event, data["answered"]) == ("scores", 18)
+    assert data["recommendations"] == direct.json()["recommendations"]
+    assert submitted.json() == direct.json()
+    assert client.post(f"/api/v1/sessions/{session_id}/submit").status_code == 404
+    assert client.put("/api/v1/sessions/missing/answers/1", json={"code": 0}).status_code == 404
+    assert client.get("/api/v1/sessions/missing/events").status_code == 404
@@ -0,0 +1,51 @@
+import dataclasses
+import random
+from types import MappingProxyType
+
+import pytest
+
+from app.catalog import current_catalog
+from app.selection_table import compile_selection_table
+
+
+def _random_codes(count: int, seed: int = 7) -> list[list[int]]:
+    rng = random.Random(seed)
+    return [[rng.randrange(4) for _ in range(18)] for _ in range(count)]
+
+
+def test_table_matches_scoring_matrix_and_selection_for_random_answers() -> None:
+    catalog = current_catalog()
+    matrix, table = catalog.scoring_matrix, catalog.selection_table
+
+    for codes in [[0] * 18, [3] * 18, *_random_codes(2000)]:
+        selected, injected = catalog.index.select_top(matrix.rank(matrix.scores(codes)))
+        assert table.scores(codes) == matrix.scores(codes)
+        assert table.select(codes) == (tuple(selected), injected)
+
+
+def test_table_covers_every_ranking_and_reports_its_size() -> None:
+    report = current_catalog().selection_table.report()
+
+    assert report["activities"] == 7
+    assert report["rankings"] == 5040
+    assert 0 < report["distinct_selections"] <= 7 * 6 * 5 * 4 * 3
+    assert report["approximate_table_bytes"] > 0
+
+
+def test_selection_falls_back_to_the_index_without_a_table() -> None:
+    catalog = current_catalog()
+    untabulated = dataclasses.replace(catalog.selection_table, selections=MappingProxyType({}))
+
+    for codes in _random_codes(50):
+        assert untabulated.select(codes) == catalog.selection_table.select(codes)
+
+
+def test_invalid_codes_are_rejected() -> None:
+    table = compile_selection_table(current_catalog().scoring_matrix, current_catalog().index)
+
+    with pytest.raises(ValueError):
+        table.select([0] * 17)
+    with pytest.raises(ValueError):
+        table.select([0] * 17 + [4])
+    with pytest.raises(ValueError):
+        table.select([0] * 17 + [-1])
@@ -0,0 +1,41 @@
+import random
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.scoring import select_recommendations
+from app.sensitivity import analyze_sensitivity
+
+
+def test_every_alternative_matches_scoring_the_changed_survey() -> None:
+    rng = random.Random(3)
+
+    for _ in range(200):
+        codes = [rng.randrange(4) for _ in range(18)]
+        report = analyze_sensitivity(codes)
+
+        assert report.selected == select_recommendations(codes)[0]
+        assert len(report.changes) == 54
+        for change in report.changes:
+            changed = list(codes)
+            changed[change.question_index] = change.code
+            assert change.code != codes[change.question_index]
+            assert change.selected == select_recommendations(changed)[0]
+
+
+def test_sensitivity_endpoint_reports_changes_and_top_flips() -> None:
+    client = TestClient(app)
+
+    response = client.post("/api/v1/recommendations:sensitivity", json={"codes": "321032103210321032"})
+
+    assert response.status_code == 200
+    body = response.json()
+    alternatives = body["alternatives"]
+    assert len(alternatives) == 54
+    assert (alternatives[0]["question"], alternatives[0]["response"]) == (1, "strongly_disagree")
+    for alternative in alternatives:
+        assert alternative["changed"] == (alternative["recommendations"] != body["recommendations"])
+        assert set(alternative["added"]) == set(alternative["recommendations"]) - set(body["recommendations"])
+    flips = [(flip["question"], flip["response"]) for flip in body["top_flips"]]
+    assert flips == [(item["question"], item["response"]) for item in alternatives if item["top_changed"]]
+    assert client.post("/api/v1/recommendations:sensitivity", json={"codes": "12"}).status_code == 422
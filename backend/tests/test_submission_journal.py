@@ -0,0 +1,132 @@
+import threading
+from dataclasses import replace
+
+import pytest
+
+from app.submission_journal import JournalReplayer, JournalSubmissionStore
+from app.submission_store import (
+    SUBMISSION_COLUMNS,
+    SubmissionStoreError,
+    build_submission_row,
+    create_submission_store,
+)
+
+from fake_sheets import FakeSheetsService
+
+
+def test_journal_group_commits_concurrent_appends(tmp_path, make_submission) -> None:
+    journal = JournalSubmissionStore(tmp_path / "journal.sqlite3")
+
+    def write(offset: int) -> None:
+        for index in range(50):
+            journal.append_submission(**make_submission(f"id-{offset}-{index}"))
+
+    threads = [threading.Thread(target=write, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert journal.pending_count() == 400
+    journal.close()
+
+
+def test_journal_ignores_duplicate_submission_ids(tmp_path, make_submission, make_record) -> None:
+    journal = JournalSubmissionStore(tmp_path / "journal.sqlite3")
+
+    journal.append_submission(**make_submission("same"))
+    journal.append_submissions([make_record("same"), make_record("other", catalog_version="abc123")])
+
+    records = [record for page in journal.iter_records() for record in page]
+    assert [record.submission_id for record in records] == ["same", "other"]
+    assert records[0].recommendations == ["A", "B", "C", "D", "E"]
+    assert records[0].visitor_hash is None
+    assert [record.catalog_version for record in records] == [None, "abc123"]
+    journal.close()
+
+
+def test_replayer_forwards_pending_rows_to_sheets_once(tmp_path, make_submission, make_sheets_store) -> None:
+    journal = JournalSubmissionStore(tmp_path / "journal.sqlite3")
+    service = FakeSheetsService()
+    replayer = JournalReplayer(journal, make_sheets_store(service, max_retries=0), batch_size=2)
+
+    for index in range(5):
+        journal.append_submission(**make_submission(f"id-{index}"))
+
+    assert replayer.replay_pending() == 5
+    assert replayer.replay_pending() == 0
+
+    rows = service.all_rows()
+    assert [row[1] for row in rows] == [f"id-{index}" for index in range(5)]
+    assert all(len(row) == len(SUBMISSION_COLUMNS) for row in rows)
+    assert service.append_calls == 3
+    assert journal.pending_count() == 0
+    journal.close()
+
+
+def test_replayer_keeps_rows_pending_when_sheets_fails(tmp_path, make_submission, make_sheets_store) -> None:
+    journal = JournalSubmissionStore(tmp_path / "journal.sqlite3")
+    service = FakeSheetsService(failure_rate=1.0)
+    replayer = JournalReplayer(journal, make_sheets_store(service, max_retries=0))
+    journal.append_submission(**make_submission("kept"))
+
+    with pytest.raises(SubmissionStoreError):
+        replayer.replay_pending()
+
+    assert journal.pending_count() == 1
+    service.failure_rate = 0.0
+    assert replayer.replay_pending() == 1
+    journal.close()
+
+
+def test_create_submission_store_selects_journal_backend(tmp_path, make_settings) -> None:
+    settings = make_settings(
+        submission_store_backend="journal",
+        submission_journal_path=str(tmp_path / "journal.sqlite3"),
+    )
+
+    store = create_submission_store(settings)
+
+    assert isinstance(store, JournalSubmissionStore)
+    store.close()
+    assert not isinstance(create_submission_store(replace(settings, submission_journal_path=None)), JournalSubmissionStore)
+
+
+def test_bad_writer_does_not_fail_the_rest_of_its_group(tmp_path, make_submission) -> None:
+    journal = JournalSubmissionStore(tmp_path / "journal.sqlite3")
+    errors: list[BaseException] = []
+    barrier = threading.Barrier(2)
+
+    def write(rows: list[list[str]]) -> None:
+        barrier.wait()
+        try:
+            journal._commit(rows)
+        except SubmissionStoreError as exc:
+            errors.append(exc)
+
+    bad_row = ["too", "short"]
+    ok_row = build_submission_row(**make_submission("ok"))
+    threads = [threading.Thread(target=write, args=([bad_row],)), threading.Thread(target=write, args=([ok_row],))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 1
+    assert [record.submission_id for page in journal.iter_records() for record in page] == ["ok"]
+    journal.close()
+
+
+def test_concurrent_replayers_claim_disjoint_rows(tmp_path, make_submission) -> None:
+    journal = JournalSubmissionStore(tmp_path / "journal.sqlite3")
+    other_worker = JournalSubmissionStore(tmp_path / "journal.sqlite3")
+    for index in range(4):
+        journal.append_submission(**make_submission(f"id-{index}"))
+
+    _, first = journal.claim_pending(limit=3)
+    _, second = other_worker.claim_pending(limit=3)
+
+    assert [record.submission_id for record in first] == ["id-0", "id-1", "id-2"]
+    assert [record.submission_id for record in second] == ["id-3"]
+    journal.close()
+    other_worker.close()
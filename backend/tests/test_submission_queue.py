@@ -0,0 +1,200 @@
+import threading
+import time
+from dataclasses import replace
+
+from app.circuit_breaker import CircuitBreakerSubmissionStore
+from app.submission_queue import QueuedSubmissionStore
+from app.submission_store import (
+    GoogleSheetsSubmissionStore,
+    NoopSubmissionStore,
+    SubmissionStoreError,
+    create_submission_store,
+)
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.submission_ids: list[str] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def append_submission(self, **kwargs: object) -> None:
+        self.release.wait(timeout=5)
+        self.submission_ids.append(str(kwargs["submission_id"]))
+
+
+class FailingStore:
+    def append_submission(self, **kwargs: object) -> None:
+        raise SubmissionStoreError("boom")
+
+
+def test_queue_drains_pending_submissions_on_close(make_submission) -> None:
+    inner = RecordingStore()
+    store = QueuedSubmissionStore(inner, capacity=10)
+
+    for index in range(3):
+        store.append_submission(**make_submission(f"id-{index}"))
+    store.close(timeout=5)
+
+    assert inner.submission_ids == ["id-0", "id-1", "id-2"]
+    stats = store.stats()
+    assert stats.depth == 0
+    assert stats.written == 3
+
+
+def test_queue_drops_oldest_when_full(make_submission) -> None:
+    inner = RecordingStore()
+    inner.release.clear()
+    store = QueuedSubmissionStore(inner, capacity=2)
+
+    store.append_submission(**make_submission("blocking"))
+    # Wait until the flusher has picked up the first record and is blocked writing it.
+    while store.stats().depth:
+        time.sleep(0.001)
+    for index in range(3):
+        store.append_submission(**make_submission(f"id-{index}"))
+    inner.release.set()
+    store.close(timeout=5)
+
+    assert inner.submission_ids == ["blocking", "id-1", "id-2"]
+    assert store.stats().dropped == 1
+
+
+def test_queue_spills_failed_submissions_to_disk(tmp_path, make_submission) -> None:
+    spill_path = tmp_path / "spill.jsonl"
+    store = QueuedSubmissionStore(
+        FailingStore(),
+        capacity=10,
+        overflow_policy="spill_to_disk",
+        spill_path=str(spill_path),
+    )
+
+    store.append_submission(**make_submission("lost-without-spill"))
+    store.close(timeout=5)
+
+    assert "lost-without-spill" in spill_path.read_text(encoding="utf-8")
+    assert store.stats().failed == 1
+
+
+def test_append_raises_after_close(make_submission) -> None:
+    store = QueuedSubmissionStore(RecordingStore(), capacity=10)
+    store.close(timeout=5)
+
+    try:
+        store.append_submission(**make_submission("late"))
+    except SubmissionStoreError:
+        pass
+    else:
+        raise AssertionError("Expected SubmissionStoreError")
+
+
+def test_create_submission_store_wraps_sheets_store_in_queue(make_settings) -> None:
+    settings = make_settings(
+        google_sheets_enabled=True,
+        google_sheets_spreadsheet_id="spreadsheet-id",
+        google_service_account_json='{"type":"service_account"}',
+    )
+
+    store = create_submission_store(settings)
+
+    assert isinstance(store, QueuedSubmissionStore)
+    assert isinstance(store.store, CircuitBreakerSubmissionStore)
+    assert isinstance(store.store.store, GoogleSheetsSubmissionStore)
+    assert isinstance(create_submission_store(replace(settings, google_sheets_enabled=False)), NoopSubmissionStore)
+
+
+def test_queue_flushes_batches_by_size(make_submission) -> None:
+    batches: list[list[str]] = []
+
+    class BatchStore(RecordingStore):
+        def append_submissions(self, records: list[object]) -> None:
+            batches.append([record.submission_id for record in records])
+
+    inner = BatchStore()
+    store = QueuedSubmissionStore(inner, capacity=100, batch_size=3, flush_interval_seconds=60.0)
+
+    for index in range(7):
+        store.append_submission(**make_submission(f"id-{index}"))
+    store.close(timeout=5)
+
+    assert batches == [["id-0", "id-1", "id-2"], ["id-3", "id-4", "id-5"], ["id-6"]]
+    assert store.stats().written == 7
+
+
+def test_bulk_append_waits_for_room_instead_of_dropping(make_record) -> None:
+    inner = RecordingStore()
+    store = QueuedSubmissionStore(inner, capacity=2)
+
+    store.append_submissions([make_record(f"id-{index}") for index in range(10)])
+    store.close(timeout=5)
+
+    assert inner.submission_ids == [f"id-{index}" for index in range(10)]
+    assert store.stats().dropped == 0
+
+
+def test_recovery_keeps_spill_file_until_records_are_written(tmp_path, make_record) -> None:
+    spill_path = tmp_path / "spill.jsonl"
+    inner = RecordingStore()
+    store = QueuedSubmissionStore(inner, capacity=10, overflow_policy="spill_to_disk", spill_path=str(spill_path))
+    store._spill([make_record("spilled")])
+
+    store._recover_spilled()
+
+    assert inner.submission_ids == ["spilled"]
+    assert not spill_path.exists()
+    assert not spill_path.with_name("spill.jsonl.recovering").exists()
+
+
+def test_recovery_respills_records_that_still_fail(tmp_path, make_record) -> None:
+    spill_path = tmp_path / "spill.jsonl"
+    store = QueuedSubmissionStore(FailingStore(), capacity=10, overflow_policy="spill_to_disk", spill_path=str(spill_path))
+    store._spill([make_record("still-failing")])
+
+    store._recover_spilled()
+
+    assert "still-failing" in spill_path.read_text(encoding="utf-8")
+    assert not spill_path.with_name("spill.jsonl.recovering").exists()
+
+
+def test_recovery_quarantines_torn_spill_lines(tmp_path, make_record) -> None:
+    spill_path = tmp_path / "spill.jsonl"
+    inner = RecordingStore()
+    store = QueuedSubmissionStore(inner, capacity=10, overflow_policy="spill_to_disk", spill_path=str(spill_path))
+    store._spill([make_record("spilled")])
+    with spill_path.open("ab") as spill_file:
+        spill_file.write(b'{"submission_id": "torn\n["not", "a record"]\n\xff\n')
+
+    store._recover_spilled()
+
+    assert inner.submission_ids == ["spilled"]
+    assert not spill_path.with_name("spill.jsonl.recovering").exists()
+    assert len(spill_path.with_name("spill.jsonl.quarantine").read_bytes().splitlines()) == 3
+
+
+def test_flusher_survives_unexpected_store_errors(make_submission) -> None:
+    class FlakyStore(RecordingStore):
+        def append_submission(self, **kwargs: object) -> None:
+            if kwargs["submission_id"] == "bad":
+                raise KeyError("not a SubmissionStoreError")
+            super().append_submission(**kwargs)
+
+    inner = FlakyStore()
+    store = QueuedSubmissionStore(inner, capacity=10)
+
+    store.append_submission(**make_submission("bad"))
+    store.append_submission(**make_submission("good"))
+    store.close(timeout=5)
+
+    assert inner.submission_ids == ["good"]
+    assert (store.stats().failed, store.stats().written) == (1, 1)
+
+
+def test_queue_logs_stats_periodically(caplog, make_submission) -> None:
+    store = QueuedSubmissionStore(RecordingStore(), capacity=10, stats_log_interval_seconds=0.01)
+
+    with caplog.at_level("INFO", logger="app.submission_queue"):
+        store.append_submission(**make_submission("a"))
+        time.sleep(0.05)
+        store.close(timeout=5)
+
+    assert any("Submission queue: depth=" in message for message in caplog.messages)
@@ -1,4 +1,10 @@
-from app.submission_store import GoogleSheetsSubmissionStore, build_submission_row, build_visitor_hash
+from app.submission_store import (
+    GoogleSheetsSubmissionStore,
+    build_submission_row,
+    build_visitor_hash,
+)
+
+from fake_sheets import FakeSheetsService
 
 
 def test_build_submission_row_uses_fixed_columns() -> None:
@@ -11,7 +17,7 @@ def test_build_submission_row_uses_fixed_columns() -> None:
         schema_version="v1",
     )
 
-    assert len(row) == 27
+    assert len(row) == 28
     assert row[0] == "2026-02-11T00:00:00Z"
     assert row[1] == "test-submission"
     assert row[2] == "agree"
@@ -21,6 +27,7 @@ def test_build_submission_row_uses_fixed_columns() -> None:
     assert row[24] == ""
     assert row[25] == ""
     assert row[26] == "v1"
+    assert row[27] == ""
 
 
 def test_build_visitor_hash_is_deterministic() -> None:
@@ -68,3 +75,49 @@ def test_google_store_retries_then_succeeds(monkeypatch) -> None:
     )
 
     assert attempts["count"] == 2
+
+
+def test_google_store_appends_batch_in_single_call(make_record, make_sheets_store) -> None:
+    service = FakeSheetsService()
+    store = make_sheets_store(service)
+
+    store.append_submissions([make_record("a"), make_record("b"), make_record("a")])
+    store.append_submissions([make_record("b"), make_record("c")])
+
+    assert service.append_calls == 2
+    assert [row[1] for row in service.all_rows()] == ["a", "b", "c"]
+
+
+def test_google_store_skips_rows_that_landed_before_a_failed_batch(monkeypatch, make_record, make_sheets_store) -> None:
+    monkeypatch.setattr("app.submission_store.time.sleep", lambda _: None)
+    service = FakeSheetsService()
+    store = make_sheets_store(service)
+    store.append_submissions([make_record("first")])
+
+    service.scripted_failures = ["timeout"]
+    store.append_submissions([make_record("second"), make_record("third")])
+
+    assert [row[1] for row in service.all_rows()] == ["first", "second", "third"]
+    assert service.append_calls == 2
+
+
+def test_google_store_retries_failed_batch_as_unit(monkeypatch, make_record, make_sheets_store) -> None:
+    monkeypatch.setattr("app.submission_store.time.sleep", lambda _: None)
+    service = FakeSheetsService(scripted_failures=["fail", "fail"])
+    store = make_sheets_store(service)
+
+    store.append_submissions([make_record("x"), make_record("y")])
+
+    assert service.append_calls == 3
+    assert [row[1] for row in service.all_rows()] == ["x", "y"]
+
+
+def test_google_store_checks_for_landed_rows_before_first_confirmed_write(monkeypatch, make_record, make_sheets_store) -> None:
+    monkeypatch.setattr("app.submission_store.time.sleep", lambda _: None)
+    service = FakeSheetsService(scripted_failures=["timeout"])
+    store = make_sheets_store(service)
+
+    store.append_submissions([make_record("first"), make_record("second")])
+
+    assert [row[1] for row in service.all_rows()] == ["first", "second"]
+    assert service.append_calls == 1
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from app.submission_store import SubmissionRecord, SubmissionStoreError, create_submission_store
+from app.submission_queue import QueuedSubmissionStore
+from app.submission_writer import SocketSubmissionStore, SubmissionWriter, create_writer_store
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def append_submissions(self, records: list[SubmissionRecord]) -> None:
+        self.batches.append([record.submission_id for record in records])
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def running_writer(tmp_path):
+    store = RecordingStore()
+    writer = SubmissionWriter(store, str(tmp_path / "writer.sock"))
+    writer.bind()
+    thread = threading.Thread(target=writer.serve_forever, daemon=True)
+    yield writer, store, thread
+    writer.stop()
+    if thread.is_alive():
+        thread.join(timeout=5)
+
+
+def test_rows_sent_by_workers_reach_the_writer_store_in_batches(running_writer, make_submission, make_record) -> None:
+    writer, store, thread = running_writer
+    client = SocketSubmissionStore(str(writer.socket_path))
+
+    # Sent before the writer starts reading, so they arrive as one batch.
+    client.append_submission(**make_submission("a"))
+    client.append_submissions([make_record("b"), make_record("c")])
+    thread.start()
+    _wait_for(lambda: writer.received == 3)
+
+    assert store.batches == [["a", "b", "c"]]
+    writer.stop()
+    thread.join(timeout=5)
+    assert not writer.socket_path.exists()
+
+
+def test_append_fails_when_no_writer_is_listening(tmp_path, make_submission) -> None:
+    client = SocketSubmissionStore(str(tmp_path / "missing.sock"))
+
+    with pytest.raises(SubmissionStoreError):
+        client.append_submission(**make_submission("a"))
+
+
+def test_malformed_datagrams_are_skipped(running_writer, make_submission) -> None:
+    writer, store, thread = running_writer
+    client = SocketSubmissionStore(str(writer.socket_path))
+    client._get_socket().sendto(b"not json", str(writer.socket_path))
+    client.append_submission(**make_submission("a"))
+    thread.start()
+
+    _wait_for(lambda: writer.received == 1)
+    assert store.batches == [["a"]]
+
+
+def test_worker_store_is_the_socket_client_when_a_writer_socket_is_set(make_settings) -> None:
+    store = create_submission_store(make_settings(submission_writer_socket="/tmp/writer.sock"))
+
+    assert isinstance(store, SocketSubmissionStore)
+    assert store.nonblocking_append
+
+
+def test_writer_store_ignores_the_socket_setting_and_queues_writes(make_settings) -> None:
+    settings = make_settings(
+        submission_writer_socket="/tmp/writer.sock",
+        submission_queue_enabled=False,
+        google_sheets_enabled=True,
+        google_sheets_spreadsheet_id="spreadsheet-id",
+        google_service_account_json='{"type":"service_account"}',
+    )
+
+    store = create_writer_store(settings)
+    try:
+        assert isinstance(store, QueuedSubmissionStore)
+    finally:
+        store.close()
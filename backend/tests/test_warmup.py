@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.circuit_breaker import CircuitBreaker, CircuitBreakerSubmissionStore
+from app.main import app
+from app.submission_store import NoopSubmissionStore, SubmissionStoreError, credentials_need_refresh
+from app.warmup import FAILED, READY, Warmup
+
+
+class WarmableStore:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.fail = fail
+        self.warmed = 0
+
+    def warm_up(self) -> None:
+        self.warmed += 1
+        if self.fail:
+            raise SubmissionStoreError("no credentials")
+
+
+class AsyncWarmableStore:
+    def __init__(self) -> None:
+        self.warmed = 0
+
+    async def warm_up(self) -> None:
+        self.warmed += 1
+
+
+class FakeCredentials:
+    def __init__(self, *, valid: bool, expires_in_seconds: float | None) -> None:
+        self.valid = valid
+        self.expiry = (
+            None
+            if expires_in_seconds is None
+            else datetime.now(tz=timezone.utc).replace(tzinfo=None) + timedelta(seconds=expires_in_seconds)
+        )
+
+
+def test_warmup_prepares_wrapped_stores_and_becomes_ready() -> None:
+    inner = WarmableStore()
+    fallback = AsyncWarmableStore()
+    store = CircuitBreakerSubmissionStore(
+        inner,
+        CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30),
+        fallback=fallback,
+    )
+    warmup = Warmup(store, token_refresh_interval_seconds=0)
+    assert warmup.warming
+
+    asyncio.run(warmup.run())
+
+    assert warmup.state == READY
+    assert not warmup.warming
+    assert (inner.warmed, fallback.warmed) == (1, 1)
+    assert {"catalog", "WarmableStore", "AsyncWarmableStore", "total"} <= set(warmup.durations)
+
+
+def test_store_warmup_failure_does_not_block_readiness() -> None:
+    warmup = Warmup(WarmableStore(fail=True), token_refresh_interval_seconds=0)
+
+    asyncio.run(warmup.run())
+
+    assert warmup.state == READY
+
+
+def test_catalog_failure_marks_warmup_failed(monkeypatch) -> None:
+    def broken_catalog() -> None:
+        raise ValueError("bad catalog")
+
+    monkeypatch.setattr("app.warmup.current_catalog", broken_catalog)
+    warmup = Warmup(NoopSubmissionStore(), token_refresh_interval_seconds=0)
+
+    asyncio.run(warmup.run())
+
+    assert warmup.state == FAILED
+    assert not warmup.warming
+
+
+def test_ready_endpoint_returns_503_while_warming(monkeypatch) -> None:
+    warmup = Warmup(NoopSubmissionStore(), token_refresh_interval_seconds=0)
+    monkeypatch.setattr(app.state, "warmup", warmup, raising=False)
+    client = TestClient(app)
+
+    warming = client.get("/api/v1/ready")
+    asyncio.run(warmup.run())
+    warm = client.get("/api/v1/ready")
+
+    assert warming.status_code == 503
+    assert warming.json() == {"detail": "Warming up."}
+    assert warm.status_code == 200
+    assert client.get("/api/v1/health").status_code == 200
+
+
+def test_credentials_need_refresh_within_margin() -> None:
+    assert credentials_need_refresh(FakeCredentials(valid=False, expires_in_seconds=None), margin_seconds=0)
+    assert credentials_need_refresh(FakeCredentials(valid=True, expires_in_seconds=120), margin_seconds=300)
+    assert not credentials_need_refresh(FakeCredentials(valid=True, expires_in_seconds=3600), margin_seconds=300)
+    assert not credentials_need_refresh(FakeCredentials(valid=True, expires_in_seconds=None), margin_seconds=300)
@@ -1,11 +1,20 @@
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { useRouter } from "next/navigation";
 
 import { RESPONSE_LABELS, RESPONSE_VALUES, RESULTS_SESSION_KEY, SURVEY_SESSION_KEY } from "@/lib/constants";
-import { fetchQuestions, fetchRecommendations } from "@/lib/api";
-import type { Question, ResponseOption } from "@/lib/types";
+import {
+  createIdempotencyKey,
+  createScoringSession,
+  encodeResponses,
+  fetchQuestions,
+  fetchRecommendations,
+  sendSessionAnswer,
+  submitScoringSession,
+  subscribeToScoringSession,
+} from "@/lib/api";
+import type { ProvisionalScores, Question, RecommendationResponse, ResponseOption } from "@/lib/types";
 
 type AnswerMap = Record<number, number | undefined>;
 
@@ -31,6 +40,13 @@ export default function SurveyPage(): JSX.Element {
   const [isLoading, setIsLoading] = useState(true);
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [sessionId, setSessionId] = useState<string | null>(null);
+  const [provisional, setProvisional] = useState<ProvisionalScores | null>(null);
+  // Answers are sent one at a time, in order, so the session ends up with the latest value of each.
+  const pendingAnswers = useRef<Promise<void>>(Promise.resolve());
+  const sentAnswers = useRef<AnswerMap>({});
+  // One key per set of answers, reused when the same survey is submitted again after a failure.
+  const submission = useRef<{ codes: string; idempotencyKey: string } | null>(null);
 
   const router = useRouter();
 
@@ -41,9 +57,9 @@ export default function SurveyPage(): JSX.Element {
         setQuestions(questionResponse.questions);
 
         const storedAnswers = sessionStorage.getItem(SURVEY_SESSION_KEY);
-        if (storedAnswers) {
-          setAnswers(JSON.parse(storedAnswers) as AnswerMap);
-        }
+        const restored = storedAnswers ? (JSON.parse(storedAnswers) as AnswerMap) : {};
+        setAnswers(restored);
+        startScoringSession(restored).catch(() => setSessionId(null));
       } catch (requestError) {
         const message = requestError instanceof Error ? requestError.message : "Failed to load survey.";
         setError(message);
@@ -55,6 +71,59 @@ export default function SurveyPage(): JSX.Element {
     load().catch(() => setError("Failed to load survey."));
   }, []);
 
+  useEffect(() => {
+    if (!sessionId) {
+      return undefined;
+    }
+    return subscribeToScoringSession(sessionId, setProvisional);
+  }, [sessionId]);
+
+  // Provisional results are a progressive enhancement: without a session, the survey is scored on submit.
+  async function startScoringSession(restored: AnswerMap): Promise<void> {
+    const session = await createScoringSession();
+    await Promise.all(
+      Object.entries(restored)
+        .filter(([, code]) => code !== undefined)
+        .map(async ([questionId, code]) => {
+          await sendSessionAnswer(session.session_id, Number(questionId), code as number);
+          sentAnswers.current[Number(questionId)] = code;
+        }),
+    );
+    setSessionId(session.session_id);
+  }
+
+  function queueSessionAnswer(questionId: number, code: number): void {
+    if (!sessionId) {
+      return;
+    }
+    pendingAnswers.current = pendingAnswers.current
+      .then(async () => {
+        await sendSessionAnswer(sessionId, questionId, code);
+        sentAnswers.current[questionId] = code;
+      })
+      // A lost answer would leave the session out of date; stop using it.
+      .catch(() => setSessionId(null));
+  }
+
+  async function fetchFinalRecommendations(responses: ResponseOption[]): Promise<RecommendationResponse> {
+    const codes = encodeResponses(responses);
+    if (submission.current?.codes !== codes) {
+      submission.current = { codes, idempotencyKey: createIdempotencyKey() };
+    }
+    const { idempotencyKey } = submission.current;
+
+    await pendingAnswers.current;
+    // Answers given while the session was starting were not sent; score those surveys directly.
+    const sessionUpToDate = questions.every((question) => sentAnswers.current[question.id] === answers[question.id]);
+    if (sessionId && sessionUpToDate) {
+      const sessionResponse = await submitScoringSession(sessionId, idempotencyKey);
+      if (sessionResponse) {
+        return sessionResponse;
+      }
+    }
+    return fetchRecommendations(responses, idempotencyKey);
+  }
+
   const answeredCount = useMemo(() => Object.values(answers).filter((value) => value !== undefined).length, [answers]);
   const completionPercent = questions.length === 0 ? 0 : Math.round((answeredCount / questions.length) * 100);
   const allAnswered = questions.length > 0 && answeredCount === questions.length;
@@ -64,6 +133,9 @@ export default function SurveyPage(): JSX.Element {
     const next = { ...answers, [questionId]: snapped };
     setAnswers(next);
     sessionStorage.setItem(SURVEY_SESSION_KEY, JSON.stringify(next));
+    if (snapped !== undefined && snapped !== answers[questionId]) {
+      queueSessionAnswer(questionId, snapped);
+    }
   }
 
   async function submitSurvey(): Promise<void> {
@@ -78,7 +150,7 @@ export default function SurveyPage(): JSX.Element {
       const orderedAnswers = questions.map((question) => answers[question.id]);
       const responses = orderedAnswers.map((value) => RESPONSE_VALUES[value as number]) as ResponseOption[];
 
-      const recommendationResponse = await fetchRecommendations(responses);
+      const recommendationResponse = await fetchFinalRecommendations(responses);
       sessionStorage.setItem(RESULTS_SESSION_KEY, JSON.stringify(recommendationResponse));
       router.push("/results");
     } catch (requestError) {
@@ -112,6 +184,11 @@ export default function SurveyPage(): JSX.Element {
           <div className="progress-bar" aria-hidden="true">
             <span style={{ width: `${completionPercent}%` }} />
           </div>
+          {provisional && provisional.answered > 0 ? (
+            <p className="provisional-matches">
+              Leading matches so far: {provisional.recommendations.map((item) => item.name).join(", ")}
+            </p>
+          ) : null}
         </div>
 
         {error ? <p className="alert">{error}</p> : null}
@@ -1,4 +1,11 @@
-import type { QuestionsResponse, RecommendationResponse, ResponseOption } from "@/lib/types";
+import { RESPONSE_VALUES } from "@/lib/constants";
+import type {
+  ProvisionalScores,
+  QuestionsResponse,
+  RecommendationResponse,
+  ResponseOption,
+  ScoringSessionResponse,
+} from "@/lib/types";
 
 const DEFAULT_API_BASE_URL = "http://localhost:8000";
 const API_BASE_URL = (process.env.NEXT_PUBLIC_API_BASE_URL?.trim() || DEFAULT_API_BASE_URL).replace(
@@ -24,22 +31,118 @@ export async function pingBackendHealth(): Promise<void> {
 }
 
 export async function fetchQuestions(): Promise<QuestionsResponse> {
-  const response = await fetch(`${API_BASE_URL}/api/v1/questions`, { cache: "no-store" });
+  // Revalidate with the ETag on every load; unchanged questions come back as a bodiless 304.
+  const response = await fetch(`${API_BASE_URL}/api/v1/questions`, { cache: "no-cache" });
   if (!response.ok) {
     throw new Error("Failed to load survey questions.");
   }
   return response.json() as Promise<QuestionsResponse>;
 }
 
+const RESPONSE_CODES = Object.fromEntries(
+  Object.entries(RESPONSE_VALUES).map(([code, value]) => [value, code]),
+) as Record<ResponseOption, string>;
+
+// Compact wire format: one digit (0-3, strongly disagree .. strongly agree) per answer.
+export function encodeResponses(responses: ResponseOption[]): string {
+  return responses.map((response) => RESPONSE_CODES[response]).join("");
+}
+
+const RETRY_DELAYS_MS = [500, 1500];
+
+function sleep(milliseconds: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, milliseconds));
+}
+
+// Retries network errors, 5xx and a 409 with Retry-After (the same key is still being processed; other
+// 409s are final). Every attempt sends the same Idempotency-Key, so the backend stores the survey once
+// and replays its first response.
+async function postWithRetries(url: string, init: RequestInit, idempotencyKey: string): Promise<Response> {
+  const headers = { ...(init.headers as Record<string, string> | undefined), "Idempotency-Key": idempotencyKey };
+  for (let attempt = 0; ; attempt += 1) {
+    try {
+      const response = await fetch(url, { ...init, method: "POST", headers });
+      const inProgress = response.status === 409 && response.headers.has("Retry-After");
+      if (attempt >= RETRY_DELAYS_MS.length || (!inProgress && response.status < 500)) {
+        return response;
+      }
+    } catch (networkError) {
+      if (attempt >= RETRY_DELAYS_MS.length) {
+        throw networkError;
+      }
+    }
+    await sleep(RETRY_DELAYS_MS[attempt]);
+  }
+}
+
+export function createIdempotencyKey(): string {
+  return crypto.randomUUID();
+}
+
 export async function fetchRecommendations(
   responses: ResponseOption[],
+  idempotencyKey: string = createIdempotencyKey(),
 ): Promise<RecommendationResponse> {
-  const response = await fetch(`${API_BASE_URL}/api/v1/recommendations`, {
-    method: "POST",
+  const response = await postWithRetries(
+    `${API_BASE_URL}/api/v1/recommendations`,
+    {
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ codes: encodeResponses(responses) }),
+    },
+    idempotencyKey,
+  );
+
+  if (!response.ok) {
+    throw new Error("Failed to calculate recommendations.");
+  }
+
+  return response.json() as Promise<RecommendationResponse>;
+}
+
+// Progressive scoring: answers are sent as they are given and the backend pushes provisional
+// recommendations over Server-Sent Events. Sessions live in one backend process and expire when
+// idle, so callers fall back to fetchRecommendations when a session is gone.
+export async function createScoringSession(): Promise<ScoringSessionResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/v1/sessions`, { method: "POST" });
+  if (!response.ok) {
+    throw new Error("Failed to start a scoring session.");
+  }
+  return response.json() as Promise<ScoringSessionResponse>;
+}
+
+export async function sendSessionAnswer(sessionId: string, questionId: number, code: number): Promise<void> {
+  const response = await fetch(`${API_BASE_URL}/api/v1/sessions/${sessionId}/answers/${questionId}`, {
+    method: "PUT",
     headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ responses }),
+    body: JSON.stringify({ code }),
   });
+  if (!response.ok) {
+    throw new Error("Failed to send the answer.");
+  }
+}
 
+export function subscribeToScoringSession(
+  sessionId: string,
+  onScores: (scores: ProvisionalScores) => void,
+): () => void {
+  const source = new EventSource(`${API_BASE_URL}/api/v1/sessions/${sessionId}/events`);
+  source.addEventListener("scores", (event) => onScores(JSON.parse((event as MessageEvent<string>).data)));
+  // The stream ends for good once the session is submitted, evicted or expired.
+  source.addEventListener("closed", () => source.close());
+  return () => source.close();
+}
+
+// Returns null when the session has expired or is incomplete; fetchRecommendations still works then.
+// Pass the same idempotency key to that fallback: if the session was submitted, its response is replayed.
+export async function submitScoringSession(
+  sessionId: string,
+  idempotencyKey: string,
+): Promise<RecommendationResponse | null> {
+  const response = await postWithRetries(`${API_BASE_URL}/api/v1/sessions/${sessionId}/submit`, {}, idempotencyKey);
+
+  if (response.status === 404 || response.status === 409) {
+    return null;
+  }
   if (!response.ok) {
     throw new Error("Failed to calculate recommendations.");
   }
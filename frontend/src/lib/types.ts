@@ -26,3 +26,17 @@ export type RecommendationResponse = {
   scoring_note: string;
   prerequisite_note: string | null;
 };
+
+export type ScoringSessionResponse = {
+  session_id: string;
+  total_questions: number;
+};
+
+export type ProvisionalScores = {
+  revision: number;
+  answered: number;
+  total_questions: number;
+  completion_percent: number;
+  recommendations: RecommendationItem[];
+  prerequisite_note: string | null;
+};